@@ -1,7 +1,168 @@
-from django.contrib import admin
-from .models import Category, Thread, Post, Profile, PostLike
+import logging
+from datetime import timedelta
+
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from . import moderation
+from .models import Category, Thread, Post, Profile, PostLike, ThreadSubscription, ThreadArchive, PostFingerprint
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# більші вибірки — через manage.py purge_user_content, щоб запит адмінки не впирався в таймаут
+MODERATION_INLINE_LIMIT = getattr(settings, 'MODERATION_INLINE_LIMIT', 50000)
+
+
+def _confirm(modeladmin, request, queryset, title, form=None):
+    """
+    Проміжна сторінка підтвердження для масових дій. На відміну від
+    delete_selected, не збирає пов'язані об'єкти — лише рахує вибране.
+    """
+    return TemplateResponse(request, 'admin/forum/confirm_action.html', {
+        **modeladmin.admin_site.each_context(request),
+        'title': title,
+        'opts': modeladmin.model._meta,
+        'count': queryset.count(),
+        'form': form,
+        'action': request.POST['action'],
+        'select_across': request.POST.get('select_across', '0'),
+        'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+        'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+    })
+
+
+def _too_many(modeladmin, request, queryset):
+    count = queryset.count()
+    if count > MODERATION_INLINE_LIMIT:
+        modeladmin.message_user(
+            request,
+            f"Вибрано {count} записів — забагато для адмінки (ліміт {MODERATION_INLINE_LIMIT}). "
+            "Звузьте фільтр або скористайтесь manage.py purge_user_content.",
+            messages.ERROR,
+        )
+        return True
+    return False
+
+
+def _progress(request, action):
+    """
+    progress-колбек для moderation.*: відповідь адмінки прийде лише наприкінці,
+    тож хід довгої дії — по рядку в лог на кожен шматок.
+    """
+    def report(message):
+        logger.info("%s (%s): %s", action, request.user, message.strip())
+    return report
+
+
+def _done(modeladmin, request, message):
+    modeladmin.message_user(
+        request, f"{message} Хід виконання по шматках — у лозі сервера (forum.admin).", messages.SUCCESS,
+    )
+
+
+class RecentFilter(admin.SimpleListFilter):
+    """
+    Лише "за останні N днів" — created_at >= X, діапазон по індексу. Стандартний
+    фільтр дат ще й "цей місяць/рік", що на великій таблиці охоплює більшість рядків.
+    """
+    title = "Створено"
+    parameter_name = 'recent'
+
+    def lookups(self, request, model_admin):
+        return (('1', "За добу"), ('7', "За тиждень"), ('30', "За місяць"))
+
+    def queryset(self, request, queryset):
+        if self.value() in ('1', '7', '30'):
+            return queryset.filter(created_at__gte=timezone.now() - timedelta(days=int(self.value())))
+        return queryset
+
+
+class MoveToCategoryForm(forms.Form):
+    category = forms.ModelChoiceField(queryset=Category.objects.all(), label="Категорія")
+
+
+class MoveToThreadForm(forms.Form):
+    thread = forms.IntegerField(label="ID теми", min_value=1)
+
+    def clean_thread(self):
+        thread = Thread.objects.filter(pk=self.cleaned_data['thread'], archived=False).first()
+        if thread is None:
+            raise forms.ValidationError("Такої теми немає (або вона в архіві).")
+        return thread
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    COUNT(*) по мільйонах рядків — секунди на кожну сторінку змін. Для
+    нефільтрованого списку на Postgres беремо оцінку планувальника
+    (pg_class.reltuples, оновлюється autovacuum/ANALYZE); для фільтрів і
+    малих таблиць — звичайний COUNT.
+    """
+    ESTIMATE_THRESHOLD = 10000
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        connection = connections[qs.db]
+        if connection.vendor == 'postgresql' and not qs.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [qs.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.ESTIMATE_THRESHOLD:
+                return row[0]
+        return super().count
+
+
+class LargeTableAdminMixin:
+    """
+    Список змін для великих таблиць: оцінений count, без другого повного
+    COUNT для "показати всі", числовий запит — пошук за id, а текст — повнотекстовий
+    пошук по GIN-індексу (міграція 0009) на Postgres замість icontains.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # колонка з GIN-індексом to_tsvector('simple', ...)
+    fulltext_field = None
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if term.isdigit():
+            return queryset.filter(pk=int(term)), False
+        if term and self.fulltext_field and connections[queryset.db].vendor == 'postgresql':
+            # вираз має збігатися з виразом індексу, інакше планувальник його не візьме
+            column = f'"{queryset.model._meta.db_table}"."{self.fulltext_field}"'
+            matches = RawSQL(
+                f"to_tsvector('simple', {column}) @@ plainto_tsquery('simple', %s)",
+                (term,), output_field=BooleanField(),
+            )
+            by_fields, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+            return queryset.filter(matches) | by_fields, may_have_duplicates
+        return super().get_search_results(request, queryset, search_term)
+
+
+class BulkModerationMixin:
+    """Стандартний delete_selected вантажить усі пов'язані об'єкти — замінюємо своїм."""
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
 
-# Register your models here.
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -11,18 +172,79 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Thread)
-class ThreadAdmin(admin.ModelAdmin):
-    list_display = ('title', 'category', 'author', 'pinned', 'closed', 'updated_at')
-    list_filter = ('category', 'pinned', 'closed')
-    search_fields = ('title', 'author__username')
+class ThreadAdmin(LargeTableAdminMixin, BulkModerationMixin, admin.ModelAdmin):
+    list_display = ('title', 'category', 'author', 'pinned', 'closed', 'archived', 'deleted_at', 'updated_at')
+    list_filter = ('category', 'pinned', 'closed', 'archived', ('deleted_at', admin.EmptyFieldListFilter))
+    list_select_related = ('category', 'author')
+    search_fields = ('=author__username', '=slug')
+    fulltext_field = 'title'
+    autocomplete_fields = ('category', 'author', 'last_post')
     prepopulated_fields = {"slug": ("title",)}
+    actions = ('bulk_delete', 'undelete_threads', 'close_threads', 'reopen_threads', 'move_to_category')
+
+    @admin.action(description="Видалити вибрані теми (з усіма постами)", permissions=['delete'])
+    def bulk_delete(self, request, queryset):
+        if _too_many(self, request, queryset):
+            return None
+        if 'apply' not in request.POST:
+            return _confirm(self, request, queryset, "Видалити теми разом з усіма постами")
+        threads, posts = moderation.delete_threads(queryset, progress=_progress(request, "delete threads"))
+        _done(self, request, f"Видалено тем: {threads}, постів: {posts}.")
+
+    @admin.action(description="Відновити видалені теми (до purge)", permissions=['change'])
+    def undelete_threads(self, request, queryset):
+        restored = moderation.undelete_threads(queryset)
+        self.message_user(
+            request, f"Відновлено тем: {restored} (ті, чий строк минув, пропущено).", messages.SUCCESS,
+        )
+
+    @admin.action(description="Закрити вибрані теми", permissions=['change'])
+    def close_threads(self, request, queryset):
+        updated = moderation.set_closed(queryset, True)
+        self.message_user(request, f"Закрито тем: {updated}.", messages.SUCCESS)
+
+    @admin.action(description="Відкрити вибрані теми", permissions=['change'])
+    def reopen_threads(self, request, queryset):
+        updated = moderation.set_closed(queryset, False)
+        self.message_user(request, f"Відкрито тем: {updated} (архівні пропущено).", messages.SUCCESS)
+
+    @admin.action(description="Перенести в іншу категорію", permissions=['change'])
+    def move_to_category(self, request, queryset):
+        form = MoveToCategoryForm(request.POST if 'apply' in request.POST else None)
+        if not form.is_valid():
+            return _confirm(self, request, queryset, "Перенести теми в категорію", form)
+        moved = moderation.move_threads(queryset, form.cleaned_data['category'])
+        self.message_user(request, f"Перенесено тем: {moved}.", messages.SUCCESS)
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(LargeTableAdminMixin, BulkModerationMixin, admin.ModelAdmin):
     list_display = ('id', 'thread', 'author', 'created_at')
-    search_fields = ('content', 'author__username')
-    list_filter = ('created_at',)
+    list_select_related = ('thread', 'author')
+    search_fields = ('=author__username',)
+    fulltext_field = 'content'
+    autocomplete_fields = ('thread', 'author', 'parent')
+    list_filter = (RecentFilter,)
+    # найновіші першими — по первинному ключу, без сортування мільйонів рядків за created_at
+    ordering = ('-pk',)
+    actions = ('bulk_delete', 'move_to_thread')
+
+    @admin.action(description="Видалити вибрані пости", permissions=['delete'])
+    def bulk_delete(self, request, queryset):
+        if _too_many(self, request, queryset):
+            return None
+        if 'apply' not in request.POST:
+            return _confirm(self, request, queryset, "Видалити пости")
+        deleted = moderation.delete_posts(queryset, progress=_progress(request, "delete posts"))
+        _done(self, request, f"Видалено постів: {deleted}.")
+
+    @admin.action(description="Перенести в іншу тему (разом з відповідями)", permissions=['change'])
+    def move_to_thread(self, request, queryset):
+        form = MoveToThreadForm(request.POST if 'apply' in request.POST else None)
+        if not form.is_valid():
+            return _confirm(self, request, queryset, "Перенести пости в тему", form)
+        moved = moderation.move_posts(queryset, form.cleaned_data['thread'], progress=_progress(request, "move posts"))
+        _done(self, request, f"Перенесено постів: {moved}.")
 
 
 @admin.register(Profile)
@@ -32,6 +254,79 @@ class ProfileAdmin(admin.ModelAdmin):
 
 
 @admin.register(PostLike)
-class PostLikeAdmin(admin.ModelAdmin):
+class PostLikeAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'post', 'created_at')
-    search_fields = ('user__username',)
\ No newline at end of file
+    list_select_related = ('user', 'post')
+    search_fields = ('=user__username',)
+    autocomplete_fields = ('user', 'post')
+    ordering = ('-pk',)
+
+
+@admin.register(ThreadSubscription)
+class ThreadSubscriptionAdmin(admin.ModelAdmin):
+    list_display = ('user', 'thread', 'unread_count', 'created_at')
+    search_fields = ('user__username',)
+    raw_id_fields = ('user', 'thread')
+
+
+@admin.register(ThreadArchive)
+class ThreadArchiveAdmin(admin.ModelAdmin):
+    list_display = ('thread', 'posts_count', 'codec', 'archived_at')
+    raw_id_fields = ('thread',)
+    # сам блоб у формі не потрібен
+    exclude = ('payload',)
+    readonly_fields = ('codec', 'posts_count', 'was_closed', 'archived_at')
+
+
+class FlaggedFilter(admin.SimpleListFilter):
+    title = "Дублікат"
+    parameter_name = 'flagged'
+
+    def lookups(self, request, model_admin):
+        return (('1', "Так"),)
+
+    def queryset(self, request, queryset):
+        if self.value() == '1':
+            return queryset.filter(duplicate_of__isnull=False)
+        return queryset
+
+
+@admin.register(PostFingerprint)
+class PostFingerprintAdmin(admin.ModelAdmin):
+    # черга "схоже на спам": пости, опубліковані з майже-дублікатом (SPAM_DUPLICATE_ACTION='flag')
+    list_display = ('post', 'duplicate_of', 'created_at')
+    list_filter = (FlaggedFilter,)
+    list_select_related = ('post', 'duplicate_of')
+    raw_id_fields = ('post', 'duplicate_of')
+    ordering = ('-created_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class ForumUserAdmin(BulkModerationMixin, UserAdmin):
+    actions = ('purge_content',)
+
+    def has_purge_permission(self, request):
+        # незворотне видалення чужого контенту — не просто "змінити користувача"
+        return self.has_change_permission(request) and request.user.has_perms(
+            [f'{Post._meta.app_label}.delete_post', f'{Thread._meta.app_label}.delete_thread']
+        )
+
+    @admin.action(description="Видалити весь контент і вимкнути акаунт", permissions=['purge'])
+    def purge_content(self, request, queryset):
+        users = queryset.exclude(is_superuser=True)
+        # і власні пости, і чужі відповіді в їхніх темах — теми видаляються цілком
+        if _too_many(self, request, Post.objects.filter(Q(author__in=users) | Q(thread__author__in=users))):
+            return None
+        if 'apply' not in request.POST:
+            return _confirm(self, request, queryset, "Видалити теми, пости й лайки користувачів і вимкнути їхні акаунти")
+        totals = {'threads': 0, 'posts': 0, 'likes': 0}
+        for user in users:
+            progress = _progress(request, f"purge {user.username}")
+            for key, value in moderation.purge_user(user, progress=progress).items():
+                totals[key] += value
+        _done(self, request, f"Видалено тем: {totals['threads']}, постів: {totals['posts']}, лайків: {totals['likes']}.")
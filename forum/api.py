@@ -0,0 +1,315 @@
+# forum/api.py
+"""
+Read-only JSON API (api/v1/) для мобільного клієнта та інтеграцій.
+
+- ?fields=id,title,... — лише потрібні поля; запит будується з
+  values_list() саме по цих полях (ніяких екземплярів моделей і зайвих
+  JOIN), відповідь серіалізується orjson.
+- Списки — курсорна пагінація: {"results": [...], "next": url або null}.
+  Курсор непрозорий (base64 від позиції останнього рядка), тож глибокі
+  сторінки коштують стільки ж, скільки перша — без OFFSET і COUNT.
+- ETag — хеш тіла відповіді; If-None-Match з тим самим значенням дає 304
+  без тіла. Cache-Control: public, max-age=API_MAX_AGE.
+
+Читання — з реплік, як і в HTML-сторінках (@read_from_replica).
+"""
+import base64
+import binascii
+from collections import namedtuple
+from functools import wraps
+from hashlib import blake2b
+
+import orjson
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import urlencode
+
+from myforum.db_router import read_from_replica
+
+from . import archive
+from .models import Category, Post, Thread
+
+User = get_user_model()
+
+PAGE_SIZE = getattr(settings, 'API_PAGE_SIZE', 50)
+MAX_PAGE_SIZE = getattr(settings, 'API_MAX_PAGE_SIZE', 200)
+MAX_AGE = getattr(settings, 'API_MAX_AGE', 30)
+
+# поле відповіді: шляхи для values_list() і перетворення їхніх значень (None — значення як є)
+Field = namedtuple('Field', 'paths convert', defaults=(None,))
+
+
+def _avatar_url(name):
+    return default_storage.url(name) if name else static('img/avatar-placeholder.png')
+
+
+CATEGORY_FIELDS = {
+    'id': Field(('pk',)),
+    'title': Field(('title',)),
+    'slug': Field(('slug',)),
+    'description': Field(('description',)),
+    'url': Field(('slug',), lambda slug: reverse('category', args=[slug])),
+}
+
+THREAD_FIELDS = {
+    'id': Field(('pk',)),
+    'title': Field(('title',)),
+    'slug': Field(('slug',)),
+    'category': Field(('category__slug',)),
+    'author': Field(('author__username',)),
+    'created_at': Field(('created_at',)),
+    'updated_at': Field(('updated_at',)),
+    'last_post_id': Field(('last_post_id',)),
+    'last_post_at': Field(('last_post_at',)),
+    'pinned': Field(('pinned',)),
+    'closed': Field(('closed',)),
+    'archived': Field(('archived',)),
+    'views': Field(('views',)),
+    'url': Field(('pk', 'slug'), lambda pk, slug: reverse('thread', args=[pk, slug])),
+}
+
+POST_FIELDS = {
+    'id': Field(('pk',)),
+    'thread': Field(('thread_id',)),
+    'author': Field(('author__username',)),
+    'parent': Field(('parent_id',)),
+    'depth': Field(('path',), lambda path: max(len(path) // Post.PATH_STEP - 1, 0)),
+    'content': Field(('content',)),
+    'created_at': Field(('created_at',)),
+    'edited_at': Field(('edited_at',)),
+    # постійне посилання: редірект на сторінку теми з постом (forum/permalinks.py)
+    'url': Field(('pk',), lambda pk: reverse('post_permalink', args=[pk])),
+}
+
+USER_FIELDS = {
+    'id': Field(('pk',)),
+    'username': Field(('username',)),
+    'display_name': Field(
+        ('first_name', 'last_name', 'username'),
+        lambda first, last, username: f"{first} {last}".strip() or username,
+    ),
+    'date_joined': Field(('date_joined',)),
+    'bio': Field(('profile__bio',)),
+    'location': Field(('profile__location',)),
+    'website': Field(('profile__website',)),
+    'avatar': Field(('profile__avatar',), _avatar_url),
+    'posts_count': Field(('profile__posts_count',)),
+    'threads_count': Field(('profile__threads_count',)),
+    'likes_received': Field(('profile__likes_received',)),
+    'last_activity_at': Field(('profile__last_activity_at',)),
+    'url': Field(('username',), lambda username: reverse('profile_view', args=[username])),
+}
+
+DEFAULT_THREAD_FIELDS = ['id', 'title', 'category', 'author', 'created_at', 'last_post_at', 'pinned', 'closed', 'url']
+DEFAULT_POST_FIELDS = ['id', 'author', 'parent', 'depth', 'content', 'created_at', 'edited_at']
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _json(data, status=200):
+    return HttpResponse(
+        orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS),
+        status=status,
+        content_type='application/json',
+    )
+
+
+def api_view(view_func):
+    """GET/HEAD, помилки як JSON, ETag + умовний GET, читання з репліки."""
+    @read_from_replica
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            response = _json({'error': 'method not allowed'}, status=405)
+            response['Allow'] = 'GET, HEAD'
+            return response
+        try:
+            data = view_func(request, *args, **kwargs)
+        except ApiError as e:
+            return _json({'error': str(e)}, status=e.status)
+        except Http404:
+            return _json({'error': 'not found'}, status=404)
+
+        response = _json(data)
+        etag = '"%s"' % blake2b(response.content, digest_size=16).hexdigest()
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=MAX_AGE)
+        return get_conditional_response(request, etag=etag, response=response)
+    return _wrapped
+
+
+def _fields(request, spec, default=None):
+    raw = request.GET.get('fields')
+    if not raw:
+        return default or list(spec)
+    names = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = [name for name in names if name not in spec]
+    if unknown:
+        raise ApiError(f"unknown fields: {', '.join(unknown)}; available: {', '.join(spec)}")
+    return names
+
+
+def _plan(spec, names, extra=()):
+    """Унікальні шляхи для values_list() (спершу extra — для курсора) і як з рядка зібрати кожне поле."""
+    paths = list(extra)
+    for name in names:
+        for path in spec[name].paths:
+            if path not in paths:
+                paths.append(path)
+    index = {path: i for i, path in enumerate(paths)}
+    columns = [(name, [index[p] for p in spec[name].paths], spec[name].convert) for name in names]
+    return paths, columns
+
+
+def _row(values, columns):
+    result = {}
+    for name, positions, convert in columns:
+        if convert is None:
+            result[name] = values[positions[0]]
+        else:
+            result[name] = convert(*(values[i] for i in positions))
+    return result
+
+
+def _rows(queryset, spec, names):
+    paths, columns = _plan(spec, names)
+    return [_row(values, columns) for values in queryset.values_list(*paths)]
+
+
+def _one(queryset, spec, names):
+    rows = _rows(queryset[:1], spec, names)
+    if not rows:
+        raise Http404
+    return rows[0]
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', PAGE_SIZE))
+    except ValueError:
+        raise ApiError("limit must be an integer")
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _encode_cursor(value):
+    return base64.urlsafe_b64encode(orjson.dumps(value)).decode().rstrip('=')
+
+
+def _decode_cursor(request, kind):
+    raw = request.GET.get('cursor')
+    if not raw:
+        return None
+    try:
+        cursor = orjson.loads(base64.urlsafe_b64decode(raw + '=' * (-len(raw) % 4)))
+    except (ValueError, binascii.Error, orjson.JSONDecodeError):
+        raise ApiError("invalid cursor")
+    # bool — теж int, але курсором бути не може
+    if type(cursor) is not kind:
+        raise ApiError("invalid cursor")
+    return cursor
+
+
+def _page(request, queryset, spec, names, key, kind, forward=True):
+    """
+    Одна сторінка по ключу `key` (унікальний у межах queryset, з індексом):
+    WHERE key > курсор ORDER BY key LIMIT limit+1 — зайвий рядок лише
+    показує, чи є наступна сторінка.
+    """
+    limit = _limit(request)
+    cursor = _decode_cursor(request, kind)
+    if cursor is not None:
+        queryset = queryset.filter(**{f'{key}__gt' if forward else f'{key}__lt': cursor})
+    queryset = queryset.order_by(key if forward else f'-{key}')
+
+    paths, columns = _plan(spec, names, extra=[key])
+    values = list(queryset.values_list(*paths)[:limit + 1])
+    return _paginated(request, [_row(v, columns) for v in values[:limit]], values, limit)
+
+
+def _paginated(request, results, values, limit):
+    """values — сирі рядки (позиція курсора першою); є limit+1-й рядок — є й наступна сторінка."""
+    next_url = None
+    if len(values) > limit:
+        params = request.GET.copy()
+        params['cursor'] = _encode_cursor(values[limit - 1][0])
+        next_url = request.build_absolute_uri(f"{request.path}?{urlencode(params, doseq=True)}")
+    return {'results': results, 'next': next_url}
+
+
+@api_view
+def categories(request):
+    names = _fields(request, CATEGORY_FIELDS)
+    return {'results': _rows(Category.objects.order_by('title'), CATEGORY_FIELDS, names), 'next': None}
+
+
+@api_view
+def category_threads(request, slug):
+    """Теми категорії, новіші першими (курсор — id теми)."""
+    category_id = Category.objects.filter(slug=slug).values_list('pk', flat=True).first()
+    if category_id is None:
+        raise Http404
+    names = _fields(request, THREAD_FIELDS, DEFAULT_THREAD_FIELDS)
+    threads = Thread.objects.filter(category_id=category_id, deleted_at__isnull=True)
+    return _page(request, threads, THREAD_FIELDS, names, 'pk', int, forward=False)
+
+
+@api_view
+def thread_detail(request, pk):
+    return _one(Thread.objects.filter(pk=pk, deleted_at__isnull=True), THREAD_FIELDS, _fields(request, THREAD_FIELDS))
+
+
+@api_view
+def thread_posts(request, pk):
+    """
+    Пости теми в порядку обходу дерева (як на сторінці теми): курсор —
+    materialized path, тож сторінка — один range-запит по індексу (thread, path).
+    """
+    thread = Thread.objects.filter(pk=pk, deleted_at__isnull=True).values('pk', 'archived').first()
+    if thread is None:
+        raise Http404
+    names = _fields(request, POST_FIELDS, DEFAULT_POST_FIELDS)
+    if thread['archived']:
+        return _archived_posts(request, pk, names)
+    return _page(request, Post.objects.filter(thread_id=pk), POST_FIELDS, names, 'path', str)
+
+
+def _archived_posts(request, thread_id, names):
+    """Архівна тема: пости з ThreadArchive (вже впорядковані по path), імена авторів — одним запитом."""
+    limit = _limit(request)
+    cursor = _decode_cursor(request, str)
+    posts = [p for p in archive.load_posts(thread_id) if cursor is None or p.path > cursor][:limit + 1]
+    usernames = dict(User.objects.filter(pk__in={p.author_id for p in posts}).values_list('pk', 'username'))
+    source = {
+        'pk': lambda p: p.pk,
+        'thread_id': lambda p: thread_id,
+        'author__username': lambda p: usernames.get(p.author_id),
+        'parent_id': lambda p: p.parent_id,
+        'path': lambda p: p.path,
+        'content': lambda p: p.content,
+        'created_at': lambda p: p.created_at,
+        'edited_at': lambda p: p.edited_at,
+    }
+    paths, columns = _plan(POST_FIELDS, names, extra=['path'])
+    values = [[source[path](p) for path in paths] for p in posts]
+    return _paginated(request, [_row(v, columns) for v in values[:limit]], values, limit)
+
+
+@api_view
+def post_detail(request, pk):
+    posts = Post.objects.filter(pk=pk, thread__deleted_at__isnull=True)
+    return _one(posts, POST_FIELDS, _fields(request, POST_FIELDS, ['thread'] + DEFAULT_POST_FIELDS))
+
+
+@api_view
+def user_detail(request, username):
+    names = _fields(request, USER_FIELDS)
+    return _one(User.objects.filter(username=username, is_active=True), USER_FIELDS, names)
@@ -6,5 +6,6 @@ class ForumConfig(AppConfig):
     name = 'forum'
 
     def ready(self):
-        # підключаємо сигнали
+        # підключаємо сигнали і системні перевірки
+        import forum.checks
         import forum.signals
\ No newline at end of file
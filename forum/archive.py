@@ -0,0 +1,305 @@
+# forum/archive.py
+"""
+Архів холодних тем.
+
+Теми без активності N місяців (manage.py archive_threads) переїжджають з
+forum_post у ThreadArchive: усі пости одним JSON-документом (HTML + те, що
+потрібно для рендера й відновлення), стиснутим zstd. Гарячі таблиця й
+індекси постів від цього худнуть, а thread_page рендерить архівну тему
+прямо з блобу — тільки читання, тема примусово closed.
+
+Разом з постами в блоб ідуть залежні рядки, які інакше забрав би каскад:
+історія редагувань (PostRevision), згадки (PostMention) і відбитки
+(PostFingerprint; LSH-кошики — ні, за вікно пошуку дублікатів архівна тема
+давно вийшла). restore_thread() повертає все це з початковими id постів
+(посилання, позначки прочитання і materialized path лишаються дійсними).
+Thread.last_post архівної теми вказує на пост в архіві — списки тем
+показують його через fill_listing(), не розпаковуючи блоб.
+
+zstandard — опційна залежність: без неї нові архіви стискаються zlib,
+а кодек зберігається в кожному архіві, тож читаються обидва формати.
+"""
+import zlib
+from datetime import datetime
+
+import orjson
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Case, DateTimeField, Value, When
+
+from . import notifications, readtracking, stats
+from .models import (
+    ArchivedAuthorStats, ArchivedPostPosition, Post, PostFingerprint, PostLike, PostMention, PostRevision, Thread, ThreadArchive,
+)
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+User = get_user_model()
+
+ZSTD_LEVEL = 10
+# розмір шматка для bulk_create / UPDATE при відновленні
+RESTORE_BATCH = 500
+
+
+def _compress(data):
+    if zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return 'zlib', zlib.compress(data, 9)
+
+
+def _decompress(codec, payload):
+    payload = bytes(payload)
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ImproperlyConfigured("Archive is zstd-compressed but the 'zstandard' package is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if codec == 'zlib':
+        return zlib.decompress(payload)
+    raise ValueError(f"Unknown archive codec: {codec}")
+
+
+class ArchivedPost:
+    """Легкий замінник Post для шаблонів (forum/_post.html) — без БД."""
+
+    def __init__(self, data):
+        self.pk = self.id = data['id']
+        self.author_id = data['author_id']
+        self.content = data['content']
+        self.created_at = datetime.fromisoformat(data['created_at'])
+        self.edited_at = datetime.fromisoformat(data['edited_at']) if data['edited_at'] else None
+        self.parent_id = data['parent_id']
+        self.path = data['path']
+        self.likes_count = len(data['likes'])
+
+    @property
+    def depth(self):
+        return max(len(self.path) // Post.PATH_STEP - 1, 0)
+
+
+def load_posts(thread):
+    """Пости архівної теми в порядку обходу дерева (корінь, потім його гілка)."""
+    archive = ThreadArchive.objects.get(thread=thread)
+    return [ArchivedPost(d) for d in _load(archive)]
+
+
+def _load(archive):
+    return orjson.loads(_decompress(archive.codec, archive.payload))
+
+
+def iter_archives():
+    """(thread_id, docs) по одному архіву — у пам'яті лише один блоб (export_forum)."""
+    archives = ThreadArchive.objects.order_by('pk')
+    for pk in archives.values_list('pk', flat=True).iterator():
+        yield pk, _load(archives.only('codec', 'payload').get(pk=pk))
+
+
+def cold_threads(cutoff):
+    """Id тем без нових постів з `cutoff` (закріплені не архівуємо)."""
+    return (
+        # видалені теми чекають на purge, архівувати їх нема сенсу
+        Thread.objects.filter(archived=False, pinned=False, deleted_at__isnull=True)
+        .exclude(last_post_at__gte=cutoff)
+        .filter(updated_at__lt=cutoff)
+        .order_by('pk')
+        .values_list('pk', flat=True)
+    )
+
+
+def archive_thread(thread_id):
+    """
+    Переносить пости теми в ThreadArchive однією транзакцією.
+    Лічильники Profile не чіпаємо: архівні пости лишаються "написаними",
+    а ArchivedAuthorStats зберігає їх для stats.recompute().
+    Повертає кількість заархівованих постів або None, якщо тему вже взяли.
+    """
+    with transaction.atomic(), stats.suspended():
+        thread = Thread.objects.select_for_update().filter(pk=thread_id, archived=False).first()
+        if thread is None:
+            return None
+
+        likes = _group(PostLike.objects.filter(post__thread=thread).order_by('pk')
+                       .values_list('post_id', 'user_id', 'created_at'))
+        revisions = _group(PostRevision.objects.filter(post__thread=thread).order_by('post_id', 'number')
+                           .values_list('post_id', 'number', 'is_snapshot', 'data', 'editor_id', 'created_at'))
+        mentions = _group(PostMention.objects.filter(post__thread=thread).order_by('pk')
+                          .values_list('post_id', 'user_id', 'seen', 'created_at'))
+        fingerprints = {
+            post_id: [bytes(signature).hex(), created_at, duplicate_of]
+            for post_id, signature, created_at, duplicate_of in PostFingerprint.objects
+            .filter(post__thread=thread).values_list('post_id', 'signature', 'created_at', 'duplicate_of_id')
+        }
+
+        docs = [
+            {
+                **row,
+                'likes': likes.get(row['id'], []),
+                'revisions': revisions.get(row['id'], []),
+                'mentions': mentions.get(row['id'], []),
+                'fingerprint': fingerprints.get(row['id']),
+            }
+            for row in Post.objects.filter(thread=thread).order_by('path', 'pk')
+            .values('id', 'author_id', 'content', 'created_at', 'edited_at', 'parent_id', 'path')
+        ]
+        last = max(docs, key=lambda d: (d['created_at'], d['id']), default=None)
+        codec, payload = _compress(orjson.dumps(docs))
+        archive = ThreadArchive.objects.create(
+            thread=thread, codec=codec, payload=payload,
+            posts_count=len(docs), was_closed=thread.closed,
+            last_post_author_id=last['author_id'] if last else None,
+        )
+        store_positions(archive, docs)
+        store_author_stats(archive, docs)
+
+        # каскад забирає й лайки, версії, згадки (сигнал зменшує лічильники
+        # непереглянутих) та відбитки — усе це вже в блобі
+        Post.objects.filter(thread=thread).delete()
+        # update() не чіпає updated_at (auto_now), а last_post_at лишається для сортування й "нового";
+        # last_post (SET_NULL при видаленні) повертаємо — тепер він вказує на пост в архіві
+        Thread.objects.filter(pk=thread.pk).update(
+            archived=True, closed=True, last_post_id=last['id'] if last else None,
+        )
+        return len(docs)
+
+
+def _group(rows):
+    """[(post_id, *rest), ...] -> {post_id: [rest, ...]}."""
+    grouped = {}
+    for post_id, *rest in rows:
+        grouped.setdefault(post_id, []).append(rest)
+    return grouped
+
+
+def fill_listing(threads):
+    """
+    Для архівних тем у списку: posts_count з ThreadArchive (у forum_post їх
+    немає) і last_post — незбережений Post з id, автором і часом, бо JOIN
+    його не знайде. Одним запитом на сторінку, блоб не читається.
+    """
+    archived = {t.pk: t for t in threads if t.archived}
+    if not archived:
+        return threads
+    for thread_id, posts_count, author_id in ThreadArchive.objects.filter(thread_id__in=archived) \
+            .values_list('thread_id', 'posts_count', 'last_post_author_id'):
+        thread = archived[thread_id]
+        thread.posts_count = posts_count
+        if thread.last_post_id:
+            thread.last_post = Post(
+                pk=thread.last_post_id, thread_id=thread_id, author_id=author_id, created_at=thread.last_post_at,
+            )
+    return threads
+
+
+def store_positions(archive, docs):
+    """Позиції постів у порядку load_posts() — для посилань /p/<id>/ (forum/permalinks.py)."""
+    ArchivedPostPosition.objects.bulk_create(
+        [ArchivedPostPosition(post_id=d['id'], archive=archive, position=i) for i, d in enumerate(docs)],
+        batch_size=RESTORE_BATCH,
+    )
+
+
+def store_author_stats(archive, docs):
+    """Пости, отримані лайки й останній пост кожного автора теми — для stats.recompute()."""
+    by_author = {}
+    for d in docs:
+        row = by_author.setdefault(d['author_id'], [0, 0, d['created_at']])
+        row[0] += 1
+        row[1] += len(d['likes'])
+        row[2] = max(row[2], d['created_at'])
+    ArchivedAuthorStats.objects.bulk_create([
+        ArchivedAuthorStats(
+            archive=archive, user_id=user_id, posts_count=posts, likes_received=likes, last_post_at=last,
+        )
+        for user_id, (posts, likes, last) in by_author.items()
+    ], batch_size=RESTORE_BATCH)
+
+
+def _restore_timestamps(model, values):
+    # auto_now_add перезаписує created_at при bulk_create — повертаємо оригінальні одним UPDATE на шматок
+    if values:
+        model.objects.filter(pk__in=list(values)).update(created_at=Case(
+            *[When(pk=pk, then=Value(dt)) for pk, dt in values.items()],
+            output_field=DateTimeField(),
+        ))
+
+
+def _bulk_create_dated(model, rows):
+    """rows: [(незбережений об'єкт, created_at як ISO-рядок)] — шматками, з початковим created_at."""
+    for i in range(0, len(rows), RESTORE_BATCH):
+        chunk = rows[i:i + RESTORE_BATCH]
+        created = model.objects.bulk_create([obj for obj, _ in chunk])
+        _restore_timestamps(model, {obj.pk: datetime.fromisoformat(dt) for obj, (_, dt) in zip(created, chunk)})
+
+
+def restore_thread(thread):
+    """
+    Повертає пости з архіву в forum_post з початковими id, разом з лайками,
+    версіями, згадками й відбитками. Пости, лайки та згадки видалених
+    відтоді користувачів пропускаються; відповіді на пропущені пости стають
+    кореневими.
+    """
+    with transaction.atomic(), stats.suspended():
+        archive = ThreadArchive.objects.select_for_update().get(thread=thread)
+        docs = _load(archive)
+
+        # архіви, зроблені до появи версій/згадок/відбитків у блобі, цих ключів не мають
+        user_ids = (
+            {d['author_id'] for d in docs}
+            | {uid for d in docs for uid, _ in d['likes']}
+            | {rev[3] for d in docs for rev in d.get('revisions', [])}
+            | {uid for d in docs for uid, _, _ in d.get('mentions', [])}
+        )
+        existing = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+        docs = [d for d in docs if d['author_id'] in existing]
+        kept = {d['id'] for d in docs}
+
+        _bulk_create_dated(Post, [
+            (Post(
+                pk=d['id'], thread_id=thread.pk, author_id=d['author_id'], content=d['content'],
+                excerpt=Post.make_excerpt(d['content']),
+                edited_at=d['edited_at'], path=d['path'],
+                parent_id=d['parent_id'] if d['parent_id'] in kept else None,
+            ), d['created_at'])
+            for d in docs
+        ])
+
+        # час лайків не відновлюємо (ніде не показується), лише хто і що лайкнув
+        likes = [
+            PostLike(user_id=uid, post_id=d['id'])
+            for d in docs for uid, _ in d['likes'] if uid in existing
+        ]
+        PostLike.objects.bulk_create(likes, batch_size=RESTORE_BATCH, ignore_conflicts=True)
+
+        _bulk_create_dated(PostRevision, [
+            (PostRevision(
+                post_id=d['id'], number=number, is_snapshot=is_snapshot, data=data,
+                editor_id=editor_id if editor_id in existing else None,
+            ), created_at)
+            for d in docs for number, is_snapshot, data, editor_id, created_at in d.get('revisions', [])
+        ])
+
+        mentions = [
+            (PostMention(post_id=d['id'], user_id=uid, seen=seen), created_at)
+            for d in docs for uid, seen, created_at in d.get('mentions', []) if uid in existing
+        ]
+        _bulk_create_dated(PostMention, mentions)
+        # при архівації сигнал зменшив лічильники непереглянутих згадок — повертаємо
+        notifications.recompute_unread({m.user_id for m, _ in mentions if not m.seen})
+
+        PostFingerprint.objects.bulk_create([
+            PostFingerprint(
+                post_id=d['id'], signature=bytes.fromhex(signature),
+                created_at=datetime.fromisoformat(created_at), duplicate_of_id=duplicate_of,
+            )
+            for d in docs if d.get('fingerprint')
+            for signature, created_at, duplicate_of in [d['fingerprint']]
+        ], batch_size=RESTORE_BATCH)
+
+        threads = Thread.objects.filter(pk=thread.pk)
+        threads.update(archived=False, closed=archive.was_closed)
+        readtracking.refresh_last_post(threads)
+        archive.delete()  # разом з ArchivedPostPosition і ArchivedAuthorStats (CASCADE)
+        return len(docs)
@@ -0,0 +1,90 @@
+# forum/authorcards.py
+"""
+Кеш "картки автора" для рендерингу постів.
+
+Картка — маленький dict (username, display_name, avatar_url, post_count,
+profile_url), тож шаблону поста не треба ходити в User/Profile і викликати
+reverse() для кожного поста. Картки всіх авторів сторінки читаються одним
+cache.get_many, відсутні — одним запитом до БД (кількість постів береться
+з Profile.posts_count); інвалідуються сигналами (forum/signals.py) при зміні
+користувача, профілю або кількості постів.
+
+Інвалідація бачна всім воркерам лише зі спільним кешем (REDIS_URL). З
+LocMemCache сигнал чистить кеш одного процесу, тож там TTL короткий
+(AUTHOR_CARD_LOCAL_TTL): застарілу картку інші воркери покажуть щонайбільше
+стільки секунд.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.templatetags.static import static
+from django.urls import NoReverseMatch, reverse
+
+from . import metrics
+from .checks import cache_is_shared
+
+User = get_user_model()
+
+AUTHOR_CARD_TTL = getattr(settings, 'AUTHOR_CARD_TTL', 60 * 60)
+AUTHOR_CARD_LOCAL_TTL = getattr(settings, 'AUTHOR_CARD_LOCAL_TTL', 30)
+
+
+def _ttl():
+    return AUTHOR_CARD_TTL if cache_is_shared() else min(AUTHOR_CARD_TTL, AUTHOR_CARD_LOCAL_TTL)
+
+
+def _key(user_id):
+    return f"authorcard:{user_id}"
+
+
+def build_card(user):
+    profile = getattr(user, 'profile', None)
+    avatar = profile.avatar if profile is not None else None
+    try:
+        profile_url = reverse('profile_view', args=[user.username])
+    except NoReverseMatch:
+        profile_url = '#'
+    return {
+        'id': user.pk,
+        'username': user.username,
+        'display_name': user.get_full_name() or user.username,
+        'avatar_url': avatar.url if avatar else static('img/avatar-placeholder.png'),
+        'post_count': profile.posts_count if profile is not None else 0,
+        'profile_url': profile_url,
+    }
+
+
+def get_cards(user_ids):
+    """{user_id: card} — один get_many у кеш і, за потреби, один запит у БД."""
+    ids = {uid for uid in user_ids if uid}
+    if not ids:
+        return {}
+
+    cached = cache.get_many([_key(uid) for uid in ids])
+    cards = {card['id']: card for card in cached.values()}
+
+    missing = ids - cards.keys()
+    metrics.cache_lookups('authorcards', len(cards), len(missing))
+    if missing:
+        users = User.objects.filter(pk__in=missing).select_related('profile')
+        fresh = {u.pk: build_card(u) for u in users}
+        cache.set_many({_key(uid): card for uid, card in fresh.items()}, _ttl())
+        cards.update(fresh)
+    return cards
+
+
+def attach_cards(objects, attr='author_id', to='author_card'):
+    """Проставляє obj.<to> = картка автора для кожного об'єкта списку."""
+    objects = [obj for obj in objects if obj is not None]
+    cards = get_cards(getattr(obj, attr) for obj in objects)
+    for obj in objects:
+        setattr(obj, to, cards.get(getattr(obj, attr)))
+    return objects
+
+
+def invalidate(user_id):
+    cache.delete(_key(user_id))
+
+
+def invalidate_many(user_ids):
+    cache.delete_many([_key(uid) for uid in user_ids])
@@ -0,0 +1,29 @@
+# forum/checks.py
+"""
+Системні перевірки (manage.py check / старт): функції, яким потрібен
+спільний для всіх воркерів кеш, з LocMemCache працюють лише в межах процесу.
+"""
+from django.conf import settings
+from django.core import checks
+
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_is_shared(alias='default'):
+    """Чи бачать усі процеси той самий кеш (Redis, Memcached, БД, файли)."""
+    return settings.CACHES[alias]['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+
+@checks.register(checks.Tags.caches)
+def check_ratelimit_cache(app_configs, **kwargs):
+    if settings.DEBUG or not getattr(settings, 'RATELIMIT_ENABLED', True) or cache_is_shared():
+        return []
+    return [checks.Warning(
+        "Rate limiting keeps its counters in a per-process cache: each gunicorn worker "
+        "counts separately, so the effective limit is multiplied by the number of workers.",
+        hint="Set REDIS_URL so that CACHES['default'] is shared between workers.",
+        id='forum.W001',
+    )]
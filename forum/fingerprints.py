@@ -0,0 +1,173 @@
+# forum/fingerprints.py
+"""
+Пошук майже-дублікатів постів (спам-боти, що розсилають той самий текст
+по темах).
+
+Для очищеного тексту поста рахуємо MinHash-підпис (NUM_PERM мінімумів по
+шинглах з трьох слів): частка однакових позицій у двох підписах оцінює
+схожість Жаккара двох текстів. Підпис ділиться на BANDS смуг по ROWS
+значень; хеш кожної смуги — це LSH-кошик (FingerprintBucket.key).
+Тексти зі схожістю ~0.9 майже напевно мають хоч один спільний кошик, а
+непов'язані — практично ніколи, тож кандидатів дає один запит
+`key IN (...)` по індексу (key, created_at) у вікні
+SPAM_DUPLICATE_WINDOW_HOURS; точна оцінка схожості рахується вже лише
+для них.
+
+Кошики потрібні лише у вікні пошуку: старші видаляє prune_buckets()
+(manage.py prune_fingerprint_buckets з cron), інакше таблиця росла б на
+BANDS рядків з кожним постом. Підписи (PostFingerprint) лишаються — по
+одному на пост, з позначкою duplicate_of для модераторів.
+
+SPAM_DUPLICATE_ACTION: 'flag' (за замовчуванням) — пост публікується, але
+позначається duplicate_of для модераторів; 'block' — форма повертає
+помилку; 'off' — перевірка вимкнена. Персонал не перевіряється.
+"""
+import random
+import re
+import struct
+from collections import namedtuple
+from datetime import timedelta
+from hashlib import blake2b
+
+from django.conf import settings
+from django.db import connections, router
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import FingerprintBucket, PostFingerprint
+
+ACTION = getattr(settings, 'SPAM_DUPLICATE_ACTION', 'flag')
+WINDOW = timedelta(hours=getattr(settings, 'SPAM_DUPLICATE_WINDOW_HOURS', 72))
+MIN_SIMILARITY = getattr(settings, 'SPAM_DUPLICATE_MIN_SIMILARITY', 0.8)
+# короткі відповіді ("дякую!", "+1") законно повторюються — їх не перевіряємо
+MIN_WORDS = getattr(settings, 'SPAM_DUPLICATE_MIN_WORDS', 8)
+
+# 8 смуг по 4: схожість 0.9 -> кандидат з імовірністю ~0.9998, 0.5 -> ~0.4, 0.2 -> ~0.013
+BANDS = 8
+ROWS = 4
+NUM_PERM = BANDS * ROWS
+SHINGLE = 3
+BLOCK_MESSAGE = "Схоже, такий самий текст уже публікувався. Повтори повідомлень заборонені."
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+_PRIME = (1 << 61) - 1
+_MASK32 = (1 << 32) - 1
+# фіксоване зерно: підписи мають бути однакові між процесами й релізами
+_rnd = random.Random(0x5EED)
+_PERMS = [(_rnd.randrange(1, _PRIME), _rnd.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+del _rnd
+
+Verdict = namedtuple('Verdict', 'signature duplicates blocked')
+
+
+def _hash64(data):
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), 'big')
+
+
+def minhash(html):
+    """NUM_PERM 32-бітних мінімумів по шинглах тексту (без тегів) або None для надто короткого."""
+    words = _WORD_RE.findall(strip_tags(html or '').lower())
+    if len(words) < MIN_WORDS:
+        return None
+    shingles = {
+        _hash64(' '.join(words[i:i + SHINGLE]).encode()) for i in range(len(words) - SHINGLE + 1)
+    }
+    return [min((a * h + b) % _PRIME for h in shingles) & _MASK32 for a, b in _PERMS]
+
+
+def bucket_keys(signature):
+    """Хеш кожної смуги (з її номером) — 63 біти, щоб влізти в знаковий BigIntegerField."""
+    return [
+        _hash64(struct.pack(f'>B{ROWS}I', band, *signature[band * ROWS:(band + 1) * ROWS])) >> 1
+        for band in range(BANDS)
+    ]
+
+
+def pack(signature):
+    return struct.pack(f'>{NUM_PERM}I', *signature)
+
+
+def unpack(data):
+    return struct.unpack(f'>{NUM_PERM}I', bytes(data))
+
+
+def similarity(a, b):
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def find_duplicates(signature, since=None, exclude_post=None):
+    """[(post_id, similarity)] не нижче MIN_SIMILARITY серед свіжих постів, найсхожіші першими."""
+    since = since or timezone.now() - WINDOW
+    keys = bucket_keys(signature)
+    connection = connections[router.db_for_read(FingerprintBucket)]
+    # сирий SQL навмисно: це шлях кожного нового поста, а компіляція ORM-запиту
+    # коштує на порядок більше за сам пошук по індексу (key, created_at)
+    sql = (
+        f"SELECT DISTINCT f.post_id, f.signature FROM {FingerprintBucket._meta.db_table} b "
+        f"JOIN {PostFingerprint._meta.db_table} f ON f.post_id = b.post_id "
+        f"WHERE b.key IN ({', '.join(['%s'] * len(keys))}) AND b.created_at >= %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*keys, connection.ops.adapt_datetimefield_value(since)])
+        rows = cursor.fetchall()
+
+    found = []
+    for post_id, data in rows:
+        if post_id == exclude_post:
+            continue
+        score = similarity(signature, unpack(data))
+        if score >= MIN_SIMILARITY:
+            found.append((post_id, score))
+    found.sort(key=lambda item: -item[1])
+    return found
+
+
+def check(html, user):
+    """Перевірка перед збереженням поста: Verdict(signature, duplicates, blocked)."""
+    if ACTION == 'off':
+        return Verdict(None, [], False)
+    signature = minhash(html)
+    if signature is None or user.is_staff:
+        return Verdict(signature, [], False)
+    duplicates = find_duplicates(signature)
+    return Verdict(signature, duplicates, bool(duplicates) and ACTION == 'block')
+
+
+def store(post, verdict=None):
+    """Записує підпис і кошики щойно створеного поста (і найближчий дублікат, якщо є)."""
+    if verdict is None:
+        verdict = Verdict(minhash(post.content), [], False)
+    if verdict.signature is None:
+        return None
+    FingerprintBucket.objects.bulk_create([
+        FingerprintBucket(key=key, post=post, created_at=post.created_at)
+        for key in bucket_keys(verdict.signature)
+    ])
+    return PostFingerprint.objects.create(
+        post=post,
+        signature=pack(verdict.signature),
+        created_at=post.created_at,
+        duplicate_of_id=verdict.duplicates[0][0] if verdict.duplicates else None,
+    )
+
+
+def prune_buckets(before=None, chunk_size=5000, progress=None):
+    """Видаляє кошики, старші за `before` (за замовчуванням — за межею WINDOW), шматками."""
+    before = before or timezone.now() - WINDOW
+    stale = FingerprintBucket.objects.filter(created_at__lt=before).order_by().values_list('pk', flat=True)
+    total = 0
+    while True:
+        ids = list(stale[:chunk_size])
+        if not ids:
+            return total
+        # без сигналів і залежних рядків — один DELETE на шматок
+        total += FingerprintBucket.objects.filter(pk__in=ids).delete()[0]
+        if progress is not None:
+            progress(f"  ...{total} buckets")
+
+
+def refresh(post):
+    """Після редагування — перераховуємо відбиток (без перевірки на дублікати)."""
+    FingerprintBucket.objects.filter(post=post).delete()
+    PostFingerprint.objects.filter(post=post).delete()
+    return store(post)
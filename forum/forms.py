@@ -2,7 +2,7 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import get_user_model
 from .models import Profile, Thread, Post
-from forum.utils.html_sanitizer import sanitize_html
+from forum.utils.html_sanitizer import sanitize_post_html
 
 User = get_user_model()
 
@@ -47,6 +47,9 @@ class ThreadForm(forms.ModelForm):
         }
 
 class PostForm(forms.ModelForm):
+    # id користувачів, згаданих у тексті (заповнює clean_content) — для forum/mentions.py
+    mentioned_user_ids = frozenset()
+
     class Meta:
         model = Post
         fields = ["content"]
@@ -63,7 +66,8 @@ class PostForm(forms.ModelForm):
         if not raw_html.strip():
             raise forms.ValidationError("Повідомлення не може бути порожнім.")
 
-        safe_html = sanitize_html(raw_html)
+        # згадки й цитати розбираються тут один раз — у тексті лишаються готові посилання
+        safe_html, self.mentioned_user_ids = sanitize_post_html(raw_html)
 
         # додаткова перевірка: після очистки не повинно стати порожньо
         if not safe_html.strip():
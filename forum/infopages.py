@@ -0,0 +1,252 @@
+# forum/infopages.py
+"""
+Інформаційні сторінки (about, rules, faq): вміст змінюється лише з деплоєм.
+
+Для анонімів сторінка рендериться один раз — manage.py prerender_pages
+після collectstatic (start.sh) кладе HTML і його gzip у PRERENDERED_ROOT,
+а процес при першому зверненні читає їх у пам'ять (файлів немає —
+рендерить сам). Далі відповідь — готові байти з ETag і довгим
+Cache-Control, без шаблонів і без БД; If-None-Match дає 304.
+
+Залогіненим потрібна їхня шапка (аватар, сповіщення, CSRF для виходу),
+тож для них сторінка рендериться як звичайно, але контекст — константи
+модуля, а не словники, що збираються на кожен запит.
+"""
+import gzip
+from collections import namedtuple
+from hashlib import blake2b
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+MAX_AGE = getattr(settings, 'INFO_PAGES_MAX_AGE', 24 * 3600)
+
+Prerendered = namedtuple('Prerendered', 'body gzipped etag')
+
+DEVELOPER = {
+    "name": "Юрій Лапін",
+    "role": "Студент, розробник (Комп'ютерні науки)",
+    "location": "Львів, Україна",
+    "email": "Yurii.Lapin.PP.2024@lpnu.ua",
+    "photo": "/static/img/about/dev-photo.jpg",
+    "facts": [
+        "Навчаюся на 2 курсі, спеціальність Комп'ютерні науки.",
+        "Працював над декількома навчальними проєктами на Django і FastAPI.",
+        "Люблю інді-ігри",
+        "НЕ люблю мед !!!",
+    ],
+    "social": {
+        "github": "https://github.com/Yu-225",
+        "linkedin": "https://www.linkedin.com/in/yu-lapin-064902255/",
+    }
+}
+
+SITE_INFO = {
+    "title": "БочкаМеду",
+    "summary": "Міні-форум для обговорення ігор — UI-first, навчальний проєкт.",
+    "technologies": [
+        "Python - Django",
+        "HTMX (dynamic partial updates)",
+        "Bootstrap 5",
+        "Quill Rich Text Editor",
+        "SQLite (dev) ",
+    ],
+    "features": [
+        "Створення тем",
+        "Лайки, редагування постів, профілі",
+        "HTMX для плавного UX без повних перезавантажень",
+    ],
+    "github": "https://github.com/",
+    "license": "MIT",
+}
+
+RULES = [
+    {"title": "Дотримуйся поваги", "text": "Не допускаємо образ, ненависті, приниження. Обговорюємо аргументовано."},
+    {"title": "Чіткі теми", "text": "Створюй зрозумілі заголовки, додавай опис та теги."},
+    {"title": "Без спаму", "text": "Реклама і спам заборонені; рекламні пости погоджуй з модерацією."},
+    {"title": "Публічність контенту", "text": "Уникай публікації приватних даних інших людей."},
+    {"title": "Дотримуйся законів", "text": "Не публікуй незаконний або небезпечний контент."},
+]
+
+FAQS = [
+    # Загальні
+    {
+        "q": "Що це за форум?",
+        "a": "Це форум для обговорення ігор: новини, думки, гайди, інді та AAA-проєкти. Місце для спокійного й змістовного спілкування."
+    },
+    {
+        "q": "Для кого створений цей форум?",
+        "a": "Для геймерів, розробників, ентузіастів та всіх, хто хоче обговорювати ігри без токсичності."
+    },
+    {
+        "q": "Чи можна користуватися форумом без реєстрації?",
+        "a": "Так, переглядати теми можна без акаунту. Для створення тем і повідомлень потрібна реєстрація."
+    },
+
+    # Реєстрація
+    {
+        "q": "Чи потрібно реєструватись?",
+        "a": "Так, щоб писати повідомлення, ставити лайки та створювати теми."
+    },
+    {
+        "q": "Що робити, якщо я забув пароль?",
+        "a": "Скористайся формою відновлення пароля на сторінці входу."
+    },
+    {
+        "q": "Чи можна видалити акаунт?",
+        "a": "Так, через налаштування профілю або звернувшись до адміністрації."
+    },
+
+    # Профіль
+    {
+        "q": "Як змінити аватар?",
+        "a": "Зайди у Профіль → Редагувати та обери новий аватар."
+    },
+    {
+        "q": "Яку інформацію бачать інші користувачі?",
+        "a": "Нікнейм, аватар та активність на форумі. Особисті дані не публікуються."
+    },
+
+    # Теми та повідомлення
+    {
+        "q": "Як створити тему?",
+        "a": "Перейди у потрібну категорію і натисни кнопку «Створити тему» або скористайся кнопкою на головній сторінці."
+    },
+    {
+        "q": "У чому різниця між темою і повідомленням?",
+        "a": "Тема — це обговорення. Повідомлення — відповіді всередині теми."
+    },
+    {
+        "q": "Чи можна редагувати або видалити свій пост?",
+        "a": "Так, якщо він ще не порушує правила та не закритий модератором."
+    },
+    {
+        "q": "Чому я не можу відповісти в темі?",
+        "a": "Ймовірно, тема закрита або ти не авторизований."
+    },
+
+    # Лайки
+    {
+        "q": "Як працюють лайки?",
+        "a": "Ти можеш поставити або прибрати лайк під повідомленням. Кількість лайків показує популярність поста."
+    },
+    {
+        "q": "Чи можна прибрати лайк?",
+        "a": "Так, повторне натискання прибирає лайк."
+    },
+    {
+        "q": "Чому кількість лайків не оновилась одразу?",
+        "a": "Сторінка може оновлюватися асинхронно. Спробуй оновити сторінку."
+    },
+
+    # Модерація
+    {
+        "q": "Які основні правила форуму?",
+        "a": "Заборонені образи, спам, реклама без дозволу та токсична поведінка."
+    },
+    {
+        "q": "За що можуть забанити?",
+        "a": "За систематичні порушення правил або серйозні інциденти."
+    },
+    {
+        "q": "Чи можна оскаржити бан?",
+        "a": "Так, звернувшись до адміністрації форуму."
+    },
+
+    # Технічні
+    {
+        "q": "Чи працює форум на мобільних пристроях?",
+        "a": "Так, інтерфейс адаптований для смартфонів і планшетів."
+    },
+    {
+        "q": "Що робити, якщо сайт працює некоректно?",
+        "a": "Онови сторінку або повідом про помилку адміністрації."
+    },
+
+    # Інше
+    {
+        "q": "Чи плануються нові функції?",
+        "a": "Так, форум активно розвивається. Пропозиції вітаються."
+    },
+    {
+        "q": "Куди звертатися з питаннями?",
+        "a": "Пиши у відповідну тему або звертайся до адміністратора через сторінку «Про проєкт»."
+    },
+]
+
+# назва -> (шаблон, контекст)
+PAGES = {
+    'about': ('forum/about.html', {'developer': DEVELOPER, 'site_info': SITE_INFO}),
+    'rules': ('forum/rules.html', {'rules': RULES}),
+    'faq': ('forum/faq.html', {'faqs': FAQS}),
+}
+
+# готові сторінки цього процесу
+_prerendered = {}
+
+
+def _root():
+    return Path(getattr(settings, 'PRERENDERED_ROOT', Path(settings.BASE_DIR) / 'prerendered'))
+
+
+def _anonymous_request():
+    request = HttpRequest()
+    request.user = AnonymousUser()
+    return request
+
+
+def _pack(body):
+    return Prerendered(body, gzip.compress(body, 9, mtime=0), '"%s"' % blake2b(body, digest_size=16).hexdigest())
+
+
+def render_anonymous(name):
+    """HTML сторінки для аноніма — те саме, що віддав би звичайний render()."""
+    template, context = PAGES[name]
+    return render_to_string(template, context, _anonymous_request()).encode()
+
+
+def prerender(directory=None):
+    """Рендерить усі сторінки у файли <name>.html і <name>.html.gz (manage.py prerender_pages)."""
+    directory = Path(directory or _root())
+    directory.mkdir(parents=True, exist_ok=True)
+    written = []
+    for name in PAGES:
+        page = _pack(render_anonymous(name))
+        (directory / f'{name}.html').write_bytes(page.body)
+        (directory / f'{name}.html.gz').write_bytes(page.gzipped)
+        written.append((name, len(page.body), len(page.gzipped)))
+    _prerendered.clear()
+    return written
+
+
+def get(name):
+    page = _prerendered.get(name)
+    if page is None:
+        path = _root() / f'{name}.html'
+        # без prerender_pages (dev, тести) — рендеримо на першому зверненні
+        page = _pack(path.read_bytes() if path.exists() else render_anonymous(name))
+        _prerendered[name] = page
+    return page
+
+
+def serve(request, name):
+    if request.user.is_authenticated:
+        template, context = PAGES[name]
+        return render(request, template, context)
+
+    page = get(name)
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = HttpResponse(page.gzipped)
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(page.body)
+    response['ETag'] = page.etag
+    patch_cache_control(response, public=True, max_age=MAX_AGE)
+    # Cookie додає SessionMiddleware: залогіненим ця відповідь не підходить
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return get_conditional_response(request, etag=page.etag, response=response)
@@ -0,0 +1,41 @@
+# forum/management/commands/archive_threads.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from forum import archive
+
+
+class Command(BaseCommand):
+    help = "Move threads with no activity for N months out of forum_post into compressed ThreadArchive rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=24,
+                            help="Скільки місяців без нових постів, щоб тема вважалась холодною")
+        parser.add_argument('--limit', type=int, default=None,
+                            help="Максимум тем за один запуск")
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=30 * options['months'])
+        thread_ids = archive.cold_threads(cutoff)
+        if options['limit']:
+            thread_ids = thread_ids[:options['limit']]
+
+        if options['dry_run']:
+            self.stdout.write(f"{thread_ids.count()} threads would be archived (inactive since {cutoff:%Y-%m-%d}).")
+            return
+
+        threads = posts = 0
+        # кожна тема — своя коротка транзакція, тож команду можна перервати будь-коли
+        for thread_id in thread_ids.iterator():
+            archived = archive.archive_thread(thread_id)
+            if archived is None:
+                continue
+            threads += 1
+            posts += archived
+            if threads % 100 == 0:
+                self.stdout.write(f"  ...{threads} threads")
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {threads} threads ({posts} posts)."))
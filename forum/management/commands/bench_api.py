@@ -0,0 +1,110 @@
+# forum/management/commands/bench_api.py
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+
+from forum import stats
+from forum.models import Category, Post, Thread
+from forum.views import POSTS_PAGE_SIZE
+
+User = get_user_model()
+
+# як у category_page
+THREADS_PAGE_SIZE = 15
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the JSON API against the HTML pages it replaces for scrapers "
+        "(anonymous GETs through the test client, data rolled back). Run with DEBUG off"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=300)
+        parser.add_argument('--threads', type=int, default=300)
+        parser.add_argument('--requests', type=int, default=200)
+
+    def handle(self, *args, **options):
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=hosts):
+                self.run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, options):
+        users = [User.objects.create(username=f'bench-api-{i}') for i in range(20)]
+        category = Category.objects.create(title='bench-api')
+        with stats.suspended():
+            threads = Thread.objects.bulk_create([
+                Thread(title=f'Тема {i}', slug=f'bench-api-{i}', category=category, author=users[i % 20])
+                for i in range(options['threads'])
+            ])
+            thread = threads[-1]
+            text = '<p>' + 'Вулик на дві матки, рамки Дадана, весняний огляд. ' * 8 + '</p>'
+            for i in range(options['posts']):
+                Post.objects.create(thread=thread, author=users[i % 20], content=text)
+        return category, thread
+
+    def _measure(self, client, url, n):
+        response = client.get(url, secure=True)
+        assert response.status_code == 200, (url, response.status_code)
+        # CaptureQueriesContext тут не годиться: request_started чистить queries_log
+        queries = []
+        with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+            client.get(url, secure=True)
+        timings = []
+        for _ in range(n):
+            started = time.perf_counter()
+            client.get(url, secure=True)
+            timings.append(time.perf_counter() - started)
+        etag = response.get('ETag')
+        not_modified = None
+        if etag:
+            started = time.perf_counter()
+            for _ in range(n):
+                client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag)
+            not_modified = (time.perf_counter() - started) * 1000 / n
+        return {
+            'ms': statistics.median(timings) * 1000,
+            'rps': n / sum(timings),
+            'bytes': len(response.content),
+            'queries': len(queries),
+            'not_modified': not_modified,
+        }
+
+    def run(self, options):
+        category, thread = self._seed(options)
+        client = Client()
+        n = options['requests']
+        rows = [
+            ("thread page (HTML)", thread.get_absolute_url()),
+            ("thread posts (API)", f'/api/v1/threads/{thread.pk}/posts/?limit={POSTS_PAGE_SIZE}'),
+            ("  id,author,created_at", f'/api/v1/threads/{thread.pk}/posts/?limit={POSTS_PAGE_SIZE}'
+                                       f'&fields=id,author,created_at'),
+            ("category page (HTML)", category.get_absolute_url()),
+            ("category threads (API)", f'/api/v1/categories/{category.slug}/threads/?limit={THREADS_PAGE_SIZE}'),
+            ("  id,title", f'/api/v1/categories/{category.slug}/threads/?limit={THREADS_PAGE_SIZE}&fields=id,title'),
+        ]
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\n{n} anonymous GETs each; one page = {POSTS_PAGE_SIZE} posts / {THREADS_PAGE_SIZE} threads"
+        ))
+        self.stdout.write(f"  {'':<24} {'req/s':>8} {'p50 ms':>8} {'bytes':>8} {'queries':>8} {'304 ms':>8}")
+        for label, url in rows:
+            r = self._measure(client, url, n)
+            not_modified = f"{r['not_modified']:.2f}" if r['not_modified'] is not None else '—'
+            self.stdout.write(
+                f"  {label:<24} {r['rps']:>8.0f} {r['ms']:>8.2f} {r['bytes']:>8} {r['queries']:>8} {not_modified:>8}"
+            )
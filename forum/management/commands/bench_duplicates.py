@@ -0,0 +1,143 @@
+# forum/management/commands/bench_duplicates.py
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from forum import fingerprints
+from forum.models import FingerprintBucket, PostFingerprint
+
+WORDS = (
+    "мед бочка вулик пасіка липа гречка соняшник рамка віск пилок трутень матка рій "
+    "продам куплю знижка доставка дешево якісний натуральний акція телефон сайт "
+    "питання відповідь порада досвід зима весна літо осінь корпус сот нектар"
+).split()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark near-duplicate lookups against a synthetic LSH corpus "
+        "(default one million posts, rolled back at the end). Run with DEBUG off: "
+        "query logging skews sub-millisecond timings"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corpus', type=int, default=1_000_000)
+        parser.add_argument('--queries', type=int, default=1000)
+        parser.add_argument('--copies', type=int, default=20,
+                            help="Скільки змінених копій кожного оригіналу вже є в корпусі (спам-розсилка)")
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _text(self, rnd, n=60):
+        return '<p>' + ' '.join(rnd.choice(WORDS) for _ in range(n)) + '</p>'
+
+    def _mutate(self, rnd, html, edits=2):
+        words = html[3:-4].split()
+        for _ in range(edits):
+            words[rnd.randrange(len(words))] = rnd.choice(WORDS)
+        return '<p>' + ' '.join(words) + '</p>'
+
+    def run(self, options):
+        rnd = random.Random(7)
+        now = timezone.now()
+        # id далеко за межами справжніх постів; FK без обмеження в БД (db_constraint=False)
+        base_id = 10 ** 12
+        corpus, queries = options['corpus'], options['queries']
+
+        # справжні пости, до яких потім шукатимемо змінені копії, і їхні розсилки:
+        # `copies` майже-дублікатів кожного, зі справжніми підписами — кандидатів у
+        # кошиках стає стільки ж, скільки буває під час спам-атаки
+        originals = [self._text(rnd) for _ in range(queries)]
+        started = time.perf_counter()
+        signatures = [fingerprints.minhash(t) for t in originals]
+        hash_us = (time.perf_counter() - started) * 1e6 / queries
+        copies = options['copies']
+        self.stdout.write(f"Signing {queries * copies} near-duplicate copies...")
+        signatures += [
+            fingerprints.minhash(self._mutate(rnd, t, rnd.randint(1, 3))) for t in originals for _ in range(copies)
+        ]
+        real = len(signatures)
+        for start in range(0, real, options['batch_size']):
+            part = list(enumerate(signatures[start:start + options['batch_size']], start))
+            PostFingerprint.objects.bulk_create([
+                PostFingerprint(post_id=base_id + i, signature=fingerprints.pack(sig), created_at=now)
+                for i, sig in part
+            ])
+            FingerprintBucket.objects.bulk_create([
+                FingerprintBucket(key=key, post_id=base_id + i, created_at=now)
+                for i, sig in part for key in fingerprints.bucket_keys(sig)
+            ])
+
+        # решта корпусу — лише кошики з випадковими ключами: кошики непов'язаних текстів
+        # практично не перетинаються, а рахувати мільйон справжніх підписів у Python — хвилини
+        self.stdout.write(
+            f"Loading buckets for {corpus} posts ({real} signed, {corpus * fingerprints.BANDS} rows)..."
+        )
+        started = time.perf_counter()
+        # executemany напряму: bulk_create на мільйонах об'єктів — це переважно час ORM
+        table = FingerprintBucket._meta.db_table
+        sql = f"INSERT INTO {table} (key, post_id, created_at) VALUES (%s, %s, %s)"
+        created_at = connection.ops.adapt_datetimefield_value(now)
+        batch = []
+        with connection.cursor() as cursor:
+            for i in range(real, corpus):
+                for _ in range(fingerprints.BANDS):
+                    batch.append((rnd.getrandbits(63), base_id + i, created_at))
+                if len(batch) >= options['batch_size']:
+                    cursor.executemany(sql, batch)
+                    batch = []
+            if batch:
+                cursor.executemany(sql, batch)
+        self.stdout.write(f"  loaded in {time.perf_counter() - started:.1f}s")
+
+        def measure(texts, expected_ids=None):
+            timings, hits, candidates = [], 0, 0
+            for i, text in enumerate(texts):
+                signature = fingerprints.minhash(text)
+                started = time.perf_counter()
+                found = fingerprints.find_duplicates(signature)
+                timings.append((time.perf_counter() - started) * 1000)
+                candidates += len(found)
+                if expected_ids is not None and any(pid == expected_ids[i] for pid, _ in found):
+                    hits += 1
+                if expected_ids is None and found:
+                    hits += 1
+            timings.sort()
+            return {
+                'p50': statistics.median(timings),
+                'p99': timings[max(int(len(timings) * 0.99) - 1, 0)],
+                'hits': hits,
+                'matches': candidates / len(texts),
+            }
+
+        results = [
+            ("1 word changed", measure([self._mutate(rnd, t, 1) for t in originals], range(base_id, base_id + queries))),
+            ("3 words changed", measure([self._mutate(rnd, t, 3) for t in originals], range(base_id, base_id + queries))),
+            ("unrelated text", measure([self._text(rnd) for _ in range(queries)])),
+        ]
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\n{corpus} posts in the corpus ({copies} near-duplicates of each original), {queries} queries per row"
+        ))
+        self.stdout.write(f"  minhash of a 60-word post: {hash_us:.0f} µs")
+        for label, r in results:
+            kind = "false positives" if label == "unrelated text" else "found"
+            self.stdout.write(
+                f"  {label:<16} lookup p50 {r['p50']:.3f} ms, p99 {r['p99']:.3f} ms, {kind} {r['hits']}/{queries}, "
+                f"{r['matches']:.1f} matches per lookup"
+            )
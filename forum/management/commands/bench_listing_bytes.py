@@ -0,0 +1,151 @@
+# forum/management/commands/bench_listing_bytes.py
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from forum import stats
+from forum.models import Category, Post, Thread
+from forum.views import _category_threads, _profile_posts, _recent_posts
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _row_bytes(rows):
+    """Приблизний обсяг того, що БД віддала: текст у UTF-8, решта — по 8 байт."""
+    total = 0
+    for row in rows:
+        for value in row:
+            if value is None:
+                continue
+            if isinstance(value, str):
+                total += len(value.encode())
+            elif isinstance(value, (bytes, memoryview)):
+                total += len(value)
+            else:
+                total += 8
+    return total
+
+
+def _fetched(statements):
+    """Повторно виконує SELECT-и і рахує байти їхніх результатів."""
+    total = 0
+    with connection.cursor() as cursor:
+        for sql, params in statements:
+            if sql.lstrip().upper().startswith('SELECT'):
+                cursor.execute(sql, params)
+                total += _row_bytes(cursor.fetchall())
+    return total
+
+
+def _queryset_bytes(*querysets):
+    return _fetched([qs.query.sql_with_params() for qs in querysets])
+
+
+class Command(BaseCommand):
+    help = (
+        "Bytes fetched from the database per page for the post listings (index recent posts, "
+        "category last posts, profile posts): full rows before vs .only()/excerpt now (data rolled back)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=15, help="Тем у категорії (одна сторінка)")
+        parser.add_argument('--posts', type=int, default=40, help="Постів у кожній темі")
+
+    def handle(self, *args, **options):
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=hosts):
+                self.run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, options):
+        users = [User.objects.create(username=f'bench-listing-{i}') for i in range(10)]
+        category = Category.objects.create(title='bench-listing')
+        # типовий пост з редактора: кілька абзаців з розміткою, ~1.5 КБ HTML
+        text = (
+            '<p><strong>Весняний огляд.</strong> Вулик на дві матки, рамки Дадана, '
+            '<a href="https://example.com/hive">схема</a>.</p>' * 8
+            + '<ul><li>Корм</li><li>Розплід</li><li>Матка</li></ul>'
+        )
+        with stats.suspended():
+            for i in range(options['threads']):
+                thread = Thread.objects.create(title=f'Тема {i}', slug=f'bench-listing-{i}',
+                                               category=category, author=users[i % 10])
+                for j in range(options['posts']):
+                    Post.objects.create(thread=thread, author=users[j % 10], content=text)
+        return users[0], category
+
+    def _page_bytes(self, client, url):
+        # перший запит прогріває кеш карток авторів — рахуємо другий
+        client.get(url, secure=True)
+        statements = []
+
+        def capture(execute, sql, params, many, context):
+            statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(capture):
+            response = client.get(url, secure=True)
+        assert response.status_code == 200, (url, response.status_code)
+        return _fetched(statements)
+
+    def run(self, options):
+        user, category = self._seed(options)
+        threads_per_page = 15
+
+        # запити списків у тому вигляді, як вони були до excerpt і .only()
+        old_category_threads = (
+            category.threads.filter(deleted_at__isnull=True).select_related('category')
+            .annotate(posts_count=Count('posts')).order_by('-pinned', '-updated_at')[:threads_per_page]
+        )
+        before = {
+            "index": _queryset_bytes(
+                Post.objects.filter(thread__deleted_at__isnull=True).select_related('thread')
+                .order_by('-created_at')[:5]
+            ),
+            "category": _queryset_bytes(
+                old_category_threads,
+                # prefetch_related('posts'): усі пости кожної теми сторінки, щоб узяти перший
+                Post.objects.filter(thread__in=[t.pk for t in old_category_threads]).order_by('-created_at'),
+            ),
+            "profile": _queryset_bytes(
+                Post.objects.filter(author=user, thread__deleted_at__isnull=True).select_related('thread')
+                .order_by('-created_at')[:10]
+            ),
+        }
+        after = {
+            "index": _queryset_bytes(_recent_posts()[:5]),
+            "category": _queryset_bytes(_category_threads(category)[:threads_per_page]),
+            "profile": _queryset_bytes(_profile_posts(user)[:10]),
+        }
+
+        client = Client()
+        client.force_login(user)
+        pages = {
+            "index": reverse('index'),
+            "category": category.get_absolute_url(),
+            "profile": reverse('profile_view', args=[user.username]),
+        }
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\nBytes fetched from the DB ({options['threads']} threads x {options['posts']} posts, logged in)"
+        ))
+        self.stdout.write(f"  {'':<10} {'listing before':>15} {'after':>9}   {'page before':>12} {'after':>9}")
+        for label, url in pages.items():
+            page_after = self._page_bytes(client, url)
+            # остання колонка виміряна, передостання — та сама сторінка зі старим запитом списку
+            page_before = page_after - after[label] + before[label]
+            self.stdout.write(
+                f"  {label:<10} {before[label]:>15,} {after[label]:>9,}   {page_before:>12,} {page_after:>9,}"
+            )
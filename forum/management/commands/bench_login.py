@@ -0,0 +1,76 @@
+# forum/management/commands/bench_login.py
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.test import Client
+from django.test.utils import override_settings
+
+from forum.models import Profile
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+def legacy_profile_handler(sender, instance, created, **kwargs):
+    # як було до міграції 0012: get_or_create профілю на кожне збереження User
+    if created:
+        Profile.objects.create(user=instance)
+    else:
+        Profile.objects.get_or_create(user=instance)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark login throughput with the current User post_save handlers vs the old "
+        "per-save profile get_or_create (fast password hasher, data rolled back)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=500)
+
+    def handle(self, *args, **options):
+        # хешування пароля (PBKDF2) інакше з'їло б усю різницю
+        fast = override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+        try:
+            with transaction.atomic(), fast:
+                self.run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _login(self, user, n):
+        client = Client()
+        queries = []
+
+        def count(execute, sql, *args):
+            queries.append(sql)
+            return execute(sql, *args)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count):
+            for _ in range(n):
+                assert client.login(username=user.username, password='bench-login')
+                client.logout()
+        elapsed = time.perf_counter() - started
+        return n / elapsed, len(queries) / n
+
+    def run(self, options):
+        user = User.objects.create_user('bench-login', password='bench-login')
+        n = options['logins']
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{n} logins (login + logout, MD5 hasher)"))
+        current = self._login(user, n)
+        post_save.connect(legacy_profile_handler, sender=User, dispatch_uid='bench_login_legacy')
+        try:
+            legacy = self._login(user, n)
+        finally:
+            post_save.disconnect(sender=User, dispatch_uid='bench_login_legacy')
+
+        for label, (rate, queries) in (("legacy get_or_create", legacy), ("current", current)):
+            self.stdout.write(f"  {label:<22} {rate:>8.0f} logins/s  {queries:>5.1f} queries per login")
@@ -0,0 +1,94 @@
+# forum/management/commands/bench_partials.py
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from forum import stats
+from forum.models import Category, Post, Thread
+
+User = get_user_model()
+
+# заголовки, з якими htmx робить навігацію по hx-boost посиланню
+BOOSTED = {'HTTP_HX_REQUEST': 'true', 'HTTP_HX_BOOSTED': 'true'}
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark full pages vs their hx-boost partials (content block only, no sidebar queries) "
+        "for index, category, thread and profile (logged-in user, data rolled back)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=200)
+
+    def handle(self, *args, **options):
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=hosts):
+                self.run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, options):
+        users = [User.objects.create(username=f'bench-partials-{i}') for i in range(20)]
+        category = Category.objects.create(title='bench-partials')
+        with stats.suspended():
+            threads = Thread.objects.bulk_create([
+                Thread(title=f'Тема {i}', slug=f'bench-partials-{i}', category=category, author=users[i % 20])
+                for i in range(options['threads'])
+            ])
+            thread = threads[-1]
+            text = '<p>' + 'Вулик на дві матки, рамки Дадана, весняний огляд. ' * 8 + '</p>'
+            for i in range(options['posts']):
+                Post.objects.create(thread=thread, author=users[i % 20], content=text)
+        return users[0], category, thread
+
+    def _measure(self, client, url, n, headers):
+        response = client.get(url, secure=True, **headers)
+        assert response.status_code == 200, (url, response.status_code)
+        # CaptureQueriesContext тут не годиться: request_started чистить queries_log
+        queries = []
+        with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+            client.get(url, secure=True, **headers)
+        timings = []
+        for _ in range(n):
+            started = time.perf_counter()
+            client.get(url, secure=True, **headers)
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings) * 1000, len(response.content), len(queries)
+
+    def run(self, options):
+        user, category, thread = self._seed(options)
+        client = Client()
+        client.force_login(user)
+        n = options['requests']
+        pages = [
+            ("index", reverse('index')),
+            ("category", category.get_absolute_url()),
+            ("thread", thread.get_absolute_url()),
+            ("profile", reverse('profile_view', args=[user.username])),
+        ]
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{n} GETs each, logged in: full page vs hx-boost partial"))
+        self.stdout.write(f"  {'':<10} {'p50 ms':>15} {'bytes':>17} {'queries':>9}")
+        for label, url in pages:
+            full = self._measure(client, url, n, {})
+            partial = self._measure(client, url, n, BOOSTED)
+            self.stdout.write(
+                f"  {label:<10} {full[0]:>6.2f} -> {partial[0]:>5.2f} {full[1]:>7} -> {partial[1]:>6} "
+                f"{full[2]:>3} -> {partial[2]:>2}"
+            )
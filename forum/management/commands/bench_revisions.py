@@ -0,0 +1,93 @@
+# forum/management/commands/bench_revisions.py
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.db.models.functions import Length
+from django.test.utils import CaptureQueriesContext
+
+from forum import revisions
+from forum.models import Category, Post, PostRevision, Thread
+
+User = get_user_model()
+
+WORDS = "мед бочка вулик пасіка липа гречка соняшник рамка віск пилок трутень матка рій".split()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark post revision storage and reconstruction cost vs revision depth (all data rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--edits', type=int, default=200)
+        parser.add_argument('--paragraphs', type=int, default=12, help="Розмір поста")
+        parser.add_argument('--snapshot-every', default='0,10,50',
+                            help="Через кому; 0 — без періодичних знімків (лише оригінал)")
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        for every in [int(x) for x in options['snapshot_every'].split(',')]:
+            try:
+                with transaction.atomic():
+                    self.run(every, options)
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _edit(self, rnd, content):
+        paragraphs = content.split('</p>')[:-1]
+        i = rnd.randrange(len(paragraphs))
+        words = paragraphs[i].removeprefix('<p>').split()
+        words[rnd.randrange(len(words))] = rnd.choice(WORDS)
+        if rnd.random() < 0.3:
+            words.append(rnd.choice(WORDS))
+        paragraphs[i] = '<p>' + ' '.join(words)
+        return '</p>'.join(paragraphs) + '</p>'
+
+    def run(self, every, options):
+        rnd = random.Random(42)
+        user = User.objects.create(username=f'bench-revisions-{every}')
+        category = Category.objects.create(title=f'bench-revisions-{every}')
+        thread = Thread.objects.create(title='bench', category=category, author=user)
+        content = ''.join(
+            '<p>' + ' '.join(rnd.choice(WORDS) for _ in range(40)) + '</p>'
+            for _ in range(options['paragraphs'])
+        )
+        post = Post.objects.create(thread=thread, author=user, content=content)
+
+        versions = [content]
+        started = time.perf_counter()
+        for _ in range(options['edits']):
+            old = post.content
+            while post.content == old:
+                post.content = self._edit(rnd, old)
+            Post.objects.filter(pk=post.pk).update(content=post.content)
+            revisions.record_edit(post, old, editor=user, snapshot_every=every)
+            versions.append(post.content)
+        write_ms = (time.perf_counter() - started) * 1000 / options['edits']
+
+        stored = PostRevision.objects.filter(post=post).aggregate(n=Sum(Length('data')))['n']
+        full = sum(len(v) for v in versions)
+        label = f"every {every}" if every else "no periodic snapshots"
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{label}: {options['edits']} edits of a {len(content)}-char post"))
+        self.stdout.write(f"  storage: {stored} chars vs {full} as full copies ({stored / full:.1%}); "
+                          f"{write_ms:.2f} ms per edit")
+
+        self.stdout.write(f"  {'revision':>9} {'rows read':>10} {'ms':>8}")
+        depths = sorted({1, 5, 9, 10, 25, 49, 50, 100, options['edits'] // 2, options['edits']} - {0})
+        for number in [d for d in depths if d <= options['edits']]:
+            with CaptureQueriesContext(connection) as queries:
+                result = revisions.content_at(post.pk, number)
+            assert result == versions[number], f"revision {number} reconstructed incorrectly"
+            rows = len(revisions._chain(post.pk, number))
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                revisions.content_at(post.pk, number)
+            ms = (time.perf_counter() - started) * 1000 / options['repeat']
+            self.stdout.write(f"  {number:>9} {rows:>10} {ms:>8.2f}   ({len(queries)} query)")
@@ -0,0 +1,101 @@
+# forum/management/commands/bench_sessions.py
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from forum.models import Category, Post, Thread
+
+User = get_user_model()
+
+# (підпис, SESSION_ENGINE, MESSAGE_STORAGE); перший рядок — як було до SESSION_BACKEND
+MODES = [
+    ("db + fallback (before)", 'db', 'fallback.FallbackStorage'),
+    ("db + cookie", 'db', 'cookie.CookieStorage'),
+    ("cached_db + cookie", 'cached_db', 'cookie.CookieStorage'),
+    ("signed_cookies + cookie", 'signed_cookies', 'cookie.CookieStorage'),
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Count DB queries per authenticated page view (and how many hit django_session) "
+        "for each session backend / message storage (data rolled back)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--views', type=int, default=20,
+                            help="Скільки разів пройти набір сторінок")
+
+    def handle(self, *args, **options):
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=hosts):
+                self.run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self):
+        user = User.objects.create_user('bench-sessions', password='bench-sessions')
+        category = Category.objects.create(title='bench-sessions')
+        thread = Thread.objects.create(title='Тема', slug='bench-sessions', category=category, author=user)
+        post = Post.objects.create(thread=thread, author=user, content='<p>Перший пост</p>')
+        return user, category, thread, post
+
+    def _count(self, client, requests):
+        """(усього запитів, з них до django_session) на прохід по requests."""
+        queries = []
+
+        def count(execute, sql, *args):
+            queries.append(sql)
+            return execute(sql, *args)
+
+        with connection.execute_wrapper(count):
+            for method, url, data in requests:
+                response = getattr(client, method)(url, data, secure=True, follow=True)
+                assert response.status_code == 200, (url, response.status_code)
+        return len(queries), sum('django_session' in sql for sql in queries)
+
+    def run(self, options):
+        user, category, thread, post = self._seed()
+        n = options['views']
+        pages = [
+            ('get', reverse('index'), None),
+            ('get', category.get_absolute_url(), None),
+            ('get', thread.get_absolute_url(), None),
+            ('get', reverse('notifications'), None),
+            ('get', reverse('profile'), None),
+        ]
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\nDB queries per authenticated request ({len(pages)} pages x {n}; edit = POST + redirect)"
+        ))
+        self.stdout.write(f"  {'':<26} {'page':>6} {'session':>8} {'edit':>6} {'session':>8}")
+        for label, engine, storage in MODES:
+            with override_settings(
+                SESSION_ENGINE=f'django.contrib.sessions.backends.{engine}',
+                MESSAGE_STORAGE=f'django.contrib.messages.storage.{storage}',
+            ):
+                cache.clear()
+                client = Client()
+                client.force_login(user)
+                # перший прохід прогріває кеш сесії і ліниві частини застосунку
+                self._count(client, pages)
+                total, session = self._count(client, pages * n)
+                # POST -> messages.success -> редірект на тему, де повідомлення показується;
+                # текст щоразу новий, щоб кожен режим робив ту саму роботу
+                edit = ('post', reverse('post_edit', args=[post.pk]), {'content': f'<p>Редаговано: {label}</p>'})
+                edit_total, edit_session = self._count(client, [edit])
+            views = len(pages) * n
+            self.stdout.write(
+                f"  {label:<26} {total / views:>6.1f} {session / views:>8.1f} {edit_total:>6} {edit_session:>8}"
+            )
@@ -0,0 +1,108 @@
+# forum/management/commands/bench_startup.py
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# окремий процес: імпорт застосунку, перший і другий запит через WSGI
+# напряму (без сервера), час — від старту інтерпретатора
+FIRST_REQUEST = r'''
+import io, json, sys, time
+started = time.perf_counter()
+import myforum.wsgi
+imported = time.perf_counter()
+
+def request():
+    environ = {
+        "REQUEST_METHOD": "GET", "PATH_INFO": sys.argv[1], "QUERY_STRING": "",
+        "SERVER_NAME": sys.argv[2], "SERVER_PORT": "443", "HTTP_HOST": sys.argv[2],
+        "SERVER_PROTOCOL": "HTTP/1.1", "wsgi.url_scheme": "https", "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr, "wsgi.multithread": False, "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    status = []
+    body = b"".join(myforum.wsgi.application(environ, lambda s, h, e=None: status.append(s)))
+    return status[0], len(body)
+
+status, size = request()
+first = time.perf_counter()
+request()
+second = time.perf_counter()
+print(json.dumps({
+    "status": status, "bytes": size, "import": imported - started,
+    "first": first - imported, "second": second - first,
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure worker startup: `python -X importtime` of the WSGI app and time to first "
+        "request, with and without the WSGI_WARMUP preload (separate processes)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--path', default='/')
+        parser.add_argument('--top', type=int, default=12,
+                            help="Скільки найважчих пакетів показати з -X importtime")
+
+    def _env(self, warmup):
+        env = dict(os.environ, WSGI_WARMUP='1' if warmup else '0')
+        env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+        return env
+
+    def _host(self):
+        hosts = [h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*']
+        return hosts[0] if hosts else 'localhost'
+
+    def _importtime(self, warmup):
+        """Власний час імпорту (self), згрупований за пакетом верхнього рівня, і загальний."""
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import myforum.wsgi'],
+            env=self._env(warmup), capture_output=True, text=True, check=True,
+        )
+        by_package = defaultdict(int)
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            own, _, name = line[len('import time:'):].split('|')
+            by_package[name.strip().split('.')[0]] += int(own)
+        return sum(by_package.values()) / 1000, sorted(by_package.items(), key=lambda kv: -kv[1])
+
+    def _first_request(self, warmup, path, runs):
+        samples = defaultdict(list)
+        for _ in range(runs):
+            result = subprocess.run(
+                [sys.executable, '-c', FIRST_REQUEST, path, self._host()],
+                env=self._env(warmup), capture_output=True, text=True, check=True,
+            )
+            data = json.loads(result.stdout.splitlines()[-1])
+            for key in ('import', 'first', 'second'):
+                samples[key].append(data[key] * 1000)
+        return data['status'], {key: statistics.median(values) for key, values in samples.items()}
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.MIGRATE_HEADING("\npython -X importtime -c 'import myforum.wsgi'"))
+        for warmup in (False, True):
+            total, packages = self._importtime(warmup)
+            top = ', '.join(f"{name} {us / 1000:.0f}" for name, us in packages[:options['top']])
+            self.stdout.write(f"  WSGI_WARMUP={int(warmup)}  {total:>7.0f} ms total; heaviest (ms): {top}")
+
+        runs, path = options['runs'], options['path']
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\nTime to first request GET {path} (median of {runs} processes, ms)"))
+        self.stdout.write(f"  {'':<14} {'import':>8} {'1st req':>8} {'2nd req':>8} {'to 1st':>8}")
+        for warmup in (False, True):
+            status, ms = self._first_request(warmup, path, runs)
+            self.stdout.write(
+                f"  WSGI_WARMUP={int(warmup)} {ms['import']:>8.0f} {ms['first']:>8.1f} {ms['second']:>8.1f} "
+                f"{ms['import'] + ms['first']:>8.0f}  ({status})"
+            )
+        self.stdout.write(
+            "  з --preload стовпчик import платить лише майстер gunicorn; воркер після fork — тільки 1st req"
+        )
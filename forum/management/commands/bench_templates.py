@@ -0,0 +1,136 @@
+# forum/management/commands/bench_templates.py
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Count
+from django.template import engines
+from django.test import Client, RequestFactory
+from django.test.utils import override_settings
+
+from forum import stats, templating
+from forum.forms import PostForm
+from forum.models import Category, Post, Thread
+from forum.views import _decorate_posts
+
+User = get_user_model()
+
+# той самий цикл, що й у templates/forum/thread.html (#posts)
+DTL_POST_LOOP = "{% for p in posts %}{% include 'forum/_post.html' with p=p %}{% endfor %}"
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark DTL vs Jinja2 (JINJA2_POST_LOOP) for the post loop and thread/category pages "
+        "on identical context (data rolled back)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,30,50', help="Скільки кореневих постів на сторінці теми")
+        parser.add_argument('--replies', type=int, default=3, help="Відповідей у кожній гілці")
+        parser.add_argument('--renders', type=int, default=100)
+
+    def handle(self, *args, **options):
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=hosts):
+                self.run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, size, replies):
+        users = [User.objects.get_or_create(username=f'bench-templates-{i}')[0] for i in range(10)]
+        category = Category.objects.get_or_create(title='bench-templates')[0]
+        thread = Thread.objects.create(title=f'Тема на {size}', slug=f'bench-templates-{size}',
+                                       category=category, author=users[0])
+        text = '<p>' + 'Вулик на дві матки, рамки Дадана, весняний огляд. ' * 4 + '</p>'
+        with stats.suspended():
+            for i in range(size):
+                root = Post.objects.create(thread=thread, author=users[i % 10], content=text)
+                for j in range(replies):
+                    Post.objects.create(thread=thread, author=users[j % 10], content=text, parent=root)
+        return users[0], category, thread
+
+    def _time(self, n, render):
+        timings = []
+        for _ in range(n):
+            started = time.perf_counter()
+            render()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings) * 1000
+
+    def _thread_context(self, request, thread, size):
+        posts = list(
+            thread.posts.filter(parent__isnull=True)
+            .prefetch_related('likes')
+            .annotate(replies_count=Count('replies'))
+            .order_by('created_at')
+        )
+        _decorate_posts(request, posts)
+        # як ?open=<id>: одна гілка розгорнута
+        posts[0].subtree_posts = _decorate_posts(request, posts[0].subtree().prefetch_related('likes'))
+        return {
+            'thread': thread,
+            'posts': Paginator(posts, size).get_page(1),
+            'post_form': PostForm(),
+            'thread_can_edit': True,
+            'thread_can_reply': True,
+            'request_user': request.user,
+            'is_subscribed': False,
+            'base_template': 'base.html',
+        }
+
+    def run(self, options):
+        n = options['renders']
+        dtl_loop = engines['django'].from_string(DTL_POST_LOOP)
+        jinja_loop = engines['jinja2'].get_template('forum/_post_list.html')
+        dtl_page = engines['django'].get_template('forum/thread.html')
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\nRender only, identical context (median of {n}, ms); one thread opened with {options['replies']} replies"
+        ))
+        self.stdout.write(f"  {'posts':>5}  {'loop DTL':>9} {'Jinja2':>7} {'x':>5}   {'page DTL':>9} {'+Jinja2':>8} {'x':>5}")
+        for size in map(int, options['sizes'].split(',')):
+            user, category, thread = self._seed(size, options['replies'])
+            request = RequestFactory().get(thread.get_absolute_url())
+            request.user = user
+            context = self._thread_context(request, thread, size)
+
+            loop_dtl = self._time(n, lambda: dtl_loop.render(context, request))
+            loop_jinja = self._time(n, lambda: jinja_loop.render(context, request))
+
+            def page_jinja():
+                with override_settings(JINJA2_POST_LOOP=True):
+                    html = templating.render_loop('forum/_post_list.html', context, request)
+                return dtl_page.render({**context, 'posts_html': html}, request)
+
+            page_dtl = self._time(n, lambda: dtl_page.render(context, request))
+            page_j = self._time(n, page_jinja)
+            self.stdout.write(
+                f"  {size:>5}  {loop_dtl:>9.2f} {loop_jinja:>7.2f} {loop_dtl / loop_jinja:>4.1f}x"
+                f"   {page_dtl:>9.2f} {page_j:>8.2f} {page_dtl / page_j:>4.1f}x"
+            )
+
+        # цілі view через test client: запити до БД ті самі, різниця — лише рендер
+        client = Client()
+        client.force_login(user)
+        urls = [("thread", thread.get_absolute_url() + f"?open={context['posts'][0].pk}"),
+                ("category", category.get_absolute_url())]
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\nWhole view, logged in (median of {n}, ms)"))
+        self.stdout.write(f"  {'':<10} {'DTL':>7} {'Jinja2':>7}")
+        for label, url in urls:
+            timings = []
+            for flag in (False, True):
+                with override_settings(JINJA2_POST_LOOP=flag):
+                    client.get(url, secure=True)
+                    timings.append(self._time(n, lambda: client.get(url, secure=True)))
+            self.stdout.write(f"  {label:<10} {timings[0]:>7.2f} {timings[1]:>7.2f}")
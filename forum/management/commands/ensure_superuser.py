@@ -0,0 +1,28 @@
+# forum/management/commands/ensure_superuser.py
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the superuser from DJANGO_SUPERUSER_USERNAME / _EMAIL / _PASSWORD "
+        "unless it already exists (idempotent; run by start.sh when CREATE_SUPERUSER=1)"
+    )
+
+    def handle(self, *args, **options):
+        try:
+            username = os.environ["DJANGO_SUPERUSER_USERNAME"]
+            email = os.environ["DJANGO_SUPERUSER_EMAIL"]
+            password = os.environ["DJANGO_SUPERUSER_PASSWORD"]
+        except KeyError as e:
+            raise CommandError(f"{e.args[0]} is not set")
+
+        if User.objects.filter(username=username).exists():
+            self.stdout.write(f"Superuser {username} already exists.")
+            return
+        User.objects.create_superuser(username, email, password)
+        self.stdout.write(self.style.SUCCESS(f"Superuser {username} created."))
@@ -0,0 +1,305 @@
+# forum/management/commands/import_forum.py
+import re
+import sqlite3
+
+import orjson
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from forum import archive, readtracking
+from forum.models import Category, Post, PostLike, Profile, Thread
+from forum.utils.dataset import SUPPORTED_VERSIONS, keep_timestamps, open_stream
+
+User = get_user_model()
+
+# цитата, збережена sanitize_post_html: <a href="/p/<id>/" class="quote-ref" ...>&gt;&gt;<id></a>
+QUOTE_RE = re.compile(r'<a href="/p/(\d+)/"([^>]*)>&gt;&gt;\d+</a>')
+
+
+def remap_quotes(content, posts):
+    """Посилання-цитати на старі id постів -> нові; пост, якого немає в дампі, — просто текст."""
+    def replace(match):
+        new = posts.get(int(match[1]))
+        if new is None:
+            return f'&gt;&gt;{match[1]}'
+        return f'<a href="/p/{new}/"{match[2]}>&gt;&gt;{new}</a>'
+    return QUOTE_RE.sub(replace, content)
+
+
+def quoted_ids(content):
+    return [int(match[1]) for match in QUOTE_RE.finditer(content)]
+
+
+class ImportState:
+    """
+    Побічний SQLite-файл: відповідність старих id новим і що вже імпортовано.
+    Мапа лежить на диску, а не в пам'яті — тож пам'ять імпорту не росте з
+    розміром дампу, а перерваний імпорт можна просто запустити ще раз.
+    """
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS idmap ("
+            " kind TEXT NOT NULL, old INTEGER NOT NULL, new INTEGER,"
+            " PRIMARY KEY (kind, old))"
+        )
+        # пости, що цитують ще не імпортовані (пізніші за id) — їх цитати перемапимо наприкінці
+        self.conn.execute("CREATE TABLE IF NOT EXISTS deferred_quotes (post INTEGER PRIMARY KEY)")
+        self.conn.commit()
+
+    def lookup(self, kind, old_ids):
+        old_ids = list({i for i in old_ids if i is not None})
+        result = {}
+        # ліміт параметрів SQLite — шматками по 500
+        for i in range(0, len(old_ids), 500):
+            part = old_ids[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT old, new FROM idmap WHERE kind = ? AND old IN ({','.join('?' * len(part))})",
+                [kind, *part],
+            )
+            result.update(rows)
+        return result
+
+    def remember(self, kind, pairs):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO idmap (kind, old, new) VALUES (?, ?, ?)",
+            [(kind, old, new) for old, new in pairs],
+        )
+
+    def defer_quotes(self, post_ids):
+        self.conn.executemany("INSERT OR IGNORE INTO deferred_quotes (post) VALUES (?)", [(i,) for i in post_ids])
+
+    def deferred_quotes(self):
+        return [pk for pk, in self.conn.execute("SELECT post FROM deferred_quotes ORDER BY post")]
+
+    def forget_deferred(self, post_ids):
+        self.conn.executemany("DELETE FROM deferred_quotes WHERE post = ?", [(i,) for i in post_ids])
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Import an export_forum NDJSON(.gz) dump in batches with foreign-key remapping. "
+        "Resumable: progress is kept in <path>.state.sqlite3, rerun the same command after an interruption."
+    )
+
+    # ключ запису, за яким відстежуємо "вже імпортовано"
+    STATE_KEYS = {'profile': 'user_id'}
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--state', help="Файл стану (за замовчуванням <path>.state.sqlite3)")
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.state = ImportState(options['state'] or f"{options['path']}.state.sqlite3")
+        self.counts = {}
+
+        try:
+            with open_stream(options['path'], 'rb') as src, keep_timestamps():
+                kind, batch = None, []
+                for line in src:
+                    if not line.strip():
+                        continue
+                    record = orjson.loads(line)
+                    record_kind = record.pop('type')
+                    if record_kind == 'meta':
+                        if record.get('version') not in SUPPORTED_VERSIONS:
+                            raise CommandError(f"Unsupported dump version: {record.get('version')}")
+                        continue
+                    if record_kind != kind or len(batch) >= self.batch_size:
+                        self.flush(kind, batch)
+                        kind, batch = record_kind, []
+                    batch.append(record)
+                self.flush(kind, batch)
+            self.remap_deferred_quotes()
+        finally:
+            self.state.close()
+
+        for kind, count in self.counts.items():
+            self.stdout.write(f"  {kind}: {count} imported")
+
+        # bulk_create користувачів не викликає сигнал, що створює профіль, — дамп
+        # без записів profile лишив би їх без нього
+        missing = list(User.objects.filter(profile__isnull=True).values_list('pk', flat=True))
+        Profile.objects.bulk_create([Profile(user_id=pk) for pk in missing], batch_size=self.batch_size)
+
+        # денормалізоване — одним проходом після імпорту (bulk_create не викликає сигнали)
+        self.stdout.write("Refreshing thread last posts and user stats...")
+        readtracking.refresh_last_post(Thread.objects.all())
+        call_command('rebuild_user_stats', stdout=self.stdout)
+
+        # теми, що в дампі були архівними, прийшли з гарячими постами — архівуємо
+        # знову (після статистики: архівні пости лишаються "написаними")
+        pending = list(
+            Thread.objects.filter(archived=True, archive__isnull=True).order_by('pk').values_list('pk', flat=True)
+        )
+        if pending:
+            self.stdout.write(f"Archiving {len(pending)} threads that were archived in the dump...")
+        for pk in pending:
+            with transaction.atomic():
+                Thread.objects.filter(pk=pk).update(archived=False)
+                archive.archive_thread(pk)
+        self.stdout.write(self.style.SUCCESS("Import completed."))
+
+    def flush(self, kind, batch):
+        if not batch:
+            return
+        key = self.STATE_KEYS.get(kind, 'id')
+        done = self.state.lookup(kind, [r[key] for r in batch])
+        # без id (лайки архівних тем) стан не ведемо — повтор пропустить ignore_conflicts
+        todo = [r for r in batch if r[key] is None or r[key] not in done]
+        if not todo:
+            return
+
+        with transaction.atomic():
+            pairs = getattr(self, f'import_{kind}')(todo)
+            self.state.remember(kind, [(old, new) for old, new in pairs if old is not None])
+        # мапа фіксується одразу після коміту батча в БД форуму
+        self.state.commit()
+        self.counts[kind] = self.counts.get(kind, 0) + len(pairs)
+
+    # --- імпорт по типах; кожен повертає [(old_id, new_id), ...] ---
+
+    def import_user(self, rows):
+        existing = dict(
+            User.objects.filter(username__in=[r['username'] for r in rows]).values_list('username', 'pk')
+        )
+        new_rows = [r for r in rows if r['username'] not in existing]
+        created = User.objects.bulk_create(
+            [User(**{k: v for k, v in r.items() if k != 'id'}) for r in new_rows]
+        )
+        existing.update((u.username, u.pk) for u in created)
+        return [(r['id'], existing[r['username']]) for r in rows]
+
+    def import_profile(self, rows):
+        users = self.state.lookup('user', [r['user_id'] for r in rows])
+        have = set(Profile.objects.filter(user_id__in=users.values()).values_list('user_id', flat=True))
+        profiles = []
+        for r in rows:
+            new_user = users.get(r['user_id'])
+            if new_user is None or new_user in have:
+                continue
+            profiles.append(Profile(**{**r, 'user_id': new_user}))
+        Profile.objects.bulk_create(profiles)
+        return [(r['user_id'], users.get(r['user_id'])) for r in rows]
+
+    def import_category(self, rows):
+        existing = {}
+        for pk, slug, title in Category.objects.filter(
+            Q(slug__in=[r['slug'] for r in rows]) | Q(title__in=[r['title'] for r in rows])
+        ).values_list('pk', 'slug', 'title'):
+            existing[slug] = existing[title] = pk
+
+        pairs, new_rows = [], []
+        for r in rows:
+            pk = existing.get(r['slug']) or existing.get(r['title'])
+            if pk:
+                pairs.append((r['id'], pk))
+            else:
+                new_rows.append(r)
+        created = Category.objects.bulk_create(
+            [Category(**{k: v for k, v in r.items() if k != 'id'}) for r in new_rows]
+        )
+        pairs += [(r['id'], c.pk) for r, c in zip(new_rows, created)]
+        return pairs
+
+    def import_thread(self, rows):
+        categories = self.state.lookup('category', [r['category_id'] for r in rows])
+        users = self.state.lookup('user', [r['author_id'] for r in rows])
+        taken = set(Thread.objects.filter(slug__in=[r['slug'] for r in rows]).values_list('slug', flat=True))
+
+        threads, sources = [], []
+        for r in rows:
+            if r['category_id'] not in categories or r['author_id'] not in users:
+                continue
+            slug = r['slug'] if r['slug'] not in taken else f"{r['slug']}-{r['id']}"
+            threads.append(Thread(**{
+                **{k: v for k, v in r.items() if k != 'id'},
+                'slug': slug,
+                'category_id': categories[r['category_id']],
+                'author_id': users[r['author_id']],
+            }))
+            sources.append(r['id'])
+        created = Thread.objects.bulk_create(threads)
+        return [(old, t.pk) for old, t in zip(sources, created)]
+
+    def import_post(self, rows):
+        threads = self.state.lookup('thread', [r['thread_id'] for r in rows])
+        users = self.state.lookup('user', [r['author_id'] for r in rows])
+        # батьки й цитовані з попередніх батчів; з цього батча — після bulk_create
+        known = self.state.lookup('post', [
+            *(r['parent_id'] for r in rows), *(pk for r in rows for pk in quoted_ids(r['content']))
+        ])
+
+        # старий id < id відповіді, тож у порядку id батьки йдуть раніше за дітей
+        rows = sorted(
+            (r for r in rows if r['thread_id'] in threads and r['author_id'] in users), key=lambda r: r['id']
+        )
+        created = Post.objects.bulk_create([
+            Post(**{
+                **{k: v for k, v in r.items() if k not in ('id', 'parent_id')},
+                'thread_id': threads[r['thread_id']],
+                'author_id': users[r['author_id']],
+            })
+            for r in rows
+        ])
+        ids = {**known, **{r['id']: p.pk for r, p in zip(rows, created)}}
+
+        # materialized path: батьки з попередніх батчів — одним запитом, з цього — з пам'яті
+        paths = dict(Post.objects.filter(pk__in=[ids[r['parent_id']] for r in rows if r['parent_id'] in known])
+                     .values_list('pk', 'path'))
+        deferred = []
+        for r, p in zip(rows, created):
+            p.parent_id = ids.get(r['parent_id'])
+            p.path = Post.make_path(paths.get(p.parent_id, '') if p.parent_id else '', p.pk)
+            paths[p.pk] = p.path
+            quoted = quoted_ids(r['content'])
+            if any(pk not in ids for pk in quoted):
+                deferred.append(p.pk)
+            elif quoted:
+                p.content = remap_quotes(r['content'], ids)
+            # bulk_create не викликає save()
+            p.excerpt = Post.make_excerpt(p.content)
+        Post.objects.bulk_update(created, ['parent', 'path', 'content', 'excerpt'])
+        self.state.defer_quotes(deferred)
+        return [(r['id'], p.pk) for r, p in zip(rows, created)]
+
+    def remap_deferred_quotes(self):
+        """Цитати постів, що посилались уперед по дампу: тепер усі пости вже на місці."""
+        pending = self.state.deferred_quotes()
+        for i in range(0, len(pending), self.batch_size):
+            posts = list(Post.objects.filter(pk__in=pending[i:i + self.batch_size]).only('content'))
+            ids = self.state.lookup('post', [pk for p in posts for pk in quoted_ids(p.content)])
+            for p in posts:
+                p.content = remap_quotes(p.content, ids)
+                p.excerpt = Post.make_excerpt(p.content)
+            with transaction.atomic():
+                Post.objects.bulk_update(posts, ['content', 'excerpt'])
+            self.state.forget_deferred(pending[i:i + self.batch_size])
+            self.state.commit()
+
+    def import_like(self, rows):
+        users = self.state.lookup('user', [r['user_id'] for r in rows])
+        posts = self.state.lookup('post', [r['post_id'] for r in rows])
+        # при повторному запуску пости архівних тем уже в архіві (разом з лайками)
+        hot = set(Post.objects.filter(pk__in=posts.values()).values_list('pk', flat=True))
+        posts = {old: new for old, new in posts.items() if new in hot}
+        likes = [
+            PostLike(user_id=users[r['user_id']], post_id=posts[r['post_id']], created_at=r['created_at'])
+            for r in rows
+            if r['user_id'] in users and r['post_id'] in posts
+        ]
+        # unique (user, post): повторний імпорт того ж лайка просто пропускається
+        PostLike.objects.bulk_create(likes, ignore_conflicts=True)
+        return [(r['id'], None) for r in rows]
@@ -0,0 +1,19 @@
+# forum/management/commands/prerender_pages.py
+from django.core.management.base import BaseCommand
+
+from forum import infopages
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the info pages (about, rules, faq) for anonymous visitors into PRERENDERED_ROOT "
+        "as HTML + gzip. Run after collectstatic on every deploy (start.sh)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=None, help="Куди писати (за замовчуванням PRERENDERED_ROOT)")
+
+    def handle(self, *args, **options):
+        for name, size, compressed in infopages.prerender(options['dir']):
+            self.stdout.write(f"  {name}: {size} bytes, gzip {compressed}")
+        self.stdout.write(self.style.SUCCESS("Info pages prerendered."))
@@ -0,0 +1,28 @@
+# forum/management/commands/prune_fingerprint_buckets.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from forum import fingerprints
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete near-duplicate LSH buckets older than SPAM_DUPLICATE_WINDOW_HOURS in chunks "
+        "(lookups never read them). Run from cron"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help="Скільки кошиків видаляти одним DELETE")
+        parser.add_argument('--hours', type=int,
+                            help="Видаляти старші за стільки годин (за замовчуванням — вікно пошуку)")
+
+    def handle(self, *args, **options):
+        window = timedelta(hours=options['hours']) if options['hours'] is not None else fingerprints.WINDOW
+        # межа фіксується один раз, як у clear_expired_sessions
+        total = fingerprints.prune_buckets(
+            timezone.now() - window, options['chunk_size'], progress=self.stdout.write
+        )
+        self.stdout.write(self.style.SUCCESS(f"Deleted {total} fingerprint buckets."))
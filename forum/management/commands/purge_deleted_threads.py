@@ -0,0 +1,31 @@
+# forum/management/commands/purge_deleted_threads.py
+from django.core.management.base import BaseCommand
+
+from forum import moderation
+from forum.models import Thread
+
+
+class Command(BaseCommand):
+    help = (
+        "Permanently delete soft-deleted threads whose grace period (THREAD_DELETE_GRACE_DAYS) "
+        "has passed: posts and likes in chunks, author counters refreshed per thread. Run from cron"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=moderation.CHUNK_SIZE)
+        parser.add_argument('--limit', type=int, default=None,
+                            help="Максимум тем за один запуск")
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            due = Thread.objects.filter(deleted_at__lt=moderation.purge_cutoff()).count()
+            pending = Thread.objects.filter(deleted_at__gte=moderation.purge_cutoff()).count()
+            self.stdout.write(f"{due} threads would be purged; {pending} still within the grace period.")
+            return
+
+        # кожен шматок постів — своя коротка транзакція, тож команду можна перервати будь-коли
+        threads, posts = moderation.purge_deleted_threads(
+            options['chunk_size'], options['limit'], progress=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Purged {threads} threads ({posts} posts)."))
@@ -0,0 +1,32 @@
+# forum/management/commands/purge_user_content.py
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from forum import moderation
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Delete all threads, posts and likes of the given users in chunks and deactivate their accounts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='+')
+        parser.add_argument('--chunk-size', type=int, default=moderation.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        users = list(User.objects.filter(username__in=options['usernames']))
+        missing = set(options['usernames']) - {u.username for u in users}
+        if missing:
+            raise CommandError(f"Unknown users: {', '.join(sorted(missing))}")
+
+        for user in users:
+            if user.is_superuser:
+                self.stdout.write(self.style.WARNING(f"Skipping superuser {user.username}"))
+                continue
+            self.stdout.write(f"Purging {user.username}...")
+            totals = moderation.purge_user(user, options['chunk_size'], progress=self.stdout.write)
+            self.stdout.write(self.style.SUCCESS(
+                f"{user.username}: {totals['threads']} threads, {totals['posts']} posts, "
+                f"{totals['likes']} likes deleted; account deactivated."
+            ))
@@ -0,0 +1,30 @@
+# forum/management/commands/rebuild_user_stats.py
+from django.core.management.base import BaseCommand
+from forum import stats
+from forum.models import Profile
+
+
+class Command(BaseCommand):
+    help = "Recompute per-user activity stats in Profile (posts, threads, likes received, last activity)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="Скільки профілів перераховувати одним UPDATE")
+
+    def handle(self, *args, **options):
+        chunk = options['chunk_size']
+        total = 0
+        last_pk = 0
+        # шматками по pk — короткі транзакції, без блокування всієї таблиці
+        while True:
+            user_ids = list(
+                Profile.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', 'user_id')[:chunk]
+            )
+            if not user_ids:
+                break
+            last_pk = user_ids[-1][0]
+            total += stats.recompute(uid for _, uid in user_ids)
+            self.stdout.write(f"  ...{total} profiles")
+
+        self.stdout.write(self.style.SUCCESS(f"User stats rebuilt for {total} profiles."))
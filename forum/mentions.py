@@ -0,0 +1,87 @@
+# forum/mentions.py
+"""
+Згадки (@username) і цитати (>>id поста) у постах.
+
+Розбираються один раз — при збереженні поста, у
+forum/utils/html_sanitizer.sanitize_post_html: у тексті лишаються готові
+посилання, тож сторінка теми не робить жодного запиту на згадки. Звідти ж
+множина згаданих користувачів потрапляє в індекс PostMention, з якого
+беруться сповіщення (Profile.unread_mentions і список на сторінці
+сповіщень).
+
+Перейменування користувача перерендерює лише пости з його згадками
+(за індексом), пачками по RERENDER_BATCH.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .models import Post, PostMention, Profile
+
+RERENDER_BATCH = getattr(settings, 'MENTION_RERENDER_BATCH', 500)
+
+
+def record(post, user_ids):
+    """
+    Синхронізує індекс згадок поста з актуальним текстом. Сповіщення
+    отримують лише нові згадані (повторне збереження не дублює їх), автор —
+    ніколи.
+    """
+    user_ids = set(user_ids) - {post.author_id}
+    existing = set(PostMention.objects.filter(post=post).values_list('user_id', flat=True))
+
+    removed = existing - user_ids
+    if removed:
+        # непереглянуті знімаються з лічильника сигналом (forum/signals.py)
+        PostMention.objects.filter(post=post, user_id__in=removed).delete()
+
+    added = user_ids - existing
+    if added:
+        PostMention.objects.bulk_create([PostMention(post=post, user_id=uid) for uid in added])
+        Profile.objects.filter(user_id__in=added).update(unread_mentions=F('unread_mentions') + 1)
+    return added
+
+
+def mark_seen(user):
+    updated = PostMention.objects.filter(user=user, seen=False).update(seen=True)
+    if updated:
+        Profile.objects.filter(user=user).update(unread_mentions=0)
+    return updated
+
+
+def recent(user, limit=20):
+    return list(
+        PostMention.objects.filter(user=user, post__thread__deleted_at__isnull=True)
+        .select_related('post__thread', 'post__author')
+        .order_by('-created_at')[:limit]
+    )
+
+
+def rerender_after_rename(user, old_username, batch_size=RERENDER_BATCH):
+    """
+    Перерендерює пости зі згадками user (і цитатами його постів — вони теж
+    в індексі): посилання на старе ім'я стають посиланнями на нове. Пачками
+    по post_id: на пачку — SELECT постів, по запиту на розбір імен і постів
+    для всієї пачки разом і один bulk_update, без сигналів і нових версій.
+    """
+    # bleach/html5lib — важкий імпорт, а модуль підтягують сигнали ще в ready()
+    from .utils.html_sanitizer import sanitize_post_html_many
+
+    mentions = PostMention.objects.filter(user=user).order_by('post_id').values_list('post_id', flat=True)
+    last, updated = 0, 0
+    while True:
+        ids = list(mentions.filter(post_id__gt=last)[:batch_size])
+        if not ids:
+            return updated
+        last = ids[-1]
+        posts = list(Post.objects.filter(pk__in=ids).only('pk', 'content'))
+        rendered = sanitize_post_html_many([p.content for p in posts], aliases={old_username: user})
+        changed = []
+        for post, (content, _) in zip(posts, rendered):
+            if content != post.content:
+                post.content = content
+                post.excerpt = Post.make_excerpt(content)
+                changed.append(post)
+        with transaction.atomic():
+            Post.objects.bulk_update(changed, ['content', 'excerpt'])
+        updated += len(changed)
@@ -0,0 +1,272 @@
+# forum/metrics.py
+"""
+Метрики у текстовому форматі Prometheus: GET /metrics.
+
+Без сторонніх залежностей. На гарячому шляху — лише додавання в dict
+поточного потоку (без блокувань): кожен потік пише у свій шард, шарди
+сумуються тільки при зборі. Кожен воркер gunicorn раз на
+METRICS_FLUSH_SECONDS (і при виході) скидає свої сумарні значення у файл
+METRICS_DIR/<pid>-<старт>.json, а /metrics підсумовує файли всіх
+воркерів — хоч би який воркер прийняв запит скрапера. Файли завершених
+воркерів лишаються (лічильники не мають зменшуватися); каталог чиститься
+при деплої (start.sh). Без METRICS_DIR — лише поточний процес (dev).
+
+Глибина черг (теми на purge, прострочені сесії, пости "схоже на спам",
+застарілі LSH-кошики) —
+gauge, що рахується запитами в БД у момент збору, а не воркерами.
+
+Доступ: з METRICS_TOKEN — лише з заголовком "Authorization: Bearer <token>",
+без нього — тільки staff або DEBUG.
+"""
+import atexit
+import os
+import threading
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+import orjson
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+# назва -> (тип, опис); лейбли — у самих значеннях
+METRICS = {
+    'forum_http_request_duration_seconds': ('histogram', "Request latency by view name"),
+    'forum_db_queries_total': ('counter', "SQL queries executed, by view name"),
+    'forum_db_query_duration_seconds_total': ('counter', "Time spent in SQL queries, by view name"),
+    'forum_cache_requests_total': ('counter', "Application cache lookups by cache and result (hit/miss)"),
+    'forum_created_total': ('counter', "Objects created (post, thread, like)"),
+    'forum_queue_depth': ('gauge', "Background work waiting, by queue"),
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+FLUSH_SECONDS = getattr(settings, 'METRICS_FLUSH_SECONDS', 1.0)
+
+_local = threading.local()
+_shards = []
+_shards_lock = threading.Lock()  # лише при появі нового потоку
+_started = time.time_ns()
+_next_flush = 0.0
+
+
+def _shard():
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _local.shard = {}
+        with _shards_lock:
+            _shards.append(shard)
+    return shard
+
+
+def _after_fork():
+    # gunicorn --preload: воркер не успадковує те, що накопичив майстер
+    global _shards, _started, _next_flush
+    _local.__dict__.clear()
+    _shards = []
+    _started = time.time_ns()
+    _next_flush = 0.0
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def inc(name, labels=(), value=1):
+    """inc('forum_created_total', (('type', 'post'),)) — labels: кортеж пар (ключ, значення)."""
+    shard = _shard()
+    key = (name, labels)
+    shard[key] = shard.get(key, 0) + value
+
+
+def observe(name, labels, seconds):
+    shard = _shard()
+    key = (name, labels)
+    hist = shard.get(key)
+    if hist is None:
+        # лічильники кошиків (не кумулятивні), сума, кількість
+        hist = shard[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0, 0]
+    i = 0
+    while i < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[i]:
+        i += 1
+    hist[i] += 1
+    hist[-2] += seconds
+    hist[-1] += 1
+
+
+def cache_lookups(cache_name, hits, misses):
+    if hits:
+        inc('forum_cache_requests_total', (('cache', cache_name), ('result', 'hit')), hits)
+    if misses:
+        inc('forum_cache_requests_total', (('cache', cache_name), ('result', 'miss')), misses)
+
+
+def _add(total, key, value):
+    current = total.get(key)
+    if current is None:
+        total[key] = list(value) if isinstance(value, list) else value
+    elif isinstance(value, list):
+        for i, v in enumerate(value):
+            current[i] += v
+    else:
+        total[key] = current + value
+
+
+def snapshot():
+    """Сума шардів усіх потоків цього процесу: {(name, labels): value}."""
+    total = {}
+    for shard in list(_shards):
+        while True:
+            try:
+                items = list(shard.items())
+                break
+            except RuntimeError:  # інший потік саме додав ключ
+                continue
+        for key, value in items:
+            _add(total, key, value)
+    return total
+
+
+def _directory():
+    path = getattr(settings, 'METRICS_DIR', None)
+    return Path(path) if path else None
+
+
+def flush():
+    directory = _directory()
+    if directory is None:
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    rows = [[name, [list(pair) for pair in labels], value] for (name, labels), value in snapshot().items()]
+    path = directory / f'{os.getpid()}-{_started}.json'
+    tmp = path.with_suffix(f'.{threading.get_ident()}.tmp')
+    tmp.write_bytes(orjson.dumps(rows))
+    os.replace(tmp, path)  # скрапер не побачить недописаний файл
+
+
+def _maybe_flush():
+    global _next_flush
+    now = time.monotonic()
+    if now >= _next_flush:
+        _next_flush = now + FLUSH_SECONDS
+        flush()
+
+
+atexit.register(flush)
+
+
+def collect():
+    """Значення всіх процесів (з METRICS_DIR) або лише цього."""
+    directory = _directory()
+    if directory is None:
+        return snapshot()
+    flush()
+    total = {}
+    for path in directory.glob('*.json'):
+        try:
+            rows = orjson.loads(path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            continue
+        for name, labels, value in rows:
+            _add(total, (name, tuple(tuple(pair) for pair in labels)), value)
+    return total
+
+
+def _queue_depths():
+    from django.utils import timezone
+
+    from . import fingerprints, moderation
+    from .models import FingerprintBucket, PostFingerprint, Thread
+
+    depths = {
+        'thread_purge': Thread.objects.filter(deleted_at__lt=moderation.purge_cutoff()).count(),
+        'thread_soft_deleted': Thread.objects.filter(deleted_at__isnull=False).count(),
+        'spam_flagged': PostFingerprint.objects.filter(duplicate_of__isnull=False).count(),
+        'fingerprint_buckets_stale': FingerprintBucket.objects.filter(
+            created_at__lt=timezone.now() - fingerprints.WINDOW
+        ).count(),
+    }
+    if settings.SESSION_ENGINE.endswith(('.db', '.cached_db')):
+        from django.contrib.sessions.models import Session
+
+        depths['expired_sessions'] = Session.objects.filter(expire_date__lt=timezone.now()).count()
+    return depths
+
+
+def _labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def render(values):
+    """Текстовий формат експозиції Prometheus 0.0.4."""
+    by_name = {}
+    for (name, labels), value in values.items():
+        by_name.setdefault(name, []).append((labels, value))
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(by_name.get(name, ()), key=lambda item: item[0]):
+            if kind != 'histogram':
+                lines.append(f'{name}{_labels(labels)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip((*LATENCY_BUCKETS, '+Inf'), value):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(labels, (("le", bound),))} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {value[-2]}')
+            lines.append(f'{name}_count{_labels(labels)} {value[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        if request.headers.get('Authorization') != f'Bearer {token}':
+            return HttpResponseForbidden()
+    elif not (settings.DEBUG or request.user.is_staff):
+        return HttpResponseForbidden()
+
+    values = collect()
+    for queue, depth in _queue_depths().items():
+        values[('forum_queue_depth', (('queue', queue),))] = depth
+    return HttpResponse(render(values), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class MetricsMiddleware:
+    """Латентність, кількість і час SQL-запитів на кожен запит — з міткою view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = [0, 0.0]
+
+        def count(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries[0] += 1
+                queries[1] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            # і default, і репліки (myforum/db_router.py)
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        labels = (('view', match.view_name if match else 'unresolved'),)
+        observe('forum_http_request_duration_seconds', labels, elapsed)
+        if queries[0]:
+            inc('forum_db_queries_total', labels, queries[0])
+            inc('forum_db_query_duration_seconds_total', labels, queries[1])
+        _maybe_flush()
+        return response
@@ -0,0 +1,126 @@
+# Generated by Django 4.2 on 2026-10-19 17:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_last_post(apps, schema_editor):
+    Thread = apps.get_model("forum", "Thread")
+    Post = apps.get_model("forum", "Post")
+    latest = Post.objects.filter(thread=models.OuterRef("pk")).order_by(
+        "-created_at", "-pk"
+    )
+    Thread.objects.update(
+        last_post=models.Subquery(latest.values("pk")[:1]),
+        last_post_at=models.Subquery(latest.values("created_at")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("forum", "0003_thread_subscriptions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="thread",
+            name="last_post",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="forum.post",
+            ),
+        ),
+        migrations.AddField(
+            model_name="thread",
+            name="last_post_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="ThreadReadMarker",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("read_at", models.DateTimeField(auto_now=True)),
+                (
+                    "last_read_post",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="forum.post",
+                    ),
+                ),
+                (
+                    "thread",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="read_markers",
+                        to="forum.thread",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="read_markers",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Позначка прочитання",
+                "verbose_name_plural": "Позначки прочитання",
+                "unique_together": {("user", "thread")},
+            },
+        ),
+        migrations.CreateModel(
+            name="CategoryReadMark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("marked_at", models.DateTimeField()),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="read_marks",
+                        to="forum.category",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="category_read_marks",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Позначка категорії",
+                "verbose_name_plural": "Позначки категорій",
+                "unique_together": {("user", "category")},
+            },
+        ),
+        migrations.RunPython(backfill_last_post, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2 on 2026-10-19 17:25
+
+from django.db import migrations, models
+
+PATH_STEP = 10
+MAX_DEPTH = 25
+
+
+def backfill_paths(apps, schema_editor):
+    Post = apps.get_model("forum", "Post")
+    db_alias = schema_editor.connection.alias
+    # у пам'яті тримаємо шляхи лише тих постів, на які хтось відповідав
+    parent_ids = set(
+        Post.objects.using(db_alias)
+        .exclude(parent=None)
+        .values_list("parent_id", flat=True)
+        .distinct()
+    )
+    paths = {}
+    batch = []
+    rows = Post.objects.using(db_alias).order_by("pk").values_list("pk", "parent_id")
+    for pk, parent_id in rows.iterator(chunk_size=2000):
+        parent_path = paths.get(parent_id, "")
+        if len(parent_path) // PATH_STEP >= MAX_DEPTH:
+            parent_path = parent_path[:-PATH_STEP]
+        path = parent_path + str(pk).zfill(PATH_STEP)
+        if pk in parent_ids:
+            paths[pk] = path
+        batch.append(Post(pk=pk, path=path))
+        if len(batch) >= 1000:
+            Post.objects.using(db_alias).bulk_update(batch, ["path"])
+            batch = []
+    if batch:
+        Post.objects.using(db_alias).bulk_update(batch, ["path"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0004_read_tracking"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="path",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=255
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["thread", "path"], name="forum_post_thread__517443_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-19 17:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0005_post_path"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="last_activity_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="likes_received",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="posts_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="threads_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(
+                fields=["-posts_count"], name="forum_profi_posts_c_c4587b_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2 on 2026-10-19 17:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0006_profile_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ThreadArchive",
+            fields=[
+                (
+                    "thread",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="archive",
+                        serialize=False,
+                        to="forum.thread",
+                    ),
+                ),
+                ("codec", models.CharField(max_length=10)),
+                ("payload", models.BinaryField()),
+                ("posts_count", models.PositiveIntegerField(default=0)),
+                ("was_closed", models.BooleanField(default=False)),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Архів теми",
+                "verbose_name_plural": "Архіви тем",
+            },
+        ),
+        migrations.AddField(
+            model_name="thread",
+            name="archived",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2 on 2026-10-19 17:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("forum", "0007_thread_archive"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostRevision",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("number", models.PositiveIntegerField()),
+                ("is_snapshot", models.BooleanField(default=False)),
+                ("data", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "editor",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="revisions",
+                        to="forum.post",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Версія поста",
+                "verbose_name_plural": "Версії постів",
+                "ordering": ["post", "number"],
+                "unique_together": {("post", "number")},
+            },
+        ),
+    ]
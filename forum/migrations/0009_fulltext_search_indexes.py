@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# GIN-індекси для повнотекстового пошуку в адмінці (forum/admin.py, LargeTableAdminMixin).
+# Лише Postgres; вираз має дослівно збігатися з тим, що генерує get_search_results.
+INDEXES = [
+    ("forum_post_content_fts", "forum_post", "content"),
+    ("forum_thread_title_fts", "forum_thread", "title"),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, table, column in INDEXES:
+        # CONCURRENTLY — без блокування записів у великі таблиці (тому atomic = False)
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+            f"ON {table} USING gin (to_tsvector('simple', {column}))"
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in INDEXES:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("forum", "0008_post_revisions"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
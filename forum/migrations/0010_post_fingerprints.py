@@ -0,0 +1,79 @@
+# Generated by Django 4.2 on 2026-10-19 17:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0009_fulltext_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostFingerprint",
+            fields=[
+                (
+                    "post",
+                    models.OneToOneField(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="fingerprint",
+                        serialize=False,
+                        to="forum.post",
+                    ),
+                ),
+                ("signature", models.BinaryField()),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "duplicate_of",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="forum.post",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Відбиток поста",
+                "verbose_name_plural": "Відбитки постів",
+            },
+        ),
+        migrations.CreateModel(
+            name="FingerprintBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.BigIntegerField()),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "post",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="forum.post",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="fingerprintbucket",
+            index=models.Index(
+                fields=["key", "created_at"], name="forum_finge_key_dee6b6_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2 on 2026-10-19 17:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("forum", "0010_post_fingerprints"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="unread_mentions",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="PostMention",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("seen", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="mentions",
+                        to="forum.post",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="mentions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Згадка",
+                "verbose_name_plural": "Згадки",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="postmention",
+            index=models.Index(
+                fields=["user", "-created_at"], name="forum_postm_user_id_9641cb_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="postmention",
+            unique_together={("post", "user")},
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-19 18:20
+
+from django.conf import settings
+from django.db import migrations
+
+
+def backfill_profiles(apps, schema_editor):
+    # профіль тепер створюється тільки разом з користувачем (forum/signals.py),
+    # тож тим, хто досі без профілю, створюємо його тут — один раз
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Profile = apps.get_model("forum", "Profile")
+    db_alias = schema_editor.connection.alias
+    missing = (
+        User.objects.using(db_alias)
+        .filter(profile__isnull=True)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    while True:
+        ids = list(missing[:1000])
+        if not ids:
+            break
+        Profile.objects.using(db_alias).bulk_create(
+            [Profile(user_id=pk) for pk in ids]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("forum", "0011_post_mentions"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_profiles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2 on 2026-10-19 18:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+import orjson
+
+
+def backfill_positions(apps, schema_editor):
+    # позиції для тем, заархівованих до появи ArchivedPostPosition;
+    # порядок — як у блобі (path, pk), тобто як на сторінках архівної теми
+    from forum.archive import _decompress
+
+    ThreadArchive = apps.get_model("forum", "ThreadArchive")
+    ArchivedPostPosition = apps.get_model("forum", "ArchivedPostPosition")
+    db_alias = schema_editor.connection.alias
+    archives = ThreadArchive.objects.using(db_alias).order_by("pk")
+    for pk in archives.values_list("pk", flat=True).iterator():
+        codec, payload = archives.values_list("codec", "payload").get(pk=pk)
+        docs = orjson.loads(_decompress(codec, payload))
+        ArchivedPostPosition.objects.using(db_alias).bulk_create(
+            [
+                ArchivedPostPosition(post_id=d["id"], archive_id=pk, position=i)
+                for i, d in enumerate(docs)
+            ],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0012_backfill_profiles"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedPostPosition",
+            fields=[
+                ("post_id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("position", models.PositiveIntegerField()),
+            ],
+            options={
+                "verbose_name": "Позиція архівного поста",
+                "verbose_name_plural": "Позиції архівних постів",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("parent__isnull", True)),
+                fields=["thread", "created_at"],
+                name="forum_post_thread_roots_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedpostposition",
+            name="archive",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="positions",
+                to="forum.threadarchive",
+            ),
+        ),
+        migrations.RunPython(backfill_positions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-19 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0013_post_permalinks"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="thread",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="thread",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", False)),
+                fields=["deleted_at"],
+                name="forum_thread_deleted_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2 on 2026-10-19 18:20
+
+from html import unescape
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+
+def backfill_excerpts(apps, schema_editor):
+    # те саме, що Post.make_excerpt (історична модель не має методів моделі)
+    Post = apps.get_model("forum", "Post")
+    db_alias = schema_editor.connection.alias
+    posts = Post.objects.using(db_alias).order_by("pk").only("pk", "content")
+    last = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last)[:1000])
+        if not batch:
+            break
+        last = batch[-1].pk
+        for post in batch:
+            text = " ".join(unescape(strip_tags(post.content or "")).split())
+            post.excerpt = Truncator(text).chars(200)
+        Post.objects.using(db_alias).bulk_update(batch, ["excerpt"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0014_thread_soft_delete"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="excerpt",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=200
+            ),
+        ),
+        migrations.RunPython(backfill_excerpts, migrations.RunPython.noop),
+    ]
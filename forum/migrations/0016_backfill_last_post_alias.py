@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-19 20:10
+
+from django.db import migrations, models
+
+
+def backfill_last_post(apps, schema_editor):
+    # 0004 заповнювала last_post через менеджер за замовчуванням, тобто в
+    # "default", навіть коли мігрувалась інша БД. Доповнюємо теми, які тоді
+    # пропустили, — у тій БД, яку мігруємо.
+    Thread = apps.get_model("forum", "Thread")
+    Post = apps.get_model("forum", "Post")
+    db_alias = schema_editor.connection.alias
+    latest = (
+        Post.objects.using(db_alias)
+        .filter(thread=models.OuterRef("pk"))
+        .order_by("-created_at", "-pk")
+    )
+    Thread.objects.using(db_alias).filter(last_post__isnull=True).update(
+        last_post=models.Subquery(latest.values("pk")[:1]),
+        last_post_at=models.Subquery(latest.values("created_at")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0015_post_excerpt"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_last_post, migrations.RunPython.noop),
+    ]
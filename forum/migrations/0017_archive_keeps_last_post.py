@@ -0,0 +1,62 @@
+# Generated by Django 4.2 on 2026-10-19 18:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import orjson
+
+
+def backfill_archived_last_post(apps, schema_editor):
+    # архівація обнуляла Thread.last_post (SET_NULL при видаленні постів) —
+    # повертаємо його з блобу разом з автором для списків тем
+    from forum.archive import _decompress
+
+    Thread = apps.get_model("forum", "Thread")
+    ThreadArchive = apps.get_model("forum", "ThreadArchive")
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    db_alias = schema_editor.connection.alias
+    archives = ThreadArchive.objects.using(db_alias).order_by("pk")
+    for pk in archives.values_list("pk", flat=True).iterator():
+        codec, payload = archives.values_list("codec", "payload").get(pk=pk)
+        docs = orjson.loads(_decompress(codec, payload))
+        if not docs:
+            continue
+        last = max(docs, key=lambda d: (d["created_at"], d["id"]))
+        Thread.objects.using(db_alias).filter(pk=pk).update(last_post_id=last["id"])
+        if User.objects.using(db_alias).filter(pk=last["author_id"]).exists():
+            archives.filter(pk=pk).update(last_post_author_id=last["author_id"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("forum", "0016_backfill_last_post_alias"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="threadarchive",
+            name="last_post_author",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="thread",
+            name="last_post",
+            field=models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="forum.post",
+            ),
+        ),
+        migrations.RunPython(backfill_archived_last_post, migrations.RunPython.noop),
+    ]
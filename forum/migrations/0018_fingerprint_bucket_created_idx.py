@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-19 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0017_archive_keeps_last_post"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="fingerprintbucket",
+            index=models.Index(
+                fields=["created_at"], name="forum_finge_created_7ead5c_idx"
+            ),
+        ),
+    ]
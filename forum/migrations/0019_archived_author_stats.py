@@ -0,0 +1,95 @@
+# Generated by Django 4.2 on 2026-10-19 18:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import orjson
+
+
+def backfill_author_stats(apps, schema_editor):
+    # внесок авторів у вже заархівовані теми — з блобів
+    from datetime import datetime
+
+    from forum.archive import _decompress
+
+    ThreadArchive = apps.get_model("forum", "ThreadArchive")
+    ArchivedAuthorStats = apps.get_model("forum", "ArchivedAuthorStats")
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    db_alias = schema_editor.connection.alias
+    archives = ThreadArchive.objects.using(db_alias).order_by("pk")
+    for pk in archives.values_list("pk", flat=True).iterator():
+        codec, payload = archives.values_list("codec", "payload").get(pk=pk)
+        by_author = {}
+        for d in orjson.loads(_decompress(codec, payload)):
+            row = by_author.setdefault(d["author_id"], [0, 0, d["created_at"]])
+            row[0] += 1
+            row[1] += len(d["likes"])
+            row[2] = max(row[2], d["created_at"])
+        existing = set(
+            User.objects.using(db_alias)
+            .filter(pk__in=list(by_author))
+            .values_list("pk", flat=True)
+        )
+        ArchivedAuthorStats.objects.using(db_alias).bulk_create(
+            [
+                ArchivedAuthorStats(
+                    archive_id=pk,
+                    user_id=user_id,
+                    posts_count=posts,
+                    likes_received=likes,
+                    last_post_at=datetime.fromisoformat(last),
+                )
+                for user_id, (posts, likes, last) in by_author.items()
+                if user_id in existing
+            ]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("forum", "0018_fingerprint_bucket_created_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedAuthorStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("posts_count", models.PositiveIntegerField(default=0)),
+                ("likes_received", models.PositiveIntegerField(default=0)),
+                ("last_post_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "archive",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="author_stats",
+                        to="forum.threadarchive",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Внесок автора в архів",
+                "verbose_name_plural": "Внески авторів в архіви",
+                "unique_together": {("archive", "user")},
+            },
+        ),
+        migrations.RunPython(backfill_author_stats, migrations.RunPython.noop),
+    ]
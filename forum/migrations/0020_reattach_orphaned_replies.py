@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-19 19:05
+
+from django.db import migrations
+from django.db.models.functions import Length, Substr
+
+PATH_STEP = 10
+
+
+def fix_orphaned_paths(apps, schema_editor):
+    # відповіді постів, видалених раніше, лишились з parent=NULL, але з
+    # префіксом видаленого предка в path — робимо їх справжніми кореневими
+    Post = apps.get_model("forum", "Post")
+    db_alias = schema_editor.connection.alias
+    orphans = (
+        Post.objects.using(db_alias)
+        .annotate(path_length=Length("path"))
+        .filter(parent__isnull=True, path_length__gt=PATH_STEP)
+        .values_list("thread_id", "path")
+    )
+    # найглибші першими: шляхи мілкіших від цього не змінюються
+    for thread_id, path in sorted(orphans, key=lambda row: -len(row[1])):
+        upper = str(int(path) + 1).zfill(len(path))
+        Post.objects.using(db_alias).filter(
+            thread_id=thread_id, path__gte=path, path__lt=upper
+        ).update(path=Substr("path", len(path) - PATH_STEP + 1))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0019_archived_author_stats"),
+    ]
+
+    operations = [
+        migrations.RunPython(fix_orphaned_paths, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,12 @@
+from html import unescape
+
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.urls import reverse
-from django.utils.text import slugify
+from django.utils.html import strip_tags
+from django.utils.text import Truncator, slugify
 from django.utils import timezone
 from ckeditor.fields import RichTextField 
-from PIL import Image
 
 # Create your models here.
 
@@ -47,6 +49,17 @@ class Thread(models.Model):
     pinned = models.BooleanField(default=False)
     closed = models.BooleanField(default=False)
     views = models.PositiveIntegerField(default=0)
+    # денормалізація для "нових з останнього візиту" (оновлюється сигналом при створенні поста)
+    # без обмеження в БД: в архівної теми (archived) пост живе в ThreadArchive, а id лишається
+    last_post = models.ForeignKey(
+        'Post', null=True, blank=True, on_delete=models.SET_NULL, db_constraint=False, related_name='+'
+    )
+    last_post_at = models.DateTimeField(null=True, blank=True)
+    # пости лежать стиснутими в ThreadArchive, а не у forum_post (див. forum/archive.py)
+    archived = models.BooleanField(default=False)
+    # м'яке видалення: тема прихована одразу, пости вичищає purge_deleted_threads
+    # після THREAD_DELETE_GRACE_DAYS (до того — можна відновити), див. forum/moderation.py
+    deleted_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ['-pinned', '-updated_at']
@@ -55,6 +68,11 @@ class Thread(models.Model):
         indexes = [
             models.Index(fields=['-updated_at']),
             models.Index(fields=['slug']),
+            # черга на purge: лише видалені, тож індекс крихітний
+            models.Index(
+                fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False),
+                name='forum_thread_deleted_idx',
+            ),
         ]
 
     def __str__(self):
@@ -83,6 +101,16 @@ class Post(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     edited_at = models.DateTimeField(null=True, blank=True)
     parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.SET_NULL, related_name='replies')
+    # materialized path: id предків і свій id, кожен по PATH_STEP цифр ("0000000012" + "0000000045").
+    # Лише цифри — тож лексикографічний порядок однаковий у будь-якій collation,
+    # а все піддерево — це один діапазон по індексу (thread, path), див. subtree().
+    path = models.CharField(max_length=255, blank=True, default='', editable=False)
+    # простий текст для списків (останні повідомлення, профіль) — щоб не тягнути content з БД
+    excerpt = models.CharField(max_length=200, blank=True, default='', editable=False)
+
+    PATH_STEP = 10
+    MAX_DEPTH = 25  # 255 // PATH_STEP
+    EXCERPT_LENGTH = 200
 
     class Meta:
         ordering = ['created_at']
@@ -90,16 +118,57 @@ class Post(models.Model):
         verbose_name_plural = "Пости"
         indexes = [
             models.Index(fields=['created_at']),
+            models.Index(fields=['thread', 'path']),
+            # кореневі пости теми в порядку сторінок: пагінація thread_page і позиція в permalinks
+            models.Index(
+                fields=['thread', 'created_at'], condition=models.Q(parent__isnull=True),
+                name='forum_post_thread_roots_idx',
+            ),
         ]
 
     def __str__(self):
         return f"Post #{self.pk} by {self.author}"
 
-    def short(self, n=200):
-        text = (self.content or '')
-        # не намагаймося різати HTML — в demo вистачить plain cut
-        plain = text if len(text) <= n else text[:n] + '...'
-        return plain
+    def save(self, *args, **kwargs):
+        self.excerpt = self.make_excerpt(self.content)
+        super().save(*args, **kwargs)
+        if not self.path:
+            # pk відомий тільки після INSERT — дописуємо шлях окремим UPDATE
+            self.path = self.build_path()
+            Post.objects.filter(pk=self.pk).update(path=self.path)
+
+    def build_path(self):
+        return self.make_path(self.parent.path if self.parent_id else '', self.pk)
+
+    @classmethod
+    def make_path(cls, parent_path, pk):
+        if len(parent_path) // cls.PATH_STEP >= cls.MAX_DEPTH:
+            # надто глибоко — стаємо сусідом батька, а не його нащадком
+            parent_path = parent_path[:-cls.PATH_STEP]
+        return parent_path + str(pk).zfill(cls.PATH_STEP)
+
+    @classmethod
+    def make_excerpt(cls, content):
+        """Текст без тегів і зайвих пробілів, обрізаний до EXCERPT_LENGTH."""
+        text = ' '.join(unescape(strip_tags(content or '')).split())
+        return Truncator(text).chars(cls.EXCERPT_LENGTH)
+
+    @property
+    def depth(self):
+        return max(len(self.path) // self.PATH_STEP - 1, 0)
+
+    @property
+    def root_id(self):
+        return int(self.path[:self.PATH_STEP]) if self.path else self.pk
+
+    def subtree(self):
+        """Усі нащадки (без самого поста) у порядку обходу дерева — один range-запит."""
+        upper = str(int(self.path) + 1).zfill(len(self.path))
+        return Post.objects.filter(thread_id=self.thread_id, path__gt=self.path, path__lt=upper) \
+            .order_by('path')
+
+    def short(self, n=EXCERPT_LENGTH):
+        return Truncator(self.excerpt).chars(n)
 
     @property
     def likes_count(self):
@@ -113,10 +182,25 @@ class Profile(models.Model):
     location = models.CharField(max_length=120, blank=True)
     website = models.URLField(blank=True)
     created_at = models.DateTimeField(default=timezone.now)
+    # лічильник непрочитаних відповідей у підписаних темах (оновлюється set-based у notifications.py)
+    unread_replies = models.PositiveIntegerField(default=0)
+    # непереглянуті згадки (@username і цитати) — forum/mentions.py
+    unread_mentions = models.PositiveIntegerField(default=0)
+
+    # агрегати активності — інкрементно оновлюються сигналами (forum/stats.py),
+    # перерахунок з нуля: manage.py rebuild_user_stats
+    posts_count = models.PositiveIntegerField(default=0)
+    threads_count = models.PositiveIntegerField(default=0)
+    likes_received = models.PositiveIntegerField(default=0)
+    last_activity_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         verbose_name = "Профіль"
         verbose_name_plural = "Профілі"
+        indexes = [
+            # лідерборд "Топ-учасники"
+            models.Index(fields=['-posts_count']),
+        ]
 
     def __str__(self):
         return f"Profile: {self.user.username}"
@@ -126,6 +210,9 @@ class Profile(models.Model):
         super().save(*args, **kwargs)
 
         if self.avatar:
+            # Pillow потрібен лише тут — не тягнемо його під час старту воркера
+            from PIL import Image
+
             try:
                 img_path = self.avatar.path
                 img = Image.open(img_path)
@@ -151,4 +238,179 @@ class PostLike(models.Model):
         indexes = [models.Index(fields=['post', 'user']),]
 
     def __str__(self):
-        return f"{self.user} -> post#{self.post_id}"
\ No newline at end of file
+        return f"{self.user} -> post#{self.post_id}"
+
+
+class ThreadSubscription(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='thread_subscriptions')
+    thread = models.ForeignKey(Thread, on_delete=models.CASCADE, related_name='subscriptions')
+    unread_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'thread')
+        verbose_name = "Підписка на тему"
+        verbose_name_plural = "Підписки на теми"
+
+    def __str__(self):
+        return f"{self.user} -> thread#{self.thread_id}"
+
+
+
+class ThreadReadMarker(models.Model):
+    # останній прочитаний пост користувача в темі; id постів зростають, тож порівнюємо по pk
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='read_markers')
+    thread = models.ForeignKey(Thread, on_delete=models.CASCADE, related_name='read_markers')
+    last_read_post = models.ForeignKey(
+        Post, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+    read_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'thread')
+        verbose_name = "Позначка прочитання"
+        verbose_name_plural = "Позначки прочитання"
+
+    def __str__(self):
+        return f"{self.user} read thread#{self.thread_id} up to post#{self.last_read_post_id}"
+
+
+class CategoryReadMark(models.Model):
+    # "позначити все прочитаним" — одна позначка часу на категорію замість рядка на кожну тему
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='category_read_marks')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='read_marks')
+    marked_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'category')
+        verbose_name = "Позначка категорії"
+        verbose_name_plural = "Позначки категорій"
+
+    def __str__(self):
+        return f"{self.user} read {self.category} at {self.marked_at}"
+
+
+class ThreadArchive(models.Model):
+    # холодна тема: усі пости (HTML + метадані для рендера й відновлення) одним стиснутим блобом
+    thread = models.OneToOneField(Thread, on_delete=models.CASCADE, primary_key=True, related_name='archive')
+    codec = models.CharField(max_length=10)
+    payload = models.BinaryField()
+    posts_count = models.PositiveIntegerField(default=0)
+    # стан closed до архівації — повертається при відновленні
+    was_closed = models.BooleanField(default=False)
+    # автор Thread.last_post — для списків тем без розпакування блобу
+    last_post_author = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Архів теми"
+        verbose_name_plural = "Архіви тем"
+
+    def __str__(self):
+        return f"archive of thread#{self.thread_id} ({self.posts_count} posts, {self.codec})"
+
+
+class ArchivedPostPosition(models.Model):
+    # пост архівної теми -> його місце в архіві; архів незмінний, тож позиція
+    # рахується один раз при архівації, а /p/<id>/ не розпаковує блоб (forum/permalinks.py)
+    post_id = models.BigIntegerField(primary_key=True)
+    archive = models.ForeignKey(ThreadArchive, on_delete=models.CASCADE, related_name='positions')
+    position = models.PositiveIntegerField()
+
+    class Meta:
+        verbose_name = "Позиція архівного поста"
+        verbose_name_plural = "Позиції архівних постів"
+
+    def __str__(self):
+        return f"post#{self.post_id} at {self.position} in thread#{self.archive_id}"
+
+
+class ArchivedAuthorStats(models.Model):
+    # внесок автора в архівну тему: пости з блобу лишаються "написаними", і
+    # stats.recompute() додає їх до живих, не розпаковуючи архів
+    archive = models.ForeignKey(ThreadArchive, on_delete=models.CASCADE, related_name='author_stats')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    posts_count = models.PositiveIntegerField(default=0)
+    likes_received = models.PositiveIntegerField(default=0)
+    last_post_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('archive', 'user')
+        verbose_name = "Внесок автора в архів"
+        verbose_name_plural = "Внески авторів в архіви"
+
+    def __str__(self):
+        return f"user#{self.user_id}: {self.posts_count} posts in thread#{self.archive_id}"
+
+
+class PostRevision(models.Model):
+    # історія редагувань: версія N — або повний знімок, або дельта від версії N-1 (див. forum/revisions.py)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='revisions')
+    number = models.PositiveIntegerField()
+    is_snapshot = models.BooleanField(default=False)
+    data = models.TextField()
+    editor = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('post', 'number')
+        ordering = ['post', 'number']
+        verbose_name = "Версія поста"
+        verbose_name_plural = "Версії постів"
+
+    def __str__(self):
+        return f"post#{self.post_id} rev {self.number}{' (snapshot)' if self.is_snapshot else ''}"
+
+
+class PostFingerprint(models.Model):
+    # MinHash-підпис тексту поста (forum/fingerprints.py) — для точної перевірки кандидатів
+    post = models.OneToOneField(
+        Post, on_delete=models.CASCADE, primary_key=True, db_constraint=False, related_name='fingerprint'
+    )
+    signature = models.BinaryField()
+    created_at = models.DateTimeField(default=timezone.now)
+    # найближчий дублікат на момент публікації (режим "flag")
+    duplicate_of = models.ForeignKey(
+        Post, null=True, blank=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+
+    class Meta:
+        verbose_name = "Відбиток поста"
+        verbose_name_plural = "Відбитки постів"
+
+    def __str__(self):
+        return f"fingerprint of post#{self.post_id}"
+
+
+class FingerprintBucket(models.Model):
+    # LSH-кошики: по рядку на кожну смугу підпису; пости з однаковим key — кандидати в дублікати
+    key = models.BigIntegerField()
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, db_constraint=False, related_name='+')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['key', 'created_at']),
+            # для prune_buckets: кошики старші за вікно пошуку видаляються діапазоном по часу
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"bucket {self.key} -> post#{self.post_id}"
+
+
+class PostMention(models.Model):
+    # індекс згадок: хто згаданий у пості (@username або цитата його поста) — розбирається при збереженні
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='mentions')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mentions')
+    seen = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('post', 'user')
+        verbose_name = "Згадка"
+        verbose_name_plural = "Згадки"
+        indexes = [models.Index(fields=['user', '-created_at'])]
+
+    def __str__(self):
+        return f"post#{self.post_id} -> {self.user}"
@@ -0,0 +1,259 @@
+# forum/moderation.py
+"""
+Масові модераційні операції (адмінка, purge_user_content).
+
+Усе йде шматками по pk (MODERATION_CHUNK_SIZE): кожен шматок — своя коротка
+транзакція з кількома set-based запитами, тож ані довгих блокувань таблиць,
+ані завантаження сотень тисяч об'єктів, як у стандартному delete_selected.
+
+Пости видаляються "сирим" DELETE без сигналів — денормалізоване
+(Thread.last_post, лічильники Profile, картки авторів, непрочитане)
+перераховується в кінці один раз для всіх зачеплених тем і користувачів.
+
+Видалення теми з сайту м'яке (soft_delete_threads): лише позначка
+deleted_at, тема зникає зі списків одразу і може бути відновлена протягом
+THREAD_DELETE_GRACE_DAYS. Самі пости й лайки вичищає purge_deleted_threads
+(manage.py purge_deleted_threads з cron) тим самим delete_threads.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+from django.utils import timezone
+
+from . import authorcards, notifications, readtracking, stats
+from .models import (
+    FingerprintBucket, Post, PostFingerprint, PostLike, PostMention, PostRevision, Thread, ThreadSubscription,
+)
+
+CHUNK_SIZE = getattr(settings, 'MODERATION_CHUNK_SIZE', 1000)
+GRACE_DAYS = getattr(settings, 'THREAD_DELETE_GRACE_DAYS', 7)
+
+# таблиці, що посилаються на Post з CASCADE — чистимо до самих постів
+POST_DEPENDENTS = [
+    (PostLike, 'post_id'),
+    (PostRevision, 'post_id'),
+    (PostFingerprint, 'post_id'),
+    (FingerprintBucket, 'post_id'),
+    (PostMention, 'post_id'),
+]
+
+
+def _chunks(queryset, size):
+    """Списки pk шматками; кожен шматок — окремий запит з pk > останнього."""
+    queryset = queryset.order_by('pk')
+    last = 0
+    while True:
+        ids = list(queryset.filter(pk__gt=last).values_list('pk', flat=True)[:size])
+        if not ids:
+            return
+        last = ids[-1]
+        yield ids
+
+
+def _report(progress, message):
+    if progress is not None:
+        progress(message)
+
+
+def _raw_delete(queryset):
+    # без Collector: він вантажить кожен рядок, бо на Post/PostLike висять сигнали
+    return queryset._raw_delete(queryset.db)
+
+
+def _unseen_mentions(post_ids):
+    # згадані, у кого лічильник згадок зменшиться після видалення постів
+    return PostMention.objects.filter(post_id__in=post_ids, seen=False).values_list('user_id', flat=True)
+
+
+def reattach_replies(post_ids):
+    """
+    Перед видаленням постів: їхні відповіді переходять до батька видаленого
+    (або стають кореневими), а його сегмент вирізається з path усього
+    піддерева — інакше нащадки лишилися б під префіксом поста, якого вже
+    немає, і гілку було б видно двічі.
+    """
+    parents = Post.objects.filter(pk__in=post_ids, replies__isnull=False).distinct() \
+        .values_list('pk', 'thread_id', 'parent_id', 'path')
+    # найглибші першими: шляхи мілкіших від цього не змінюються
+    for pk, thread_id, parent_id, path in sorted(parents, key=lambda row: -len(row[3])):
+        upper = str(int(path) + 1).zfill(len(path))
+        Post.objects.filter(parent_id=pk).update(parent_id=parent_id)
+        Post.objects.filter(thread_id=thread_id, path__gt=path, path__lt=upper).update(
+            path=Concat(Value(path[:-Post.PATH_STEP]), Substr('path', len(path) + 1)),
+        )
+
+
+def _delete_post_rows(post_ids):
+    for model, field in POST_DEPENDENTS:
+        _raw_delete(model.objects.filter(**{f'{field}__in': post_ids}))
+    # SET_NULL-зв'язки
+    reattach_replies(post_ids)
+    Thread.objects.filter(last_post_id__in=post_ids).update(last_post=None)
+    return _raw_delete(Post.objects.filter(pk__in=post_ids))
+
+
+def _refresh(thread_ids=(), user_ids=(), unread_user_ids=(), chunk_size=CHUNK_SIZE):
+    """Перерахунок денормалізованого для зачеплених тем і користувачів — шматками."""
+    thread_ids, user_ids, unread_user_ids = list(thread_ids), list(user_ids), list(unread_user_ids)
+    for i in range(0, len(thread_ids), chunk_size):
+        readtracking.refresh_last_post(Thread.objects.filter(pk__in=thread_ids[i:i + chunk_size]))
+    for i in range(0, len(user_ids), chunk_size):
+        stats.recompute(user_ids[i:i + chunk_size])
+    for i in range(0, len(unread_user_ids), chunk_size):
+        notifications.recompute_unread(unread_user_ids[i:i + chunk_size])
+    authorcards.invalidate_many(user_ids)
+
+
+def delete_posts(queryset, chunk_size=CHUNK_SIZE, progress=None):
+    thread_ids, user_ids, unread_user_ids = set(), set(), set()
+    deleted = 0
+    for ids in _chunks(queryset, chunk_size):
+        with transaction.atomic():
+            for thread_id, author_id in Post.objects.filter(pk__in=ids).values_list('thread_id', 'author_id'):
+                thread_ids.add(thread_id)
+                user_ids.add(author_id)
+            unread_user_ids.update(_unseen_mentions(ids))
+            deleted += _delete_post_rows(ids)
+        _report(progress, f"  ...{deleted} posts deleted")
+    # теми, що вже видалені разом з постами, просто не знайдуться
+    _refresh(thread_ids, user_ids, unread_user_ids, chunk_size=chunk_size)
+    return deleted
+
+
+def delete_threads(queryset, chunk_size=CHUNK_SIZE, progress=None):
+    user_ids, unread_user_ids = set(), set()
+    deleted = posts = 0
+    for ids in _chunks(queryset, chunk_size):
+        user_ids.update(Thread.objects.filter(pk__in=ids).values_list('author_id', flat=True))
+        for post_ids in _chunks(Post.objects.filter(thread_id__in=ids), chunk_size):
+            with transaction.atomic():
+                user_ids.update(Post.objects.filter(pk__in=post_ids).values_list('author_id', flat=True))
+                unread_user_ids.update(_unseen_mentions(post_ids))
+                posts += _delete_post_rows(post_ids)
+            _report(progress, f"  ...{posts} posts deleted")
+        unread_user_ids.update(
+            ThreadSubscription.objects.filter(thread_id__in=ids, unread_count__gt=0)
+            .values_list('user_id', flat=True)
+        )
+        # постів уже немає — Collector зачепить лише теми, підписки, позначки й архіви
+        with transaction.atomic(), stats.suspended():
+            deleted += Thread.objects.filter(pk__in=ids).delete()[1].get(Thread._meta.label, 0)
+        _report(progress, f"  ...{deleted} threads ({posts} posts) deleted")
+    _refresh(user_ids=user_ids, unread_user_ids=unread_user_ids, chunk_size=chunk_size)
+    return deleted, posts
+
+
+def purge_cutoff():
+    """Теми, видалені раніше за цей момент, уже не відновлюються і чекають на purge."""
+    return timezone.now() - timedelta(days=GRACE_DAYS)
+
+
+def soft_delete_threads(queryset, chunk_size=CHUNK_SIZE):
+    deleted = 0
+    now = timezone.now()
+    for ids in _chunks(queryset.filter(deleted_at__isnull=True), chunk_size):
+        # update() не чіпає updated_at (auto_now)
+        deleted += Thread.objects.filter(pk__in=ids).update(deleted_at=now)
+    return deleted
+
+
+def undelete_threads(queryset, chunk_size=CHUNK_SIZE):
+    """Повертає видалені теми, якщо пільговий строк ще не минув (інакше їх уже могли почати вичищати)."""
+    restored = 0
+    for ids in _chunks(queryset.filter(deleted_at__gte=purge_cutoff()), chunk_size):
+        restored += Thread.objects.filter(pk__in=ids, deleted_at__gte=purge_cutoff()).update(deleted_at=None)
+    return restored
+
+
+def purge_deleted_threads(chunk_size=CHUNK_SIZE, limit=None, progress=None):
+    """
+    Остаточно видаляє теми, чий пільговий строк минув: по одній, пости — шматками
+    по chunk_size у коротких транзакціях; лічильники авторів перераховуються
+    після кожної теми. Повертає (тем, постів).
+    """
+    cutoff = purge_cutoff()
+    thread_ids = list(
+        Thread.objects.filter(deleted_at__lt=cutoff).order_by('deleted_at', 'pk').values_list('pk', flat=True)[:limit]
+    )
+    threads = posts = 0
+    for i, thread_id in enumerate(thread_ids, 1):
+        done, done_posts = delete_threads(
+            Thread.objects.filter(pk=thread_id, deleted_at__lt=cutoff), chunk_size, progress,
+        )
+        threads += done
+        posts += done_posts
+        _report(progress, f"  ...{i}/{len(thread_ids)} threads, {posts} posts purged")
+    return threads, posts
+
+
+def set_closed(queryset, closed=True, chunk_size=CHUNK_SIZE):
+    if not closed:
+        # архівні теми лишаються закритими, доки їх не повернуть з архіву
+        queryset = queryset.filter(archived=False)
+    updated = 0
+    for ids in _chunks(queryset, chunk_size):
+        updated += Thread.objects.filter(pk__in=ids).update(closed=closed)
+    return updated
+
+
+def move_threads(queryset, category, chunk_size=CHUNK_SIZE):
+    moved = 0
+    for ids in _chunks(queryset, chunk_size):
+        moved += Thread.objects.filter(pk__in=ids).update(category=category)
+    return moved
+
+
+def move_posts(queryset, thread, progress=None):
+    """
+    Переносить пости разом з їхніми гілками в іншу тему: кожен вибраний пост
+    стає там кореневим, шлях піддерева обрізається одним UPDATE з SUBSTR.
+    """
+    moved = 0
+    thread_ids = {thread.pk}
+    last_root = None
+    # лише (pk, thread, path) вибраних — далі таблицю постів змінюємо, тож курсор не тримаємо
+    selected = list(
+        Post.objects.filter(pk__in=queryset.values('pk')).exclude(thread=thread)
+        .order_by('thread_id', 'path').values_list('pk', 'thread_id', 'path')
+    )
+    for pk, thread_id, path in selected:
+        # нащадок уже перенесеного поста поїде разом з ним
+        if last_root and last_root[0] == thread_id and path.startswith(last_root[1]):
+            continue
+        last_root = (thread_id, path)
+        thread_ids.add(thread_id)
+
+        upper = str(int(path) + 1).zfill(len(path))
+        branch = Post.objects.filter(thread_id=thread_id, path__gte=path, path__lt=upper)
+        changes = {'thread': thread}
+        cut = len(path) - Post.PATH_STEP
+        if cut:
+            changes['path'] = Substr('path', cut + 1)
+        with transaction.atomic():
+            Post.objects.filter(pk=pk).update(parent=None)
+            moved += branch.update(**changes)
+        _report(progress, f"  ...{moved} posts moved")
+
+    _refresh(thread_ids)
+    return moved
+
+
+def purge_user(user, chunk_size=CHUNK_SIZE, progress=None):
+    """Усе, що написав користувач: теми (з чужими відповідями в них), пости, лайки; акаунт вимикається."""
+    threads, thread_posts = delete_threads(Thread.objects.filter(author=user), chunk_size, progress)
+    posts = delete_posts(Post.objects.filter(author=user), chunk_size, progress)
+
+    authors = set()
+    likes = 0
+    for ids in _chunks(PostLike.objects.filter(user=user), chunk_size):
+        with transaction.atomic():
+            authors.update(PostLike.objects.filter(pk__in=ids).values_list('post__author_id', flat=True))
+            likes += _raw_delete(PostLike.objects.filter(pk__in=ids))
+    _refresh(user_ids=authors | {user.pk}, chunk_size=chunk_size)
+
+    notifications.drop_subscriptions(user)
+    type(user).objects.filter(pk=user.pk).update(is_active=False)
+    return {'threads': threads, 'posts': posts + thread_posts, 'likes': likes}
@@ -0,0 +1,82 @@
+# forum/notifications.py
+"""
+Підписки на теми та лічильники непрочитаних відповідей (і згадок — forum/mentions.py).
+
+Fan-out нового поста — це два set-based UPDATE, незалежно від кількості
+підписників: жодного циклу по підписниках у Python і жодного COUNT при
+показі сторінки (індикатор читає Profile.unread_replies).
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import PostMention, Profile, ThreadSubscription
+
+
+def subscribe(user, thread):
+    sub, _ = ThreadSubscription.objects.get_or_create(user=user, thread=thread)
+    return sub
+
+
+def unsubscribe(user, thread):
+    sub = ThreadSubscription.objects.filter(user=user, thread=thread).first()
+    if sub is None:
+        return
+    sub.delete()
+    if sub.unread_count:
+        _decrement_profile(user.pk, sub.unread_count)
+
+
+def fan_out_post(post):
+    """
+    +1 непрочитана відповідь для всіх підписників теми, крім автора поста.
+    Обидва UPDATE виконуються одним запитом кожен (UPDATE ... WHERE user_id IN (SELECT ...)).
+    """
+    subs = ThreadSubscription.objects.filter(thread_id=post.thread_id).exclude(user_id=post.author_id)
+    Profile.objects.filter(user_id__in=subs.values('user_id')) \
+        .update(unread_replies=F('unread_replies') + 1)
+    subs.update(unread_count=F('unread_count') + 1)
+
+
+def on_post_created(post):
+    """
+    Автор автоматично підписується на тему, а решта підписників отримує сповіщення.
+    Fan-out відкладаємо до коміту транзакції, щоб не тримати блокування рядків підписок.
+    """
+    subscribe(post.author, post.thread)
+    transaction.on_commit(lambda: fan_out_post(post))
+
+
+def mark_thread_read(user, sub):
+    """Обнуляє лічильник підписки і віднімає його від лічильника профілю."""
+    if sub is None or not sub.unread_count:
+        return
+    # умова по unread_count — щоб паралельний fan-out не загубився
+    updated = ThreadSubscription.objects.filter(pk=sub.pk, unread_count=sub.unread_count) \
+        .update(unread_count=0)
+    if updated:
+        _decrement_profile(user.pk, sub.unread_count)
+        sub.unread_count = 0
+
+
+def _decrement_profile(user_id, n):
+    Profile.objects.filter(user_id=user_id) \
+        .update(unread_replies=Greatest(F('unread_replies') - n, 0))
+
+
+def recompute_unread(user_ids):
+    """
+    Profile.unread_replies = сума unread_count підписок, unread_mentions —
+    кількість непереглянутих згадок; після масового видалення тем і постів.
+    """
+    total = ThreadSubscription.objects.filter(user_id=OuterRef('user_id')).order_by() \
+        .values('user_id').annotate(s=Sum('unread_count')).values('s')[:1]
+    mentions = PostMention.objects.filter(user_id=OuterRef('user_id'), seen=False).order_by() \
+        .values('user_id').annotate(n=Count('pk')).values('n')[:1]
+    return Profile.objects.filter(user_id__in=list(user_ids)) \
+        .update(unread_replies=Coalesce(Subquery(total), 0), unread_mentions=Coalesce(Subquery(mentions), 0))
+
+
+def drop_subscriptions(user):
+    ThreadSubscription.objects.filter(user=user).delete()
+    Profile.objects.filter(user=user).update(unread_replies=0)
@@ -0,0 +1,86 @@
+# forum/permalinks.py
+"""
+Постійні посилання на пости: /p/<id>/ -> сторінка теми, де пост видно.
+
+Гаряча тема: на сторінці POSTS_PAGE_SIZE кореневих постів у порядку
+(created_at, pk), відповіді — у розгорнутій гілці (?open=<корінь>). Номер
+сторінки — це позиція кореня гілки, тобто один COUNT по частковому індексу
+forum_post_thread_roots_idx (thread, created_at) WHERE parent_id IS NULL,
+без OFFSET і без обходу постів.
+
+Архівна тема незмінна, тож позиції її постів рахуються один раз при
+архівації (ArchivedPostPosition) — тут це один запит по первинному ключу,
+блоб не розпаковується.
+"""
+import math
+
+from django.http import Http404
+
+from .models import ArchivedPostPosition, Post
+
+POSTS_PAGE_SIZE = 10
+
+
+def _branch_root(post):
+    """
+    (pk, created_at) кореня гілки, в якій thread_page показує `post`.
+    Видалення поста переносить його відповіді до батька і переписує path
+    піддерева (moderation.reattach_replies), тож перший id у path — живий корінь.
+    """
+    if post.parent_id is None:
+        return post.pk, post.created_at
+    return (
+        Post.objects.filter(thread_id=post.thread_id, pk=post.root_id)
+        .values_list('pk', 'created_at').first()
+        or (post.pk, post.created_at)
+    )
+
+
+def root_page(post):
+    """Номер сторінки теми з гілкою `post` і id її кореня."""
+    root_pk, created_at = _branch_root(post)
+    position = (
+        Post.objects.filter(thread_id=post.thread_id, parent__isnull=True, created_at__lte=created_at)
+        .exclude(created_at=created_at, pk__gt=root_pk)
+        .count()
+    )
+    return max(math.ceil(position / POSTS_PAGE_SIZE), 1), root_pk
+
+
+def thread_post_url(thread, post):
+    """URL сторінки теми з якорем на `post` (розгорнута гілка, якщо це відповідь)."""
+    page, root_pk = root_page(post)
+    url = thread.get_absolute_url()
+    params = []
+    if page > 1:
+        params.append(f"page={page}")
+    if root_pk != post.pk:
+        params.append(f"open={root_pk}")
+    if params:
+        url += "?" + "&".join(params)
+    return f"{url}#post-{post.pk}"
+
+
+def resolve(pk):
+    """URL для /p/<pk>/: гарячий пост або пост архівної теми; Http404, якщо такого немає."""
+    post = (
+        Post.objects.select_related('thread')
+        .only('pk', 'path', 'parent_id', 'created_at', 'thread__id', 'thread__slug')
+        .filter(pk=pk, thread__deleted_at__isnull=True).first()
+    )
+    if post is not None:
+        return thread_post_url(post.thread, post)
+
+    archived = (
+        ArchivedPostPosition.objects.select_related('archive__thread')
+        .only('position', 'archive__thread__id', 'archive__thread__slug')
+        .filter(post_id=pk, archive__thread__deleted_at__isnull=True).first()
+    )
+    if archived is None:
+        raise Http404("Post not found")
+    # архівна тема пагінується по всіх постах у порядку обходу дерева (archive.load_posts)
+    page = archived.position // POSTS_PAGE_SIZE + 1
+    url = archived.archive.thread.get_absolute_url()
+    if page > 1:
+        url += f"?page={page}"
+    return f"{url}#post-{pk}"
@@ -0,0 +1,144 @@
+# forum/ratelimit.py
+"""
+Обмеження частоти запитів для write-ендпоінтів (лічильники в Django cache).
+
+Кожна політика з settings.RATELIMIT_POLICIES описує швидкість ("10/m"),
+burst і ключі: 'user' та/або 'ip'. Рахуємо ковзним вікном: вікно — час, за
+який поповнюється burst (5 при 10/m -> 30 с), ліміт — burst на вікно;
+попереднє вікно враховується пропорційно тому, скільки його ще "перекриває"
+поточний момент, тож на межі вікна сплеску немає.
+
+Лічильники змінюються лише атомарними cache.add/incr, тож паралельні
+запити не затирають один одного. Працює коректно тільки зі СПІЛЬНИМ кешем
+(REDIS_URL): з LocMemCache у кожного воркера gunicorn свої лічильники і
+фактичний ліміт множиться на кількість воркерів (див. forum/checks.py).
+
+Перевірка не чіпає БД: id користувача береться з сесії, а не з request.user.
+При перевищенні повертаємо 429 з Retry-After ще до того, як view щось
+прочитає з бази.
+"""
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.http import HttpResponse
+
+_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60)."""
+    count, _, period = rate.partition('/')
+    return int(count), _PERIODS[period.strip().lower()[:1]]
+
+
+def client_ip(request):
+    """
+    REMOTE_ADDR або, за довіреним проксі, адреса з X-Forwarded-For.
+    Ліві записи заголовка підставляє сам клієнт, тому беремо той, що дописав
+    наш проксі: RATELIMIT_PROXY_HOPS-й з правого краю.
+    """
+    if getattr(settings, 'RATELIMIT_TRUST_X_FORWARDED_FOR', False):
+        hops = getattr(settings, 'RATELIMIT_PROXY_HOPS', 1)
+        forwarded = [part.strip() for part in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')]
+        if hops >= 1 and len(forwarded) >= hops and forwarded[-hops]:
+            return forwarded[-hops]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _bucket_keys(request, policy_name, keys):
+    result = []
+    if 'user' in keys:
+        # без звернення до auth_user: id лежить у сесії
+        user_id = request.session.get(SESSION_KEY) if hasattr(request, 'session') else None
+        if user_id:
+            result.append(f"rl:{policy_name}:u:{user_id}")
+    if 'ip' in keys:
+        result.append(f"rl:{policy_name}:ip:{client_ip(request)}")
+    return result
+
+
+def _window(policy):
+    """(ліміт, довжина вікна в секундах) для політики."""
+    count, period = parse_rate(policy['rate'])
+    capacity = policy.get('burst', count)
+    return capacity, capacity * period / count
+
+
+def _take(key, ttl):
+    """Атомарно +1 до лічильника; повертає нове значення."""
+    cache.add(key, 0, ttl)
+    try:
+        return cache.incr(key)
+    except ValueError:  # ключ витіснили між add та incr
+        cache.set(key, 1, ttl)
+        return 1
+
+
+def check(request, policy_name):
+    """
+    Рахує запит у кожному ключі політики.
+    Повертає 0, якщо запит дозволено, інакше — скільки секунд чекати.
+    """
+    policy = settings.RATELIMIT_POLICIES[policy_name]
+    capacity, window = _window(policy)
+    keys = _bucket_keys(request, policy_name, policy.get('keys', ('user', 'ip')))
+    if not keys:
+        return 0
+
+    index, elapsed = divmod(time.time(), window)
+    index = int(index)
+    weight = 1 - elapsed / window           # яку частку попереднього вікна ще враховуємо
+    ttl = math.ceil(2 * window) + 1
+    previous = cache.get_many([f"{key}:{index - 1}" for key in keys])
+
+    taken = []
+    wait = 0.0
+    for key in keys:
+        current_key = f"{key}:{index}"
+        current = _take(current_key, ttl)
+        taken.append(current_key)
+        before = previous.get(f"{key}:{index - 1}", 0)
+        if before * weight + current <= capacity:
+            continue
+        if current > capacity:
+            wait = max(wait, window - elapsed)
+        else:
+            # коли частка попереднього вікна спаде настільки, що запит влізе
+            wait = max(wait, window * (1 - (capacity - current) / before) - elapsed)
+
+    if wait:
+        # відмова не витрачає ліміт
+        for key in taken:
+            try:
+                cache.decr(key)
+            except ValueError:
+                pass
+        return max(1, math.ceil(wait))
+    return 0
+
+
+def too_many_requests(retry_after):
+    resp = HttpResponse("Забагато запитів. Спробуй трохи пізніше.", status=429, content_type='text/plain; charset=utf-8')
+    resp['Retry-After'] = str(retry_after)
+    return resp
+
+
+def ratelimit(policy_name, methods=('POST',)):
+    """
+    Декоратор для view. Ставити ЗОВНІ від login_required,
+    щоб відмова не завантажувала користувача з БД.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            if getattr(settings, 'RATELIMIT_ENABLED', True) and request.method in methods:
+                retry_after = check(request, policy_name)
+                if retry_after:
+                    return too_many_requests(retry_after)
+            return view_func(request, *args, **kwargs)
+        return _wrapped
+    return decorator
@@ -0,0 +1,91 @@
+# forum/readtracking.py
+"""
+"Нове з останнього візиту": позначки прочитання тем і водяні знаки категорій.
+
+- ThreadReadMarker зберігає id останнього прочитаного поста в темі;
+- CategoryReadMark ("позначити все прочитаним") — одна позначка часу на категорію,
+  після неї окремі позначки тем цієї категорії не потрібні й видаляються.
+
+Стан "непрочитано" для списку тем рахується в тому ж SQL-запиті через два
+LEFT JOIN (FilteredRelation), а не окремим запитом на кожну тему.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import BooleanField, Case, F, FilteredRelation, OuterRef, Q, Subquery, Value, When
+from django.utils import timezone
+
+from . import metrics
+from .models import CategoryReadMark, Post, ThreadReadMarker
+
+# скільки секунд не повторювати запис позначки для тієї ж теми
+READ_MARKER_DEBOUNCE = getattr(settings, 'READ_MARKER_DEBOUNCE', 60)
+
+
+def annotate_unread(qs, user):
+    """Додає до queryset тем булеве поле is_unread для користувача."""
+    if not user.is_authenticated:
+        return qs.annotate(is_unread=Value(False, output_field=BooleanField()))
+
+    return qs.annotate(
+        user_marker=FilteredRelation('read_markers', condition=Q(read_markers__user=user)),
+        user_category_mark=FilteredRelation(
+            'category__read_marks', condition=Q(category__read_marks__user=user)
+        ),
+    ).annotate(
+        is_unread=Case(
+            When(last_post__isnull=True, then=Value(False)),
+            # теми, в яких нічого не писали після реєстрації, не підсвічуємо
+            When(last_post_at__lte=user.date_joined, then=Value(False)),
+            When(user_category_mark__marked_at__gte=F('last_post_at'), then=Value(False)),
+            When(user_marker__last_read_post_id__gte=F('last_post_id'), then=Value(False)),
+            default=Value(True),
+            output_field=BooleanField(),
+        )
+    )
+
+
+def mark_thread_read(user, thread, post_id):
+    """
+    Пересуває позначку до post_id (тільки вперед).
+    Дебаунс через кеш: якщо цю (або пізнішу) позначку вже записано нещодавно — БД не чіпаємо.
+    """
+    if not user.is_authenticated or not post_id:
+        return
+
+    key = f"readmark:{user.pk}:{thread.pk}"
+    if cache.get(key, 0) >= post_id:
+        metrics.cache_lookups('readmarks', 1, 0)
+        return
+    metrics.cache_lookups('readmarks', 0, 1)
+
+    updated = ThreadReadMarker.objects \
+        .filter(user=user, thread=thread, last_read_post_id__lt=post_id) \
+        .update(last_read_post_id=post_id, read_at=timezone.now())
+    if not updated:
+        ThreadReadMarker.objects.get_or_create(
+            user=user, thread=thread, defaults={'last_read_post_id': post_id}
+        )
+
+    cache.set(key, post_id, READ_MARKER_DEBOUNCE)
+
+
+def mark_category_read(user, category):
+    CategoryReadMark.objects.update_or_create(
+        user=user, category=category, defaults={'marked_at': timezone.now()}
+    )
+    # водяний знак покриває всі теми категорії — окремі позначки більше не потрібні
+    # (ключі дебаунсу в кеші можна не чистити: старіші пости й так покриває водяний знак)
+    ThreadReadMarker.objects.filter(user=user, thread__category=category).delete()
+
+
+def refresh_last_post(threads):
+    """
+    Перераховує Thread.last_post / last_post_at одним UPDATE з підзапитом —
+    для шляхів, що обходять сигнали (імпорт, масове видалення). Архівні теми
+    пропускаються: їхній last_post — пост в архіві (forum/archive.py).
+    """
+    latest = Post.objects.filter(thread=OuterRef('pk')).order_by('-created_at', '-pk')
+    return threads.filter(archived=False).update(
+        last_post=Subquery(latest.values('pk')[:1]),
+        last_post_at=Subquery(latest.values('created_at')[:1]),
+    )
@@ -0,0 +1,131 @@
+# forum/revisions.py
+"""
+Історія редагувань постів (PostRevision).
+
+Версія 0 — оригінальний текст, далі по версії на кожне редагування через
+edit_post. Кожна версія зберігається або як дельта від попередньої (список
+операцій над токенами: [a, b] — скопіювати токени a:b старої версії,
+"рядок" — вставити), або як повний знімок. Знімок пишеться кожні
+SNAPSHOT_EVERY версій, тож відновлення будь-якої версії читає одним
+запитом не більше SNAPSHOT_EVERY рядків і застосовує стільки ж дельт —
+незалежно від того, скільки разів пост редагували загалом.
+"""
+import re
+from difflib import SequenceMatcher
+
+import orjson
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from .models import PostRevision
+
+SNAPSHOT_EVERY = getattr(settings, 'POST_REVISION_SNAPSHOT_EVERY', 10)
+
+# тег, пробіли, слово або "голий" '<' — ''.join(tokenize(x)) == x
+_TOKEN_RE = re.compile(r'<[^>]*>|\s+|[^\s<]+|<')
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text or '')
+
+
+def make_delta(old, new):
+    a, b = tokenize(old), tokenize(new)
+
+    # правка зазвичай локальна — спільні початок і кінець відрізаємо до SequenceMatcher
+    head = 0
+    limit = min(len(a), len(b))
+    while head < limit and a[head] == b[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and a[-1 - tail] == b[-1 - tail]:
+        tail += 1
+
+    ops = [[0, head]] if head else []
+    # autojunk вимкнено: у постах пробіли й часті слова — "популярні" токени,
+    # з евристикою вони ігноруються і дельта розростається майже до повного тексту
+    matcher = SequenceMatcher(None, a[head:len(a) - tail], b[head:len(b) - tail], autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([head + i1, head + i2])
+        elif tag in ('replace', 'insert'):
+            ops.append(''.join(b[head + j1:head + j2]))
+        # 'delete' — просто не копіюємо
+    if tail:
+        ops.append([len(a) - tail, len(a)])
+    return ops
+
+
+def apply_delta(old, ops):
+    tokens = tokenize(old)
+    return ''.join(''.join(tokens[op[0]:op[1]]) if isinstance(op, list) else op for op in ops)
+
+
+def _chain(post_id, number):
+    """(is_snapshot, data) від найближчого знімка <= number до number включно — один запит."""
+    last_snapshot = PostRevision.objects.filter(
+        post_id=OuterRef('post_id'), number__lte=number, is_snapshot=True
+    ).order_by('-number').values('number')[:1]
+    return list(
+        PostRevision.objects.filter(post_id=post_id, number__lte=number, number__gte=Subquery(last_snapshot))
+        .order_by('number')
+        .values_list('is_snapshot', 'data')
+    )
+
+
+def content_at(post_id, number):
+    """Текст версії `number` або None, якщо такої немає."""
+    content = None
+    for is_snapshot, data in _chain(post_id, number):
+        content = data if is_snapshot else apply_delta(content, orjson.loads(data))
+    return content
+
+
+def rebuild(post_id):
+    """Тексти всіх версій поста по порядку ([версія 0, 1, ...]) — один запит."""
+    versions = []
+    content = None
+    for is_snapshot, data in PostRevision.objects.filter(post_id=post_id).order_by('number') \
+            .values_list('is_snapshot', 'data'):
+        content = data if is_snapshot else apply_delta(content, orjson.loads(data))
+        versions.append(content)
+    return versions
+
+
+def record_edit(post, old_content, editor=None, snapshot_every=None):
+    """
+    Записує нову версію після того, як post.content уже збережено.
+    old_content — текст до редагування. Перше редагування ще й фіксує
+    оригінал як версію 0.
+    """
+    every = SNAPSHOT_EVERY if snapshot_every is None else snapshot_every
+    new_content = post.content or ''
+    old_content = old_content or ''
+    if new_content == old_content:
+        return None
+
+    with transaction.atomic():
+        last = PostRevision.objects.select_for_update() \
+            .filter(post=post).order_by('-number').values_list('number', flat=True).first()
+        if last is None:
+            original = PostRevision.objects.create(
+                post=post, number=0, is_snapshot=True, data=old_content, editor_id=post.author_id
+            )
+            PostRevision.objects.filter(pk=original.pk).update(created_at=post.created_at)
+            last, base = 0, old_content
+        else:
+            base = content_at(post.pk, last)
+
+        number = last + 1
+        data, is_snapshot = new_content, True
+        # базова версія не збігається з тим, що було в БД (правка в обхід edit_post) —
+        # починаємо новий ланцюжок зі знімка, інакше дельти застосовувались би не до того тексту
+        if base == old_content and not (every and number % every == 0):
+            delta = orjson.dumps(make_delta(base, new_content)).decode()
+            if len(delta) < len(new_content):
+                data, is_snapshot = delta, False
+
+        return PostRevision.objects.create(
+            post=post, number=number, is_snapshot=is_snapshot, data=data, editor=editor
+        )
@@ -1,14 +1,128 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import Profile
+from . import authorcards, mentions, metrics, stats
+from .models import Profile, Post, PostLike, PostMention, Thread
 
 User = get_user_model()
 
 @receiver(post_save, sender=User)
-def create_or_update_profile(sender, instance, created, **kwargs):
+def create_profile(sender, instance, created, **kwargs):
+    # лише при створенні: логін теж зберігає User (last_login), і зайвий SELECT
+    # на кожен вхід нам ні до чого; профілі старих користувачів — міграція 0012
     if created:
         Profile.objects.create(user=instance)
-    else:
-        # ensure profile exists (defensive)
-        Profile.objects.get_or_create(user=instance)
\ No newline at end of file
+
+
+@receiver(post_save, sender=Post)
+def update_thread_last_post(sender, instance, created, **kwargs):
+    # один UPDATE без завантаження теми — потрібно для позначок "нове"
+    if created:
+        Thread.objects.filter(pk=instance.thread_id).update(
+            last_post=instance, last_post_at=instance.created_at
+        )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_author_card_for_user(sender, instance, update_fields=None, **kwargs):
+    # логін зберігає лише last_login — у картці його немає
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    authorcards.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_author_card_for_profile(sender, instance, **kwargs):
+    authorcards.invalidate(instance.user_id)
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_author_card_for_post(sender, instance, **kwargs):
+    authorcards.invalidate(instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def invalidate_author_card_for_new_post(sender, instance, created, **kwargs):
+    # змінилась кількість постів автора
+    if created:
+        authorcards.invalidate(instance.author_id)
+
+
+# --- агрегати активності в Profile (forum/stats.py) ---
+
+@receiver(post_save, sender=Post)
+def stats_post_created(sender, instance, created, **kwargs):
+    if created:
+        stats.bump(instance.author_id, posts_count=1, touch=True)
+
+
+@receiver(post_delete, sender=Post)
+def stats_post_deleted(sender, instance, **kwargs):
+    stats.bump(instance.author_id, posts_count=-1)
+
+
+@receiver(post_save, sender=Thread)
+def stats_thread_created(sender, instance, created, **kwargs):
+    if created:
+        stats.bump(instance.author_id, threads_count=1, touch=True)
+
+
+@receiver(post_delete, sender=Thread)
+def stats_thread_deleted(sender, instance, **kwargs):
+    stats.bump(instance.author_id, threads_count=-1)
+
+
+@receiver(post_save, sender=PostLike)
+def stats_like_created(sender, instance, created, **kwargs):
+    if created:
+        stats.bump_likes_received(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=PostLike)
+def stats_like_deleted(sender, instance, **kwargs):
+    stats.bump_likes_received(instance.post_id, -1)
+
+
+# --- лічильники для /metrics (forum/metrics.py) ---
+
+METRICS_CREATED_TYPES = {Post: 'post', Thread: 'thread', PostLike: 'like'}
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Thread)
+@receiver(post_save, sender=PostLike)
+def metrics_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        metrics.inc('forum_created_total', (('type', METRICS_CREATED_TYPES[sender]),))
+
+
+# --- згадки (forum/mentions.py) ---
+
+@receiver(pre_save, sender=User)
+def remember_old_username(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance.pk is None or (update_fields is not None and 'username' not in update_fields):
+        return
+    instance._old_username = sender.objects.filter(pk=instance.pk).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def rerender_mentions_on_rename(sender, instance, created, **kwargs):
+    old = getattr(instance, '_old_username', None)
+    instance._old_username = None
+    if created or not old or old == instance.username:
+        return
+    # посилання "@старе" у чужих постах — після коміту, пачками
+    transaction.on_commit(lambda: mentions.rerender_after_rename(instance, old))
+
+
+@receiver(post_delete, sender=PostMention)
+def mention_deleted(sender, instance, **kwargs):
+    # видалення поста каскадом (масові — перераховують лічильник самі, див. moderation.py)
+    if not instance.seen:
+        Profile.objects.filter(user_id=instance.user_id) \
+            .update(unread_mentions=Greatest(F('unread_mentions') - 1, 0))
@@ -0,0 +1,117 @@
+# forum/stats.py
+"""
+Агрегати активності користувача в Profile: posts_count, threads_count,
+likes_received, last_activity_at.
+
+Оновлюються інкрементно з сигналів (forum/signals.py) одним UPDATE з F()
+без читання профілю. Масові операції (модерація, архівація, імпорт) можуть
+вимкнути інкременти через suspended() і потім перерахувати зачеплених
+користувачів set-based через recompute().
+
+Пости архівних тем лишаються "написаними": архівація лічильники не
+змінює, а recompute() додає внесок з ArchivedAuthorStats.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import ArchivedAuthorStats, Post, PostLike, Profile, Thread
+
+_state = threading.local()
+
+
+@contextmanager
+def suspended():
+    """Вимикає інкрементні оновлення в поточному потоці (для масових операцій)."""
+    previous = getattr(_state, 'suspended', False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def is_suspended():
+    return getattr(_state, 'suspended', False)
+
+
+def bump(user_id, touch=False, **deltas):
+    """bump(5, posts_count=1) — один UPDATE; від'ємні дельти не опускають нижче нуля."""
+    if is_suspended() or not user_id:
+        return
+    values = {}
+    for field, delta in deltas.items():
+        if delta >= 0:
+            values[field] = F(field) + delta
+        else:
+            values[field] = Greatest(F(field) + delta, 0)
+    if touch:
+        values['last_activity_at'] = timezone.now()
+    Profile.objects.filter(user_id=user_id).update(**values)
+
+
+def bump_likes_received(post_id, delta):
+    """+-1 лайк автору поста — автор береться підзапитом, без завантаження поста."""
+    if is_suspended():
+        return
+    author = Post.objects.filter(pk=post_id).values('author_id')[:1]
+    field = F('likes_received') + delta if delta >= 0 else Greatest(F('likes_received') + delta, 0)
+    Profile.objects.filter(user_id=Subquery(author)).update(likes_received=field)
+
+
+def _count(qs, group_field):
+    return Coalesce(
+        Subquery(
+            qs.order_by().values(group_field).annotate(c=Count('*')).values('c')[:1],
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def _archived(user, field, aggregate=Sum):
+    return Subquery(
+        ArchivedAuthorStats.objects.filter(user=user).order_by().values('user')
+        .annotate(value=aggregate(field)).values('value')[:1]
+    )
+
+
+def _later(a, b):
+    # Greatest на SQLite повертає NULL, якщо будь-який аргумент NULL
+    return Greatest(Coalesce(a, b), Coalesce(b, a))
+
+
+def recompute(user_ids=None):
+    """
+    Перерахунок агрегатів з нуля одним UPDATE з корельованими підзапитами.
+    user_ids=None — для всіх (краще шматками, див. rebuild_user_stats).
+    """
+    profiles = Profile.objects.all()
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=list(user_ids))
+
+    user = OuterRef('user_id')
+    return profiles.update(
+        posts_count=_count(Post.objects.filter(author=user), 'author')
+        + Coalesce(_archived(user, 'posts_count'), Value(0)),
+        threads_count=_count(Thread.objects.filter(author=user), 'author'),
+        likes_received=_count(PostLike.objects.filter(post__author=user), 'post__author')
+        + Coalesce(_archived(user, 'likes_received'), Value(0)),
+        last_activity_at=_later(
+            Subquery(
+                Post.objects.filter(author=user).order_by().values('author')
+                .annotate(last=Max('created_at')).values('last')[:1]
+            ),
+            _archived(user, 'last_post_at', Max),
+        ),
+    )
+
+
+def leaderboard(limit=6):
+    """Топ за кількістю постів — індексний order_by по Profile.posts_count."""
+    return Profile.objects.select_related('user') \
+        .filter(posts_count__gt=0) \
+        .order_by('-posts_count')[:limit]
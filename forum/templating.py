@@ -0,0 +1,47 @@
+# forum/templating.py
+"""
+Гарячі фрагменти шаблонів: цикл постів (сторінка теми, гілка відповідей,
+новий пост, кнопка лайка) і рядки тем категорії.
+
+У Django template engine {% include %} усередині циклу — помітна частка
+часу рендеру сторінки з 10–50 постами. З JINJA2_POST_LOOP=1 ці фрагменти
+рендерить Jinja2 (порти лежать у jinja2/forum/ під тими ж іменами), решта
+сторінки лишається на DTL і вставляє готовий HTML. Порти треба міняти
+разом з оригіналами в templates/forum/.
+"""
+from django.conf import settings
+from django.contrib.humanize.templatetags.humanize import naturaltime
+from django.template import engines
+from django.template.defaultfilters import pluralize
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.safestring import mark_safe
+from jinja2 import Environment
+
+
+def url(name, *args):
+    return reverse(name, args=args)
+
+
+def environment(**options):
+    """Середовище для бекенду jinja2 (TEMPLATES у settings.py)."""
+    env = Environment(**options)
+    env.globals.update({'url': url, 'static': static})
+    env.filters.update({'naturaltime': naturaltime, 'pluralize': pluralize})
+    return env
+
+
+def render_fragment(template_name, context, request=None):
+    """Фрагмент, що є в обох рушіях (forum/_post.html тощо), — тим, який обрано JINJA2_POST_LOOP."""
+    engine = engines['jinja2' if settings.JINJA2_POST_LOOP else 'django']
+    return engine.get_template(template_name).render(context, request)
+
+
+def render_loop(template_name, context, request=None):
+    """
+    Готовий HTML циклу для DTL-сторінки або None, якщо JINJA2_POST_LOOP
+    вимкнено — тоді цикл рендерить сам шаблон сторінки.
+    """
+    if not settings.JINJA2_POST_LOOP:
+        return None
+    return mark_safe(engines['jinja2'].get_template(template_name).render(context, request))
@@ -1,3 +1,268 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from myforum.db_router import PIN_COOKIE, PinPrimaryMiddleware, ReplicaRouter, read_from_replica
+from . import archive, moderation, permalinks, revisions, stats
+from .models import Category, Post, PostLike, Profile, Thread
+from .utils.html_sanitizer import MAX_MENTIONS, sanitize_post_html
 
 # Create your tests here.
+
+
+class SimulatedReplicaRouter(ReplicaRouter):
+    primary_alias = 'sim_primary'
+
+
+@read_from_replica
+def _count_categories(request):
+    return HttpResponse(str(Category.objects.count()))
+
+
+@override_settings(
+    DATABASE_ROUTERS=['forum.tests.SimulatedReplicaRouter'],
+    DATABASE_REPLICAS=['sim_replica'],
+)
+class ReplicaRoutingTests(SimpleTestCase):
+    """
+    Primary і репліка — два окремі SQLite-файли без реплікації між ними:
+    запис на primary не видно на "репліці", тож по результату читання
+    зрозуміло, куди його направив роутер.
+    """
+    aliases = ('sim_primary', 'sim_replica')
+
+    @classmethod
+    def setUpClass(cls):
+        # аліаси реєструємо після super(): SimpleTestCase блокує запити лише до
+        # тих БД, що були в connections на момент setUpClass (default — заблокована)
+        super().setUpClass()
+        cls._tmpdir = tempfile.mkdtemp()
+        for alias in cls.aliases:
+            db = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(Path(cls._tmpdir) / f'{alias}.sqlite3')}
+            connections.settings[alias] = connections.configure_settings({DEFAULT_DB_ALIAS: db})[DEFAULT_DB_ALIAS]
+            call_command('migrate', database=alias, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        for alias in cls.aliases:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+        shutil.rmtree(cls._tmpdir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        Category.objects.create(title='Primary only', slug='primary-only')
+
+    def tearDown(self):
+        for alias in self.aliases:
+            Category.objects.using(alias).all().delete()
+
+    def test_writes_go_to_primary(self):
+        self.assertEqual(Category.objects.using('sim_primary').count(), 1)
+        self.assertEqual(Category.objects.using('sim_replica').count(), 0)
+
+    def test_reads_outside_marked_views_use_primary(self):
+        self.assertEqual(Category.objects.count(), 1)
+
+    def test_marked_view_reads_from_replica(self):
+        response = _count_categories(self.factory.get('/'))
+        self.assertEqual(response.content, b'0')
+
+    def test_pin_cookie_keeps_reads_on_primary(self):
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        response = _count_categories(request)
+        self.assertEqual(response.content, b'1')
+
+    def test_category_page_is_routed_to_replica(self):
+        self.assertEqual(self.client.get('/c/primary-only/').status_code, 404)
+
+    def test_successful_write_pins_primary(self):
+        middleware = PinPrimaryMiddleware(lambda request: HttpResponse(status=302))
+        response = middleware(self.factory.post('/t/1/add-post/'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        response = middleware(self.factory.get('/'))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_failed_write_does_not_pin(self):
+        middleware = PinPrimaryMiddleware(lambda request: HttpResponse(status=429))
+        response = middleware(self.factory.post('/t/1/add-post/'))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+class ArchivedRevisionsTests(TestCase):
+    """Історія редагувань переживає архівацію і відновлення теми (forum/archive.py)."""
+
+    def setUp(self):
+        author = get_user_model().objects.create(username='archived-author')
+        category = Category.objects.create(title='Archive', slug='archive')
+        self.thread = Thread.objects.create(title='Cold', slug='cold', category=category, author=author)
+        self.post = Post.objects.create(thread=self.thread, author=author, content='<p>Версія 0</p>')
+        self.versions = ['<p>Версія 0</p>']
+        # snapshot_every=3 — у ланцюжку і знімки, і дельти
+        for i in range(1, 6):
+            old = self.post.content
+            self.post.content = f'<p>Версія {i}: {"правка " * i}</p>'
+            self.post.save()
+            revisions.record_edit(self.post, old, editor=author, snapshot_every=3)
+            self.versions.append(self.post.content)
+
+    def test_every_version_survives_archive_and_restore(self):
+        self.assertEqual(revisions.rebuild(self.post.pk), self.versions)
+
+        archive.archive_thread(self.thread.pk)
+        self.thread.refresh_from_db()
+        self.assertTrue(self.thread.archived)
+        self.assertEqual(self.thread.last_post_id, self.post.pk)
+
+        archive.restore_thread(self.thread)
+        self.assertEqual(revisions.rebuild(self.post.pk), self.versions)
+        self.assertEqual(revisions.content_at(self.post.pk, 2), self.versions[2])
+
+
+class MentionLimitTests(TestCase):
+    """Згадки й цитати разом не дають більше MAX_MENTIONS адресатів на пост."""
+
+    def test_quotes_and_mentions_share_the_cap(self):
+        User = get_user_model()
+        category = Category.objects.create(title='Quotes', slug='quotes')
+        thread = Thread.objects.create(title='Many', slug='many', category=category,
+                                       author=User.objects.create(username='starter'))
+        users = [User.objects.create(username=f'user{i}') for i in range(MAX_MENTIONS + 5)]
+        posts = [Post.objects.create(thread=thread, author=user, content='<p>x</p>') for user in users]
+
+        quotes = ' '.join(f'>>{post.pk}' for post in posts)
+        html, mentioned = sanitize_post_html(f'<p>{quotes} @starter</p>')
+        self.assertEqual(len(mentioned), MAX_MENTIONS)
+        self.assertEqual(html.count('quote-ref'), MAX_MENTIONS)
+
+        # повторна цитата вже врахованого автора ліміт не витрачає
+        html, mentioned = sanitize_post_html(f'<p>>>{posts[0].pk} >>{posts[0].pk} @user1</p>')
+        self.assertEqual(mentioned, {users[0].pk, users[1].pk})
+
+
+class ExportImportTests(TestCase):
+    """export_forum -> import_forum зберігає дерево відповідей і цитати."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def _round_trip(self, batch_size):
+        author = get_user_model().objects.create(username=f'exporter{batch_size}')
+        category = Category.objects.create(title=f'Dump {batch_size}', slug=f'dump-{batch_size}')
+        thread = Thread.objects.create(title='Tree', slug='tree', category=category, author=author)
+        root = Post.objects.create(thread=thread, author=author, content='<p>root</p>')
+        reply = Post.objects.create(thread=thread, author=author, parent=root, content='<p>reply</p>')
+        nested = Post.objects.create(thread=thread, author=author, parent=reply,
+                                     content=f'<p>&gt;&gt;{root.pk}</p>')
+        nested.content, _ = sanitize_post_html(nested.content)
+        nested.save()
+        # цитата вперед по дампу: пост, на який посилаються, імпортується пізніше
+        root.content, _ = sanitize_post_html(f'<p>див. &gt;&gt;{nested.pk}</p>')
+        root.save()
+
+        dump = self.tmp / f'dump-{batch_size}.ndjson'
+        call_command('export_forum', str(dump), stdout=StringIO())
+        call_command('import_forum', str(dump), '--batch-size', str(batch_size),
+                     '--state', str(self.tmp / f'state-{batch_size}.sqlite3'), stdout=StringIO())
+
+        copy = Thread.objects.exclude(pk=thread.pk).get(category=category, title='Tree')
+        new_root, new_reply, new_nested = Post.objects.filter(thread=copy).order_by('pk')
+        self.assertIsNone(new_root.parent_id)
+        self.assertEqual(new_reply.parent_id, new_root.pk)
+        self.assertEqual(new_nested.parent_id, new_reply.pk)
+        self.assertEqual(new_nested.path, Post.make_path(Post.make_path(new_root.path, new_reply.pk), new_nested.pk))
+        self.assertIn(f'href="/p/{new_root.pk}/"', new_nested.content)
+        self.assertIn(f'&gt;&gt;{new_root.pk}<', new_nested.content)
+        self.assertIn(f'href="/p/{new_nested.pk}/"', new_root.content)
+
+    def test_replies_in_same_batch(self):
+        self._round_trip(batch_size=1000)
+
+    def test_replies_across_batches(self):
+        self._round_trip(batch_size=1)
+
+
+class ArchivedStatsTests(TestCase):
+    """Архівні пости лишаються в лічильниках Profile: recompute() погоджується з інкрементами."""
+
+    def test_recompute_after_archive_keeps_counters(self):
+        User = get_user_model()
+        author, fan = User.objects.create(username='stats-author'), User.objects.create(username='stats-fan')
+        category = Category.objects.create(title='Stats', slug='stats')
+        thread = Thread.objects.create(title='Counted', slug='counted', category=category, author=author)
+        live = Thread.objects.create(title='Live', slug='live', category=category, author=fan)
+        # останній пост автора — в архівній темі
+        Post.objects.create(thread=live, author=author, content='<p>1</p>')
+        first = Post.objects.create(thread=thread, author=author, content='<p>2</p>')
+        Post.objects.create(thread=thread, author=author, parent=first, content='<p>3</p>')
+        PostLike.objects.create(user=fan, post=first)
+
+        def counters():
+            return list(Profile.objects.filter(user__in=[author, fan]).order_by('user_id')
+                        .values_list('posts_count', 'threads_count', 'likes_received', 'last_activity_at'))
+
+        stats.recompute([author.pk, fan.pk])
+        before = counters()
+        self.assertEqual(before[0][:3], (3, 1, 1))
+
+        archive.archive_thread(thread.pk)
+        self.assertEqual(counters(), before)
+        stats.recompute([author.pk, fan.pk])
+        self.assertEqual(counters(), before)
+
+        archive.restore_thread(Thread.objects.get(pk=thread.pk))
+        stats.recompute([author.pk, fan.pk])
+        self.assertEqual(counters(), before)
+
+
+class DeletedPostRepliesTests(TestCase):
+    """Видалення поста з відповідями: піддерево переходить до його батька з переписаним path."""
+
+    def setUp(self):
+        self.author = get_user_model().objects.create(username='tree-author')
+        category = Category.objects.create(title='Tree', slug='tree')
+        self.thread = Thread.objects.create(title='Branches', slug='branches', category=category, author=self.author)
+        self.root = self._post(None)
+        self.middle = self._post(self.root)
+        self.child = self._post(self.middle)
+        self.grandchild = self._post(self.child)
+
+    def _post(self, parent):
+        return Post.objects.create(thread=self.thread, author=self.author, parent=parent, content='<p>x</p>')
+
+    def _reload(self, *posts):
+        return [Post.objects.get(pk=p.pk) for p in posts]
+
+    def test_view_delete_reattaches_replies_to_parent(self):
+        self.client.force_login(self.author)
+        self.client.post(reverse('post_delete', args=[self.middle.pk]))
+
+        child, grandchild = self._reload(self.child, self.grandchild)
+        self.assertEqual(child.parent_id, self.root.pk)
+        self.assertEqual(child.path, Post.make_path(self.root.path, child.pk))
+        self.assertEqual(grandchild.path, Post.make_path(child.path, grandchild.pk))
+        self.assertEqual(list(self.root.subtree()), [child, grandchild])
+        self.assertEqual(permalinks.root_page(grandchild), (1, self.root.pk))
+
+    def test_deleting_roots_makes_replies_roots(self):
+        moderation.delete_posts(Post.objects.filter(pk__in=[self.root.pk, self.child.pk]))
+
+        middle, grandchild = self._reload(self.middle, self.grandchild)
+        self.assertIsNone(middle.parent_id)
+        self.assertEqual(middle.path, Post.make_path('', middle.pk))
+        self.assertEqual(grandchild.parent_id, middle.pk)
+        self.assertEqual(grandchild.path, Post.make_path(middle.path, grandchild.pk))
+        self.assertEqual(permalinks.root_page(grandchild), (1, middle.pk))
@@ -1,13 +1,27 @@
 # forum/urls.py
 from django.urls import include, path
 from django.contrib.auth import views as auth_views
-from . import views
+from . import api, metrics, views
 
 
 handler404 = "forum.views.custom_404"
 
+# read-only JSON API (forum/api.py)
+api_urlpatterns = [
+    path("categories/", api.categories, name="categories"),
+    path("categories/<slug:slug>/threads/", api.category_threads, name="category_threads"),
+    path("threads/<int:pk>/", api.thread_detail, name="thread"),
+    path("threads/<int:pk>/posts/", api.thread_posts, name="thread_posts"),
+    path("posts/<int:pk>/", api.post_detail, name="post"),
+    path("users/<str:username>/", api.user_detail, name="user"),
+]
+
 urlpatterns = [
     path('', views.index, name='index'),
+    # Prometheus (forum/metrics.py)
+    path('metrics', metrics.metrics_view, name='metrics'),
+    # віджети сайдбару для hx-boost навігації (views._render_page)
+    path("sidebar/<slug:name>/", views.sidebar_fragment, name="sidebar"),
     
     # static/info pages
     path("about/", views.about_page, name="about"),
@@ -17,17 +31,25 @@ urlpatterns = [
     # categories
     path("categories/", views.categories_list_page, name="categories"),
     path("c/<slug:slug>/", views.category_page, name="category"),
+    path("c/<slug:slug>/mark-read/", views.mark_category_read, name="category_mark_read"),
     
     # threads
     path('new-thread/', views.new_thread_page, name='new_thread'),
     path('t/<int:pk>/edit/', views.edit_thread, name='thread_edit'),
     path('t/<int:pk>/delete/', views.delete_thread, name='thread_delete'),
-    path("t/<int:pk>/<slug:slug>/", views.thread_page, name="thread"),
+    # ці маршрути мають іти перед 't/<pk>/<slug>/', інакше 'add-post' сприймається як slug
     path('t/<int:thread_pk>/add-post/', views.post_create_htmx, name='post_create_htmx'),
+    path('t/<int:pk>/subscribe/', views.toggle_subscription, name='thread_subscribe'),
+    path('t/<int:pk>/restore/', views.restore_thread, name='thread_restore'),
+    path('t/<int:pk>/undelete/', views.undelete_thread, name='thread_undelete'),
+    path("t/<int:pk>/<slug:slug>/", views.thread_page, name="thread"),
     
     # posts
+    path('p/<int:pk>/', views.post_permalink, name='post_permalink'),
+    path('post/<int:pk>/replies/', views.post_replies, name='post_replies'),
     path('post/<int:pk>/edit/', views.edit_post, name='post_edit'),
     path('post/<int:pk>/delete/', views.delete_post, name='post_delete'),
+    path('post/<int:pk>/history/', views.post_history, name='post_history'),
     
     # edits
     path('post/<int:pk>/edit/', views.edit_post, name='edit_post'),
@@ -36,6 +58,12 @@ urlpatterns = [
     # likes
     path('post/<int:pk>/like/', views.toggle_like, name='toggle_like'),
     
+    # JSON API
+    path("api/v1/", include((api_urlpatterns, "api"))),
+
+    # notifications (підписки на теми)
+    path("notifications/", views.notifications_page, name="notifications"),
+
     # User profile
     path("profile/", views.profile_page, name="profile"),
     path("profile/edit/", views.profile_edit_page, name="profile_edit"),
@@ -0,0 +1,63 @@
+# forum/utils/dataset.py
+"""
+Спільне для export_forum / import_forum: формат NDJSON (опційно gzip).
+
+Кожен рядок — один JSON-об'єкт з полем "type". Порядок типів у файлі
+фіксований (RECORD_TYPES), тож при імпорті батьківські записи завжди
+трапляються раніше за дочірні й зовнішні ключі можна перемапити на ходу.
+Денормалізовані поля (Thread.last_post, Post.path, лічильники Profile)
+не експортуються — import_forum перераховує їх наприкінці. Пости йдуть з
+parent_id, а цитати в тексті (/p/<id>/) — зі старими id: і те, і інше
+import_forum перемаплює на нові.
+
+Архів — деталь зберігання: пости й лайки архівних тем (ThreadArchive)
+пишуться звичайними записами post/like (лайки — без id), тема — з
+archived=true і closed як до архівації; import_forum архівує її знову.
+М'яко видалені теми йдуть з deleted_at і після імпорту лишаються видаленими
+(purge_deleted_threads прибере їх у свій строк).
+"""
+import gzip
+from contextlib import contextmanager
+
+FORMAT_VERSION = 3
+# 1 — без archived у темах, 2 — без deleted_at
+SUPPORTED_VERSIONS = (1, 2, 3)
+
+# (type, поля) — у порядку запису у файл
+RECORD_TYPES = [
+    ('user', ('id', 'username', 'email', 'password', 'first_name', 'last_name',
+              'is_staff', 'is_superuser', 'is_active', 'date_joined', 'last_login')),
+    ('profile', ('user_id', 'avatar', 'bio', 'location', 'website', 'created_at')),
+    ('category', ('id', 'title', 'slug', 'description', 'created_at')),
+    ('thread', ('id', 'category_id', 'title', 'slug', 'author_id', 'created_at',
+                'updated_at', 'pinned', 'closed', 'views', 'archived', 'deleted_at')),
+    ('post', ('id', 'thread_id', 'author_id', 'content', 'created_at', 'edited_at', 'parent_id')),
+    ('like', ('id', 'user_id', 'post_id', 'created_at')),
+]
+
+
+def open_stream(path, mode):
+    """'rb'/'wb' — файл .gz стискаємо/розпаковуємо потоково."""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode, compresslevel=6) if 'w' in mode else gzip.open(path, mode)
+    return open(path, mode)
+
+
+@contextmanager
+def keep_timestamps():
+    """bulk_create інакше перезапише created_at/updated_at поточним часом (auto_now*)."""
+    from forum.models import Post, PostLike, Thread
+
+    fields = [
+        (f, f.auto_now, f.auto_now_add)
+        for model in (Thread, Post, PostLike)
+        for f in model._meta.concrete_fields
+        if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)
+    ]
+    for f, _, _ in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in fields:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
@@ -1,4 +1,11 @@
+import re
+from functools import partial
+from html import unescape
+
 import bleach
+from bleach.html5lib_shim import Filter
+from django.contrib.auth import get_user_model
+from django.urls import reverse
 
 # Базовий whitelist під Quill
 ALLOWED_TAGS = [
@@ -16,6 +23,23 @@ ALLOWED_ATTRIBUTES = {
 
 ALLOWED_PROTOCOLS = ["http", "https", "mailto"]
 
+# @username (символи — як у валідаторі імен Django, крім '@') і >>123 — посилання на пост
+REFERENCE_RE = re.compile(r'(?<![\w@])@(\w[\w.+-]*)|>>(\d{1,18})')
+# більше адресатів (згадки й цитати разом) в одному пості не розбираємо —
+# решта лишається текстом
+MAX_MENTIONS = 20
+
+
+def _internal_aware(callback):
+    # внутрішні посилання (згадки, цитати) — без nofollow і без нової вкладки
+    def wrapper(attrs, new=False):
+        href = attrs.get((None, "href"), "")
+        if href.startswith("/") and not href.startswith("//"):
+            return attrs
+        return callback(attrs, new)
+    return wrapper
+
+
 def sanitize_html(html: str) -> str:
     """
     Clean user HTML input to prevent XSS.
@@ -32,7 +56,179 @@ def sanitize_html(html: str) -> str:
     # Автоматично робимо лінки безпечними
     cleaned = bleach.linkify(
         cleaned,
-        callbacks=[bleach.callbacks.nofollow, bleach.callbacks.target_blank],
+        callbacks=[_internal_aware(bleach.callbacks.nofollow), _internal_aware(bleach.callbacks.target_blank)],
     )
 
     return cleaned
+
+
+_TEXT_TOKENS = ('Characters', 'SpaceCharacters', 'Entity')
+
+
+def _text_of(tokens):
+    return ''.join(unescape(f"&{t['name']};") if t['type'] == 'Entity' else t['data'] for t in tokens)
+
+
+class _ReferenceFilter(Filter):
+    """
+    Замінює в тексті @username і >>123 на посилання (поза існуючими <a>).
+    Посилання, які ми ж колись згенерували (текст "@name" на профіль name,
+    ">>N" на /p/N/ чи старе #post-N), розгортаються і розбираються заново — так редагування
+    і перейменування користувача дають актуальні посилання, а підробити
+    згадку вручну зібраним <a> неможливо.
+    """
+
+    def __init__(self, source, users, posts, mentioned):
+        super().__init__(source)
+        self.users = users
+        self.posts = posts
+        self.mentioned = mentioned
+
+    def __iter__(self):
+        anchor, run = None, []
+        for token in super().__iter__():
+            if anchor is not None:
+                anchor.append(token)
+                if token['type'] == 'EndTag' and token['name'] == 'a':
+                    yield from self._anchor(anchor)
+                    anchor = None
+            elif token['type'] in _TEXT_TOKENS:
+                # санітайзер ріже текст на шматки по сутностях (&gt; — окремий токен)
+                run.append(token)
+                continue
+            else:
+                yield from self._run(run)
+                run = []
+                if token['type'] == 'StartTag' and token['name'] == 'a':
+                    anchor = [token]
+                else:
+                    yield token
+        yield from self._run(run)
+        if anchor:
+            yield from anchor
+
+    def _run(self, tokens):
+        text = _text_of(tokens)
+        if not REFERENCE_RE.search(text):
+            return tokens
+        return self._text(text)
+
+    def _anchor(self, tokens):
+        inner = tokens[1:-1]
+        if inner and all(t['type'] in _TEXT_TOKENS for t in inner):
+            text = _text_of(inner)
+            href = tokens[0]['data'].get((None, 'href'), '')
+            match = REFERENCE_RE.fullmatch(text)
+            if match and (
+                (match[1] and href == reverse('profile_view', args=[match[1]]))
+                # старі посилання вели на тему з якорем, нові — на /p/<id>/
+                or (match[2] and (href == reverse('post_permalink', args=[match[2]])
+                                  or href.endswith(f'#post-{match[2]}')))
+            ):
+                return self._text(text)
+        return tokens
+
+    def _link(self, href, text, css_class, title=None):
+        attrs = {(None, 'href'): href, (None, 'class'): css_class}
+        if title:
+            attrs[(None, 'title')] = title
+        return [
+            {'type': 'StartTag', 'name': 'a', 'namespace': None, 'data': attrs},
+            {'type': 'Characters', 'data': text},
+            {'type': 'EndTag', 'name': 'a', 'namespace': None},
+        ]
+
+    def _notify(self, user_id):
+        # ліміт на кількість різних адресатів: згадки й цитати — спільний
+        if user_id not in self.mentioned and len(self.mentioned) >= MAX_MENTIONS:
+            return False
+        self.mentioned.add(user_id)
+        return True
+
+    def _text(self, data):
+        tokens, pos = [], 0
+        for match in REFERENCE_RE.finditer(data):
+            if match[1]:
+                name = match[1].rstrip('.')  # крапка в кінці речення — не частина імені
+                user = self.users.get(name)
+                if user is None or not self._notify(user[0]):
+                    continue
+                end = match.start(1) + len(name)
+                link = self._link(reverse('profile_view', args=[user[1]]), '@' + user[1], 'mention')
+            else:
+                post = self.posts.get(int(match[2]))
+                if post is None or not self._notify(post[0]):
+                    continue
+                author_name = post[1]
+                end = match.end()
+                # постійне посилання: веде на потрібну сторінку й гілку, переживає архівацію теми
+                link = self._link(reverse('post_permalink', args=[match[2]]), match[0], 'quote-ref',
+                                  title='@' + author_name)
+            if match.start() > pos:
+                tokens.append({'type': 'Characters', 'data': data[pos:match.start()]})
+            tokens.extend(link)
+            pos = end
+        if pos < len(data):
+            tokens.append({'type': 'Characters', 'data': data[pos:]})
+        return tokens
+
+
+def _resolve(html, aliases):
+    """Один запит по користувачах і один по постах для всіх кандидатів у тексті."""
+    from forum.models import Post
+
+    names, post_ids = set(), set()
+    for match in REFERENCE_RE.finditer(html):
+        if match[1]:
+            names.add(match[1].rstrip('.'))
+        else:
+            post_ids.add(int(match[2]))
+
+    users = {}
+    if names:
+        for pk, username in get_user_model().objects.filter(username__in=names).values_list('pk', 'username'):
+            users[username] = (pk, username)
+    # старе ім'я після перейменування веде на того ж користувача
+    for old, user in (aliases or {}).items():
+        users[old] = (user.pk, user.username)
+
+    posts = {}
+    if post_ids:
+        rows = Post.objects.filter(pk__in=post_ids).values_list('pk', 'author_id', 'author__username')
+        for pk, author_id, author_name in rows:
+            posts[pk] = (author_id, author_name)
+    return users, posts
+
+
+def _render(cleaned, users, posts):
+    mentioned = set()
+    if not users and not posts:
+        return cleaned, mentioned
+    # другий прохід по вже очищеному HTML: фільтр іде після санітайзера,
+    # тож його class/title не вирізаються
+    cleaner = bleach.Cleaner(
+        tags=ALLOWED_TAGS,
+        attributes={"a": ["href", "title", "target", "rel", "class"]},
+        protocols=ALLOWED_PROTOCOLS,
+        strip=True,
+        filters=[partial(_ReferenceFilter, users=users, posts=posts, mentioned=mentioned)],
+    )
+    return cleaner.clean(cleaned), mentioned
+
+
+def sanitize_post_html(html: str, aliases=None):
+    """
+    sanitize_html + розбір згадок і цитат у збережені посилання.
+    Повертає (html, множина id згаданих користувачів) — з неї
+    forum/mentions.py будує індекс PostMention. aliases — {старе_ім'я: user}
+    для повторного рендера після перейменування.
+    """
+    cleaned = sanitize_html(html)
+    return _render(cleaned, *_resolve(unescape(cleaned), aliases))
+
+
+def sanitize_post_html_many(htmls, aliases=None):
+    """Те саме для пачки текстів — імена й пости розбираються спільно, двома запитами на всю пачку."""
+    cleaned = [sanitize_html(html) for html in htmls]
+    users, posts = _resolve(unescape('\n'.join(cleaned)), aliases)
+    return [_render(html, users, posts) for html in cleaned]
@@ -1,13 +1,13 @@
-import math
 import random
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse, HttpResponseForbidden
+from django.http import Http404, HttpResponse, HttpResponseForbidden
 from django.template.loader import render_to_string
 
 from django.db import transaction
 from django.core.paginator import Paginator
-from django.db.models import Count, Prefetch
+from django.db.models import Count, Q
 from django.urls import reverse, NoReverseMatch
+from django.utils.cache import patch_vary_headers
 
 from django.contrib import messages
 from django.contrib.auth import login, get_user_model
@@ -19,9 +19,16 @@ from datetime import timedelta
 import logging
 
 from myforum import settings
-
+from myforum.db_router import primary, read_from_replica
+
+from . import (
+    archive, authorcards, fingerprints, infopages, mentions, moderation, notifications, permalinks, readtracking,
+    revisions, stats, templating,
+)
+from .permalinks import POSTS_PAGE_SIZE
+from .ratelimit import ratelimit
 from .forms import ThreadForm, PostForm, ProfileForm, UserUpdateForm, RegisterForm
-from .models import PostLike, Profile, Thread, Post, Category
+from .models import PostLike, Thread, Post, Category, ThreadSubscription
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -38,36 +45,143 @@ def _is_htmx(request):
     return str(hx).lower() in ('true', '1')
 
 
+def _index_sidebar(request):
+    since = timezone.now() - timedelta(minutes=15)
+    users_online_qs = User.objects.filter(last_login__gte=since).order_by('-last_login')[:10]
+    return {
+        'categories': Category.objects.annotate(threads_count=_visible_threads_count()).order_by('title'),
+        'users_online': users_online_qs,
+        'users_online_count': users_online_qs.count(),
+    }
+
+
+def _visible_threads_count():
+    # видалені (ще не вичищені purge) теми не рахуємо
+    return Count('threads', filter=Q(threads__deleted_at__isnull=True))
+
+
+def _top_users_sidebar(request):
+    return {'top_users': stats.leaderboard(6)}
+
+
+# віджети сайдбару: шаблон і його запити
+SIDEBARS = {
+    'index': ('forum/partials/sidebar_index.html', _index_sidebar),
+    'top-users': ('forum/partials/sidebar_top_users.html', _top_users_sidebar),
+}
+
+
+def _render_page(request, template, context, sidebar=None):
+    """
+    Сторінка з base.html або, для навігації через hx-boost, лише її блок content
+    у partial.html (вставляється в <main id="main">). У другому випадку
+    запити сайдбару не робляться: віджет з hx-preserve лишається з попередньої
+    сторінки, а якщо його там не було — довантажується з sidebar_fragment.
+    """
+    boosted = request.htmx.boosted
+    context['base_template'] = 'partial.html' if boosted else 'base.html'
+    context['sidebar_deferred'] = boosted
+    if sidebar and not boosted:
+        context.update(SIDEBARS[sidebar][1](request))
+    response = render(request, template, context)
+    # одна URL — дві різні відповіді: кешам і браузеру треба їх розрізняти
+    patch_vary_headers(response, ('HX-Boosted',))
+    return response
+
+
+@read_from_replica
+def sidebar_fragment(request, name):
+    if name not in SIDEBARS:
+        raise Http404
+    template, build = SIDEBARS[name]
+    return render(request, template, build(request))
+
+
+def _decorate_posts(request, posts):
+    """
+    Права, картка автора і "чи лайкнув я" для списку постів.
+    Автори — з кешу карток (authorcards), лайки — з prefetch_related('likes'),
+    без запиту на кожен пост.
+    """
+    user = request.user
+    posts = authorcards.attach_cards(posts)
+    for p in posts:
+        p.can_edit = (
+            user.is_authenticated
+            and (user.pk == p.author_id or user.is_staff)
+        )
+        p.author_profile_url = p.author_card['profile_url'] if p.author_card else '#'
+
+        # лайки
+        if user.is_authenticated:
+            p.liked = any(like.user_id == user.pk for like in p.likes.all())
+        else:
+            p.liked = False
+
+        # відступ у дереві відповідей (корінь і перший рівень — без відступу)
+        p.indent = min(max(p.depth - 1, 0), 8) * 24
+    return posts
+
 
+# Списки постів показують заголовок теми, автора, час і excerpt — content
+# (повний HTML) та інші поля поста з БД не тягнемо.
+LISTED_POST_FIELDS = ('pk', 'author_id', 'created_at', 'excerpt', 'thread__id', 'thread__title', 'thread__slug')
+
+
+def _recent_posts():
+    return (
+        Post.objects.filter(thread__deleted_at__isnull=True)
+        .select_related('thread').only(*LISTED_POST_FIELDS)
+        .order_by('-created_at')
+    )
+
+
+def _profile_posts(user):
+    return (
+        Post.objects.filter(author=user, thread__deleted_at__isnull=True)
+        .select_related('thread').only(*LISTED_POST_FIELDS)
+        .order_by('-created_at')
+    )
+
+
+def _category_threads(category):
+    """
+    Теми категорії з останнім постом через денормалізований Thread.last_post
+    (JOIN одного рядка на тему), а не prefetch усіх постів кожної теми.
+    """
+    return (
+        category.threads
+        .filter(deleted_at__isnull=True)
+        .select_related('last_post')
+        .defer('last_post__content', 'last_post__excerpt', 'last_post__path', 'last_post__edited_at')
+        .annotate(posts_count=Count('posts'))
+        .order_by('-pinned', '-updated_at')
+    )
+
+
+@read_from_replica
 def index(request):
-    qs = Thread.objects.select_related('author', 'category') \
+    qs = Thread.objects.filter(deleted_at__isnull=True).select_related('author', 'category') \
         .annotate(posts_count=Count('posts')) \
         .order_by('-pinned', '-updated_at')
+    qs = readtracking.annotate_unread(qs, request.user)
 
     paginator = Paginator(qs, 20)
     page = request.GET.get('page')
     threads = paginator.get_page(page)
 
-    popular_threads = Thread.objects.select_related('author', 'category') \
+    popular_threads = Thread.objects.filter(deleted_at__isnull=True).select_related('author', 'category') \
         .annotate(posts_count=Count('posts')) \
         .order_by('-views', '-updated_at')[:5]
 
-    recent_posts = Post.objects.select_related('author', 'thread') \
-        .order_by('-created_at')[:5]
-
-    categories = Category.objects.annotate(threads_count=Count('threads')).order_by('title')
-
-    since = timezone.now() - timedelta(minutes=15)
-    users_online_qs = User.objects.filter(last_login__gte=since).order_by('-last_login')[:10]
-    users_online_count = users_online_qs.count()
+    archive.fill_listing(threads)
+    archive.fill_listing(popular_threads)
+    recent_posts = authorcards.attach_cards(_recent_posts()[:5])
 
     context = {
         'threads': threads,
         'popular_threads': popular_threads,
         'recent_posts': recent_posts,
-        'categories': categories,
-        'users_online': users_online_qs,
-        'users_online_count': users_online_count,
     }
     
     
@@ -92,54 +206,38 @@ def index(request):
     })
     
     
-    return render(request, 'forum/index.html', context)
+    return _render_page(request, 'forum/index.html', context, sidebar='index')
 
 def custom_404(request, exception):
     return render(request, "errors/404.html", status=404)
 
 
+@read_from_replica
 def category_page(request, slug):
     category = get_object_or_404(Category, slug=slug)
 
-    posts_prefetch = Prefetch(
-        'posts',
-        queryset=Post.objects.select_related('author').order_by('-created_at'),
-        to_attr='prefetched_posts'
-    )
-
-    threads_qs = (
-        category.threads
-        .select_related('author', 'category')
-        .prefetch_related(posts_prefetch)
-        .annotate(posts_count=Count('posts'))
-        .order_by('-pinned', '-updated_at')
-    )
+    threads_qs = readtracking.annotate_unread(_category_threads(category), request.user)
 
     # пагінація
     paginator = Paginator(threads_qs, 15)
     threads_page = paginator.get_page(request.GET.get('page'))
 
+    archive.fill_listing(threads_page)
+    # картки авторів тем і останніх постів — одним get_many
+    authorcards.attach_cards(threads_page)
+    authorcards.attach_cards(t.last_post for t in threads_page)
     for t in threads_page:
-        t.last_post = (t.prefetched_posts[0] if getattr(t, 'prefetched_posts', None) else None)
-        try:
-            uname = getattr(t.author, 'username', None)
-            t.author_profile_url = reverse('profile_view', args=[uname]) if uname else '#'
-        except NoReverseMatch:
-            t.author_profile_url = '#'
-
-    categories = Category.objects.annotate(topics=Count('threads')).order_by('title')
-    top_users = User.objects.annotate(posts_count=Count('posts')).order_by('-posts_count')[:6]
+        t.author_profile_url = t.author_card['profile_url'] if t.author_card else '#'
 
     context = {
         'category': category,
         'threads': threads_page,
-        'categories': categories,
-        'top_users': top_users,
     }
-    return render(request, 'forum/category.html', context)
-
+    context['thread_rows_html'] = templating.render_loop('forum/_thread_rows.html', context, request)
+    return _render_page(request, 'forum/category.html', context, sidebar='top-users')
 
 
+@read_from_replica
 def thread_page(request, pk, slug=None):
     thread = get_object_or_404(
         Thread.objects.select_related('author', 'category'),
@@ -153,34 +251,52 @@ def thread_page(request, pk, slug=None):
     )
     can_reply = request.user.is_authenticated and not thread.closed
 
-    # posts + пагінація
+    # видалену тему до purge бачать лише автор і модератори — щоб могли її відновити
+    if thread.deleted_at is not None:
+        if not can_edit_thread:
+            raise Http404
+        can_reply = False
+
+    if thread.archived:
+        return _archived_thread_page(request, thread, can_edit_thread)
+
+    # posts + пагінація: на сторінці тільки кореневі пости, відповіді — по кліку (post_replies)
     posts_qs = (
         thread.posts
-        .select_related('author')
-        .prefetch_related('likes') 
-        .order_by('created_at')
+        .filter(parent__isnull=True)
+        .prefetch_related('likes')
+        .annotate(replies_count=Count('replies'))
+        # pk — для однозначного порядку при однаковому created_at (permalinks.root_page рахує так само)
+        .order_by('created_at', 'pk')
     )
 
-    paginator = Paginator(posts_qs, 10)
+    paginator = Paginator(posts_qs, POSTS_PAGE_SIZE)
     page = request.GET.get('page')
     posts = paginator.get_page(page)
+    _decorate_posts(request, posts)
 
+    # ?open=<id> — одразу розгорнути гілку (після відповіді без HTMX)
+    open_root = request.GET.get('open')
     for p in posts:
-        p.can_edit = (
-            request.user.is_authenticated
-            and (request.user == p.author or request.user.is_staff)
-        )
-        try:
-            username = p.author.username
-            p.author_profile_url = reverse('profile_view', args=[username])
-        except NoReverseMatch:
-            p.author_profile_url = '#'
+        if open_root == str(p.pk):
+            p.subtree_posts = _decorate_posts(
+                request, p.subtree().prefetch_related('likes')
+            )
 
-        # лайки
-        if request.user.is_authenticated:
-            p.liked = p.likes.filter(user=request.user).exists()
+    # підписка: заходячи в тему, користувач прочитав нові відповіді
+    subscription = None
+    if request.user.is_authenticated:
+        # з primary: mark_thread_read оновлює за умовою unread_count=<прочитане значення>
+        subscription = primary(ThreadSubscription.objects.filter(user=request.user, thread=thread)).first()
+        notifications.mark_thread_read(request.user, subscription)
+        # позначка — до того, що користувач побачив (навіть зі старішої репліки);
+        # оновлення в readtracking лише вперед, тож відставання нічого не зламає.
+        # На останній сторінці користувач бачив і найсвіжіше, включно з відповідями в гілках
+        if posts.number == paginator.num_pages:
+            read_up_to = thread.last_post_id
         else:
-            p.liked = False
+            read_up_to = max((p.pk for p in posts), default=None)
+        readtracking.mark_thread_read(request.user, thread, read_up_to)
 
     context = {
         'thread': thread,
@@ -189,17 +305,66 @@ def thread_page(request, pk, slug=None):
         'thread_can_edit': can_edit_thread,
         'thread_can_reply': can_reply,
         'request_user': request.user,
+        'is_subscribed': subscription is not None,
+        'purge_at': _purge_at(thread),
     }
+    context['posts_html'] = templating.render_loop('forum/_post_list.html', context, request)
 
-    return render(request, 'forum/thread.html', context)
+    return _render_page(request, 'forum/thread.html', context)
 
 
+def _purge_at(thread):
+    """Коли видалену тему вже не можна буде відновити (None — тема не видалена)."""
+    if thread.deleted_at is None:
+        return None
+    return thread.deleted_at + timedelta(days=moderation.GRACE_DAYS)
 
+
+def _archived_thread_page(request, thread, can_edit_thread):
+    """Архівна тема: пости з ThreadArchive (один стиснутий блоб), лише читання."""
+    paginator = Paginator(archive.load_posts(thread), POSTS_PAGE_SIZE)
+    posts = paginator.get_page(request.GET.get('page'))
+    authorcards.attach_cards(posts)
+    for p in posts:
+        p.indent = min(p.depth, 8) * 24
+
+    context = {
+        'thread': thread,
+        'posts': posts,
+        'posts_total': paginator.count,
+        'thread_can_edit': can_edit_thread,
+        'thread_can_reply': False,
+        'read_only': True,
+        'purge_at': _purge_at(thread),
+        'request_user': request.user,
+    }
+    context['posts_html'] = templating.render_loop('forum/_post_list.html', context, request)
+    return _render_page(request, 'forum/thread.html', context)
+
+
+@require_POST
+@login_required
+def restore_thread(request, pk):
+    """Повертає архівну тему в гарячі таблиці (автор теми або модератор)."""
+    thread = get_object_or_404(Thread, pk=pk, archived=True)
+    if not (request.user.pk == thread.author_id or request.user.is_staff):
+        return HttpResponseForbidden("Немає прав відновлювати цю тему.")
+    archive.restore_thread(thread)
+    messages.success(request, "Тему повернуто з архіву.")
+    return redirect(thread.get_absolute_url())
+
+
+@ratelimit('new_thread')
 @login_required
 def new_thread_page(request):
     if request.method == 'POST':
         tform = ThreadForm(request.POST)
         pform = PostForm(request.POST)
+        verdict = None
+        if pform.is_valid():
+            verdict = fingerprints.check(pform.cleaned_data['content'], request.user)
+            if verdict.blocked:
+                pform.add_error('content', fingerprints.BLOCK_MESSAGE)
         if tform.is_valid() and pform.is_valid():
             thread = tform.save(commit=False)
             thread.author = request.user
@@ -208,6 +373,9 @@ def new_thread_page(request):
             post.thread = thread
             post.author = request.user
             post.save()
+            fingerprints.store(post, verdict)
+            mentions.record(post, pform.mentioned_user_ids)
+            notifications.on_post_created(post)
             return redirect(thread.get_absolute_url())
     else:
         tform = ThreadForm()
@@ -217,16 +385,27 @@ def new_thread_page(request):
 
 
 @require_POST
+@ratelimit('post_create')
 @login_required
 def post_create_htmx(request, thread_pk):
     logger.debug("post_create_htmx: HX header = %s", request.META.get('HTTP_HX_REQUEST'))
     logger.debug("post_create_htmx: All headers: %s", {k:v for k,v in request.META.items() if k.startswith('HTTP_')})
     
-    thread = get_object_or_404(Thread, pk=thread_pk)
+    thread = get_object_or_404(Thread, pk=thread_pk, deleted_at__isnull=True)
+    if thread.closed:
+        # у т.ч. архівні теми — вони завжди closed
+        return HttpResponseForbidden("Тема закрита — відповіді заборонені.")
     form = PostForm(request.POST)
     is_htmx = _is_htmx(request)
     logger.debug("post_create_htmx: is_htmx=%s, user=%s, thread=%s", is_htmx, request.user, thread_pk)
 
+    # майже-дублікати недавніх постів (спам по темах) — forum/fingerprints.py
+    verdict = None
+    if form.is_valid():
+        verdict = fingerprints.check(form.cleaned_data['content'], request.user)
+        if verdict.blocked:
+            form.add_error('content', fingerprints.BLOCK_MESSAGE)
+
     if not form.is_valid():
         logger.debug("post_create_htmx: form invalid: %s", form.errors.as_json())
         if is_htmx:
@@ -234,16 +413,29 @@ def post_create_htmx(request, thread_pk):
             return HttpResponse(html, status=400)
         return redirect(thread.get_absolute_url())
 
+    # відповідь на інший пост цієї ж теми
+    parent_pk = request.POST.get('parent', '')
+    parent = None
+    if parent_pk.isdigit():
+        parent = Post.objects.filter(pk=parent_pk, thread=thread).first()
+
     # save post
     post = form.save(commit=False)
     post.thread = thread
     post.author = request.user
+    post.parent = parent
     post.save()
-    logger.debug("post_create_htmx: saved post id=%s", post.pk)
-
-    total_posts = thread.posts.count()
-    PAGE_SIZE = 10
-    last_page = math.ceil(total_posts / PAGE_SIZE) if total_posts else 1
+    fingerprints.store(post, verdict)
+    mentions.record(post, form.mentioned_user_ids)
+    logger.debug("post_create_htmx: saved post id=%s parent=%s", post.pk, parent_pk)
+    notifications.on_post_created(post)
+
+    # сторінка, де стоїть корінь гілки (для нового кореневого поста — остання)
+    target_page, root_pk = permalinks.root_page(post)
+    target_url = f"{thread.get_absolute_url()}?page={target_page}"
+    if root_pk != post.pk:
+        target_url += f"&open={root_pk}"
+    target_url += f"#post-{post.pk}"
 
     try:
         current_page = int(request.POST.get('current_page', 1))
@@ -251,20 +443,69 @@ def post_create_htmx(request, thread_pk):
         current_page = 1
 
     if is_htmx:
-        if current_page != last_page:
+        if current_page != target_page:
             resp = HttpResponse(status=204)
-            resp['HX-Redirect'] = f"{thread.get_absolute_url()}?page={last_page}#post-{post.pk}"
+            resp['HX-Redirect'] = target_url
             return resp
 
-        html = render_to_string('forum/_post.html', {
+        if parent is not None:
+            # перемальовуємо всю гілку кореня — новий пост з'явиться на своєму місці.
+            # Корінь — той, що вже знайшов root_page
+            root = Post.objects.get(pk=root_pk)
+            replies = _decorate_posts(
+                request, root.subtree().prefetch_related('likes')
+            )
+            for r in replies:
+                r.is_new = r.pk == post.pk
+            html = templating.render_fragment('forum/_post_replies.html', {
+                'replies': replies,
+                'request_user': request.user,
+                'thread_can_reply': True,
+                'last_page': target_page,
+            }, request=request)
+            resp = HttpResponse(html, content_type='text/html')
+            resp['HX-Retarget'] = f"#replies-{root.pk}"
+            resp['HX-Reswap'] = 'innerHTML'
+            return resp
+
+        _decorate_posts(request, [post])
+        html = templating.render_fragment('forum/_post.html', {
             'p': post,
             'request_user': request.user,
+            'thread_can_reply': True,
             'is_new': True,
-            'last_page': last_page,
+            'last_page': target_page,
         }, request=request)
         return HttpResponse(html, content_type='text/html')
 
-    return redirect(f"{thread.get_absolute_url()}?page={last_page}#post-{post.pk}")
+    return redirect(target_url)
+
+
+
+@read_from_replica
+def post_permalink(request, pk):
+    """/p/<id>/ — редірект на сторінку теми з постом (forum/permalinks.py)."""
+    return redirect(permalinks.resolve(pk))
+
+
+@read_from_replica
+def post_replies(request, pk):
+    """HTMX: усе піддерево відповідей кореневого поста одним range-запитом по path."""
+    root = get_object_or_404(Post.objects.select_related('thread'), pk=pk)
+    # видалена тема — як на thread_page: лише автору теми й модераторам
+    if root.thread.deleted_at is not None and not (
+        request.user.is_staff or request.user.pk == root.thread.author_id
+    ):
+        raise Http404
+    replies = _decorate_posts(
+        request, root.subtree().prefetch_related('likes')
+    )
+    return HttpResponse(templating.render_fragment('forum/_post_replies.html', {
+        'replies': replies,
+        'request_user': request.user,
+        'thread_can_reply': (request.user.is_authenticated and not root.thread.closed
+                             and root.thread.deleted_at is None),
+    }, request))
 
 
 
@@ -301,9 +542,10 @@ def add_post(request, thread_id):
 
 
 @require_POST
+@ratelimit('like')
 @login_required
 def toggle_like(request, pk):
-    post = get_object_or_404(Post, pk=pk)
+    post = get_object_or_404(Post, pk=pk, thread__deleted_at__isnull=True)
 
     like, created = PostLike.objects.get_or_create(user=request.user, post=post)
     if not created:
@@ -315,7 +557,7 @@ def toggle_like(request, pk):
     likes_count = PostLike.objects.filter(post=post).count()
 
     if _is_htmx(request):
-        html = render_to_string('forum/_post_like.html', {
+        html = templating.render_fragment('forum/_post_like.html', {
             'post': post,
             'liked': liked,
             'likes_count': likes_count,
@@ -326,6 +568,56 @@ def toggle_like(request, pk):
 
 
 
+@require_POST
+@login_required
+def toggle_subscription(request, pk):
+    thread = get_object_or_404(Thread, pk=pk, deleted_at__isnull=True)
+
+    if ThreadSubscription.objects.filter(user=request.user, thread=thread).exists():
+        notifications.unsubscribe(request.user, thread)
+        subscribed = False
+    else:
+        notifications.subscribe(request.user, thread)
+        subscribed = True
+
+    if _is_htmx(request):
+        html = render_to_string('forum/_subscribe_button.html', {
+            'thread': thread,
+            'is_subscribed': subscribed,
+        }, request=request)
+        return HttpResponse(html)
+
+    return redirect(thread.get_absolute_url())
+
+
+
+@require_POST
+@login_required
+def mark_category_read(request, slug):
+    category = get_object_or_404(Category, slug=slug)
+    readtracking.mark_category_read(request.user, category)
+    return redirect(category.get_absolute_url())
+
+
+
+@login_required
+def notifications_page(request):
+    subscriptions = (
+        ThreadSubscription.objects
+        .filter(user=request.user, thread__deleted_at__isnull=True)
+        .select_related('thread', 'thread__category')
+        .order_by('-unread_count', '-thread__updated_at')[:50]
+    )
+    # список з позначкою "нова" читаємо до того, як позначити згадки переглянутими
+    recent_mentions = mentions.recent(request.user)
+    mentions.mark_seen(request.user)
+    return render(request, 'forum/notifications.html', {
+        'subscriptions': subscriptions,
+        'mentions': recent_mentions,
+    })
+
+
+
 @login_required
 def edit_thread(request, pk):
     thread = get_object_or_404(Thread, pk=pk)
@@ -349,24 +641,47 @@ def delete_thread(request, pk):
     if not (request.user == thread.author or request.user.is_staff):
         return HttpResponseForbidden("Немає прав видаляти цю тему.")
     if request.method == 'POST':
-        thread.delete()
-        messages.success(request, "Тему видалено.")
-        return redirect('categories')
+        # лише позначка: пости з лайками вичистить purge_deleted_threads, а не цей запит
+        moderation.soft_delete_threads(Thread.objects.filter(pk=thread.pk))
+        messages.success(request, f"Тему видалено. Її можна відновити протягом {moderation.GRACE_DAYS} дн.")
+        # автор бачить видалену тему з кнопкою "Відновити"
+        return redirect(thread.get_absolute_url())
     return render(request, "forum/confirm_delete_thread.html", {"thread": thread})
 
 
+@require_POST
+@login_required
+def undelete_thread(request, pk):
+    thread = get_object_or_404(Thread, pk=pk, deleted_at__isnull=False)
+    if not (request.user == thread.author or request.user.is_staff):
+        return HttpResponseForbidden("Немає прав відновлювати цю тему.")
+    if moderation.undelete_threads(Thread.objects.filter(pk=thread.pk)):
+        messages.success(request, "Тему відновлено.")
+    else:
+        messages.error(request, "Строк відновлення минув.")
+    return redirect(thread.get_absolute_url())
+
+
 
 @login_required
 def edit_post(request, pk):
-    post = get_object_or_404(Post, pk=pk)
+    # у видаленій темі (до purge) пости не редагуються — ні відбитків, ні згадок, ні версій
+    post = get_object_or_404(Post, pk=pk, thread__deleted_at__isnull=True)
     if not (request.user == post.author or request.user.is_staff):
         return HttpResponseForbidden("Немає прав редагувати цей пост.")
     if request.method == 'POST':
+        # форма пише в той самий екземпляр — старий текст беремо до валідації
+        old_content = post.content
         form = PostForm(request.POST, instance=post)
         if form.is_valid():
             post = form.save(commit=False)
             post.edited_at = timezone.now()
-            post.save()
+            with transaction.atomic():
+                post.save()
+                revisions.record_edit(post, old_content, editor=request.user)
+                if post.content != old_content:
+                    fingerprints.refresh(post)
+                    mentions.record(post, form.mentioned_user_ids)
             messages.success(request, "Пост оновлено.")
             return redirect(post.thread.get_absolute_url())
     else:
@@ -375,6 +690,33 @@ def edit_post(request, pk):
 
 
 
+@login_required
+def post_history(request, pk):
+    """Історія редагувань: список версій і відновлений текст вибраної (?rev=N)."""
+    post = get_object_or_404(Post.objects.select_related('thread'), pk=pk)
+    # історію поста з видаленої теми бачать лише модератори
+    if post.thread.deleted_at is not None and not request.user.is_staff:
+        raise Http404
+    if not (request.user.pk == post.author_id or request.user.is_staff):
+        return HttpResponseForbidden("Немає прав переглядати історію цього поста.")
+
+    history = list(
+        post.revisions.select_related('editor').defer('data').order_by('-number')
+    )
+    selected = history[0].number if history else None
+    rev = request.GET.get('rev', '')
+    if rev.isdigit() and any(r.number == int(rev) for r in history):
+        selected = int(rev)
+
+    content = revisions.content_at(post.pk, selected) if selected is not None else post.content
+    return render(request, "forum/post_history.html", {
+        "post": post,
+        "history": history,
+        "selected": selected,
+        "content": content,
+    })
+
+
 @login_required
 def delete_post(request, pk):
     post = get_object_or_404(Post, pk=pk)
@@ -382,44 +724,48 @@ def delete_post(request, pk):
         return HttpResponseForbidden("Немає прав видаляти цей пост.")
     if request.method == 'POST':
         thread_url = post.thread.get_absolute_url()
-        post.delete()
+        with transaction.atomic():
+            moderation.reattach_replies([post.pk])
+            post.delete()
+        # Thread.last_post (SET_NULL) показується в списку тем категорії
+        readtracking.refresh_last_post(Thread.objects.filter(pk=post.thread_id))
         messages.success(request, "Пост видалено.")
         return redirect(thread_url)
     return render(request, "forum/confirm_delete_post.html", {"post": post})
 
 
-
+@read_from_replica
 def profile_page(request, username=None):
     if username:
-        profile_user = get_object_or_404(User, username=username)
+        profile_user = get_object_or_404(User.objects.select_related('profile'), username=username)
     else:
         if not request.user.is_authenticated:
             return redirect(f"{reverse('login')}?next={request.path}")
         profile_user = request.user
 
-    posts = Post.objects.filter(author=profile_user).select_related('thread').order_by('-created_at')[:10]
+    posts = _profile_posts(profile_user)[:10]
 
-    posts_count = Post.objects.filter(author=profile_user).count()
-    threads_count = Thread.objects.filter(author=profile_user).count()
+    # лічильники — з агрегатів у Profile (forum/stats.py), без COUNT по постах і темах
+    user_profile = getattr(profile_user, 'profile', None)
 
     context = {
         'profile_user': profile_user,
         'profile': profile_user,  # backward compatibility for templates using 'profile'
         'posts': posts,
-        'posts_count': posts_count,
-        'threads_count': threads_count,
+        'posts_count': user_profile.posts_count if user_profile else 0,
+        'threads_count': user_profile.threads_count if user_profile else 0,
+        'likes_received': user_profile.likes_received if user_profile else 0,
+        'last_activity_at': user_profile.last_activity_at if user_profile else None,
         'is_owner': request.user.is_authenticated and request.user == profile_user,
     }
-    return render(request, 'forum/profile.html', context)
+    return _render_page(request, 'forum/profile.html', context)
 
 
 
 @login_required
 def profile_edit_page(request):
     user = request.user
-    profile = getattr(user, 'profile', None)
-    if profile is None:
-        profile = Profile.objects.create(user=user)
+    profile = user.profile
 
     if request.method == 'POST':
         uform = UserUpdateForm(request.POST, instance=user)
@@ -443,13 +789,14 @@ def profile_edit_page(request):
 
 
 def categories_list_page(request):
-    categories = Category.objects.annotate(threads_count=Count('threads')).order_by('title')
+    categories = Category.objects.annotate(threads_count=_visible_threads_count()).order_by('title')
     is_admin = request.user.is_authenticated and request.user.is_staff
     context = {"categories": categories, "is_admin": is_admin}
     return render(request, "forum/categories.html", context)
 
 
 
+@ratelimit('register')
 def register_view(request):
     if request.user.is_authenticated:
         return redirect('index')
@@ -467,168 +814,12 @@ def register_view(request):
 
 
 def about_page(request):
-    developer = {
-        "name": "Юрій Лапін",
-        "role": "Студент, розробник (Комп'ютерні науки)",
-        "location": "Львів, Україна",
-        "email": "Yurii.Lapin.PP.2024@lpnu.ua",
-        "photo": "/static/img/about/dev-photo.jpg",
-        "facts": [
-            "Навчаюся на 2 курсі, спеціальність Комп'ютерні науки.",
-            "Працював над декількома навчальними проєктами на Django і FastAPI.",
-            "Люблю інді-ігри",
-            "НЕ люблю мед !!!",
-        ],
-        "social": {
-            "github": "https://github.com/Yu-225",
-            "linkedin": "https://www.linkedin.com/in/yu-lapin-064902255/",
-        }
-    }
-
-    site_info = {
-        "title": "БочкаМеду",
-        "summary": "Міні-форум для обговорення ігор — UI-first, навчальний проєкт.",
-        "technologies": [
-            "Python - Django",
-            "HTMX (dynamic partial updates)",
-            "Bootstrap 5",
-            "Quill Rich Text Editor",
-            "SQLite (dev) ",
-        ],
-        "features": [
-            "Створення тем",
-            "Лайки, редагування постів, профілі",
-            "HTMX для плавного UX без повних перезавантажень",
-        ],
-        "github": "https://github.com/",
-        "license": "MIT",
-    }
-
-    context = {
-        "developer": developer,
-        "site_info": site_info,
-    }
-    return render(request, "forum/about.html", context)
-
+    return infopages.serve(request, 'about')
 
 
 def rules_page(request):
-    rules = [
-        {"title": "Дотримуйся поваги", "text": "Не допускаємо образ, ненависті, приниження. Обговорюємо аргументовано."},
-        {"title": "Чіткі теми", "text": "Створюй зрозумілі заголовки, додавай опис та теги."},
-        {"title": "Без спаму", "text": "Реклама і спам заборонені; рекламні пости погоджуй з модерацією."},
-        {"title": "Публічність контенту", "text": "Уникай публікації приватних даних інших людей."},
-        {"title": "Дотримуйся законів", "text": "Не публікуй незаконний або небезпечний контент."},
-    ]
-    return render(request, "forum/rules.html", {"rules": rules})
-
+    return infopages.serve(request, 'rules')
 
 
 def faq_page(request):
-    faqs = [
-        # Загальні
-        {
-            "q": "Що це за форум?",
-            "a": "Це форум для обговорення ігор: новини, думки, гайди, інді та AAA-проєкти. Місце для спокійного й змістовного спілкування."
-        },
-        {
-            "q": "Для кого створений цей форум?",
-            "a": "Для геймерів, розробників, ентузіастів та всіх, хто хоче обговорювати ігри без токсичності."
-        },
-        {
-            "q": "Чи можна користуватися форумом без реєстрації?",
-            "a": "Так, переглядати теми можна без акаунту. Для створення тем і повідомлень потрібна реєстрація."
-        },
-
-        # Реєстрація
-        {
-            "q": "Чи потрібно реєструватись?",
-            "a": "Так, щоб писати повідомлення, ставити лайки та створювати теми."
-        },
-        {
-            "q": "Що робити, якщо я забув пароль?",
-            "a": "Скористайся формою відновлення пароля на сторінці входу."
-        },
-        {
-            "q": "Чи можна видалити акаунт?",
-            "a": "Так, через налаштування профілю або звернувшись до адміністрації."
-        },
-
-        # Профіль
-        {
-            "q": "Як змінити аватар?",
-            "a": "Зайди у Профіль → Редагувати та обери новий аватар."
-        },
-        {
-            "q": "Яку інформацію бачать інші користувачі?",
-            "a": "Нікнейм, аватар та активність на форумі. Особисті дані не публікуються."
-        },
-
-        # Теми та повідомлення
-        {
-            "q": "Як створити тему?",
-            "a": "Перейди у потрібну категорію і натисни кнопку «Створити тему» або скористайся кнопкою на головній сторінці."
-        },
-        {
-            "q": "У чому різниця між темою і повідомленням?",
-            "a": "Тема — це обговорення. Повідомлення — відповіді всередині теми."
-        },
-        {
-            "q": "Чи можна редагувати або видалити свій пост?",
-            "a": "Так, якщо він ще не порушує правила та не закритий модератором."
-        },
-        {
-            "q": "Чому я не можу відповісти в темі?",
-            "a": "Ймовірно, тема закрита або ти не авторизований."
-        },
-
-        # Лайки
-        {
-            "q": "Як працюють лайки?",
-            "a": "Ти можеш поставити або прибрати лайк під повідомленням. Кількість лайків показує популярність поста."
-        },
-        {
-            "q": "Чи можна прибрати лайк?",
-            "a": "Так, повторне натискання прибирає лайк."
-        },
-        {
-            "q": "Чому кількість лайків не оновилась одразу?",
-            "a": "Сторінка може оновлюватися асинхронно. Спробуй оновити сторінку."
-        },
-
-        # Модерація
-        {
-            "q": "Які основні правила форуму?",
-            "a": "Заборонені образи, спам, реклама без дозволу та токсична поведінка."
-        },
-        {
-            "q": "За що можуть забанити?",
-            "a": "За систематичні порушення правил або серйозні інциденти."
-        },
-        {
-            "q": "Чи можна оскаржити бан?",
-            "a": "Так, звернувшись до адміністрації форуму."
-        },
-
-        # Технічні
-        {
-            "q": "Чи працює форум на мобільних пристроях?",
-            "a": "Так, інтерфейс адаптований для смартфонів і планшетів."
-        },
-        {
-            "q": "Що робити, якщо сайт працює некоректно?",
-            "a": "Онови сторінку або повідом про помилку адміністрації."
-        },
-
-        # Інше
-        {
-            "q": "Чи плануються нові функції?",
-            "a": "Так, форум активно розвивається. Пропозиції вітаються."
-        },
-        {
-            "q": "Куди звертатися з питаннями?",
-            "a": "Пиши у відповідну тему або звертайся до адміністратора через сторінку «Про проєкт»."
-        },
-    ]
-
-    return render(request, "forum/faq.html", {"faqs": faqs})
+    return infopages.serve(request, 'faq')
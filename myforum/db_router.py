@@ -0,0 +1,86 @@
+"""
+Маршрутизація читання на репліки БД.
+
+- ReplicaRouter: усі записи — на primary; читання йде на репліку тільки
+  всередині view, позначеного @read_from_replica (index, category_page,
+  thread_page, profile_page). Решта коду читає з primary як і раніше.
+- PinPrimaryMiddleware: після успішного запису (POST/PUT/PATCH/DELETE)
+  ставить коротку cookie, і поки вона жива, читання лишається на primary —
+  користувач одразу бачить свій пост чи лайк, навіть якщо репліка відстає.
+
+Репліки задаються через DATABASE_REPLICA_URLS (див. settings.py).
+"""
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, router
+
+PIN_COOKIE = "db_pin"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+# alias репліки для поточного запиту (None — читаємо з primary)
+_read_alias = ContextVar("read_alias", default=None)
+
+
+class ReplicaRouter:
+    primary_alias = DEFAULT_DB_ALIAS
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get() or self.primary_alias
+
+    def db_for_write(self, model, **hints):
+        return self.primary_alias
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # primary і репліки містять ті самі дані
+        return True
+
+
+def primary(queryset):
+    """
+    Те саме читання, але з primary: коли за прочитаним значенням одразу
+    робиться умовний UPDATE (репліка могла відстати, і умова б не збіглася).
+    """
+    return queryset.using(router.db_for_write(queryset.model))
+
+
+def _is_pinned(request):
+    return request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES
+
+
+def read_from_replica(view_func):
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        replicas = getattr(settings, "DATABASE_REPLICAS", [])
+        if not replicas or _is_pinned(request):
+            return view_func(request, *args, **kwargs)
+
+        token = _read_alias.set(random.choice(replicas))
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+    return _wrapped
+
+
+class PinPrimaryMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            getattr(settings, "DATABASE_REPLICAS", [])
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            response.set_cookie(
+                PIN_COOKIE, "1",
+                max_age=getattr(settings, "REPLICA_PIN_SECONDS", 5),
+                httponly=True,
+                samesite="Lax",
+                secure=settings.SESSION_COOKIE_SECURE,
+            )
+        return response
@@ -71,6 +71,10 @@ STATICFILES_STORAGE = (
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# about/rules/faq, відрендерені при деплої (manage.py prerender_pages, forum/infopages.py)
+PRERENDERED_ROOT = BASE_DIR / "prerendered"
+INFO_PAGES_MAX_AGE = int(os.environ.get("INFO_PAGES_MAX_AGE", str(24 * 3600)))
+
 # =====================
 # APPLICATION
 # =====================
@@ -90,6 +94,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # першим — щоб латентність охоплювала весь стек (forum/metrics.py)
+    "forum.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -99,6 +105,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_htmx.middleware.HtmxMiddleware",
+    "myforum.db_router.PinPrimaryMiddleware",
 ]
 
 ROOT_URLCONF = "myforum.urls"
@@ -117,10 +124,25 @@ TEMPLATES = [
             ],
         },
     },
+    {
+        # лише гарячі фрагменти (цикл постів, рядки тем) — див. forum/templating.py
+        "BACKEND": "django.template.backends.jinja2.Jinja2",
+        "DIRS": [BASE_DIR / "jinja2"],
+        "APP_DIRS": False,
+        "OPTIONS": {"environment": "forum.templating.environment"},
+    },
 ]
 
+# Рендерити цикл постів і рядки тем Jinja2-портами (jinja2/forum/) замість DTL
+JINJA2_POST_LOOP = getenv_bool("JINJA2_POST_LOOP", False)
+
 WSGI_APPLICATION = "myforum.wsgi.application"
 
+# Прогрів у myforum/wsgi.py: URLconf з усіма views і шаблони вантажаться при
+# імпорті застосунку, а не на першому запиті. З gunicorn --preload це
+# робиться один раз у майстрі, і воркери отримують усе готовим після fork.
+WSGI_WARMUP = getenv_bool("WSGI_WARMUP", True)
+
 # =====================
 # DATABASE
 # =====================
@@ -133,6 +155,61 @@ DATABASES = {
     )
 }
 
+# Репліки для читання: DATABASE_REPLICA_URLS="postgres://...,postgres://..."
+_replica_urls = os.environ.get("DATABASE_REPLICA_URLS", "")
+DATABASE_REPLICAS = []
+for _i, _url in enumerate(u.strip() for u in _replica_urls.split(",") if u.strip()):
+    _alias = f"replica_{_i}"
+    DATABASES[_alias] = dj_database_url.parse(
+        _url,
+        conn_max_age=int(os.environ.get("DB_CONN_MAX_AGE", "600")),
+    )
+    # у тестах репліка — дзеркало default, окремої тестової БД не створюємо
+    DATABASES[_alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(_alias)
+
+DATABASE_ROUTERS = ["myforum.db_router.ReplicaRouter"]
+# скільки секунд після запису читати з primary (read-your-own-writes)
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", "5"))
+
+# =====================
+# CACHE / SESSIONS / MESSAGES
+# =====================
+
+# Спільний для всіх воркерів кеш: REDIS_URL="redis://..." (потрібен пакет redis).
+# Без нього — LocMemCache, окремий у кожному процесі: ліміти запитів
+# рахуються по воркеру (forum/checks.py), а картки авторів кешуються лише на
+# AUTHOR_CARD_LOCAL_TTL секунд, бо інвалідацію бачить тільки один воркер.
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    try:
+        import redis  # noqa: F401
+    except ImportError:
+        raise RuntimeError("REDIS_URL is set but the 'redis' package is not installed (pip install redis)")
+CACHES = {
+    "default": (
+        {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL}
+        if REDIS_URL
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    )
+}
+
+# SESSION_BACKEND: db | cached_db | cache | signed_cookies
+# - cached_db: читання з кешу, БД — лише на промаху і при записі. Тільки зі
+#   спільним кешем: з LocMem у кожного воркера своя копія сесії, і вихід,
+#   зроблений на одному воркері, інші б не побачили. Тому без REDIS_URL
+#   за замовчуванням db.
+# - signed_cookies: сесія цілком у підписаній cookie, БД не чіпається взагалі;
+#   відкликати її на сервері не можна (лише зміна пароля чи SECRET_KEY).
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "cached_db" if REDIS_URL else "db")
+if SESSION_BACKEND not in ("db", "cached_db", "cache", "signed_cookies"):
+    raise RuntimeError(f"Unknown SESSION_BACKEND: {SESSION_BACKEND}")
+SESSION_ENGINE = f"django.contrib.sessions.backends.{SESSION_BACKEND}"
+
+# Повідомлення (messages.success тощо) — лише в cookie: FallbackStorage за
+# замовчуванням при переповненні cookie дописує їх у сесію, тобто в БД.
+MESSAGE_STORAGE = "django.contrib.messages.storage.cookie.CookieStorage"
+
 # =====================
 # AUTH / I18N
 # =====================
@@ -154,6 +231,36 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 LOGIN_REDIRECT_URL = "/profile/"
 LOGOUT_REDIRECT_URL = "/"
 
+# =====================
+# RATE LIMITING (forum/ratelimit.py)
+# =====================
+
+RATELIMIT_ENABLED = getenv_bool("RATELIMIT_ENABLED", True)
+# Лічильники — у CACHES["default"]; між воркерами вони спільні лише з REDIS_URL.
+# За проксі (Railway/nginx) REMOTE_ADDR — адреса проксі. Вмикати, лише якщо
+# проксі дописує адресу клієнта в X-Forwarded-For; RATELIMIT_PROXY_HOPS —
+# скільки довірених проксі дописують свій запис (береться N-й справа).
+RATELIMIT_TRUST_X_FORWARDED_FOR = getenv_bool("RATELIMIT_TRUST_X_FORWARDED_FOR", False)
+RATELIMIT_PROXY_HOPS = int(os.environ.get("RATELIMIT_PROXY_HOPS", "1"))
+RATELIMIT_POLICIES = {
+    "post_create": {"rate": "10/m", "burst": 5, "keys": ("user", "ip")},
+    "like": {"rate": "60/m", "burst": 20, "keys": ("user", "ip")},
+    "new_thread": {"rate": "5/h", "burst": 3, "keys": ("user", "ip")},
+    "register": {"rate": "5/h", "burst": 3, "keys": ("ip",)},
+}
+
+# =====================
+# METRICS (forum/metrics.py, GET /metrics)
+# =====================
+
+# Каталог, куди кожен воркер gunicorn скидає свої лічильники (раз на
+# METRICS_FLUSH_SECONDS); /metrics підсумовує всі файли. Без нього — лише
+# процес, що відповів на запит.
+METRICS_DIR = os.environ.get("METRICS_DIR") or None
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "1"))
+# Bearer-токен для скрапера; без нього /metrics бачать лише staff (і DEBUG)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
 # =====================
 # LOGGING
 # =====================
@@ -166,16 +273,3 @@ LOGGING = {
     "root": {"handlers": ["console"], "level": LOG_LEVEL},
 }
 
-
-
-# Тимчасово для Раілвей
-if os.environ.get("CREATE_SUPERUSER") == "1":
-    from django.contrib.auth import get_user_model
-
-    User = get_user_model()
-    if not User.objects.filter(username=os.environ["DJANGO_SUPERUSER_USERNAME"]).exists():
-        User.objects.create_superuser(
-            os.environ["DJANGO_SUPERUSER_USERNAME"],
-            os.environ["DJANGO_SUPERUSER_EMAIL"],
-            os.environ["DJANGO_SUPERUSER_PASSWORD"],
-        )
\ No newline at end of file
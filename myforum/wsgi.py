@@ -7,6 +7,7 @@ For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 """
 
+import logging
 import os
 
 from django.core.wsgi import get_wsgi_application
@@ -14,3 +15,53 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myforum.settings")
 
 application = get_wsgi_application()
+logger = logging.getLogger(__name__)
+
+
+def warm_up():
+    """
+    Вантажить те, що інакше кожен воркер збирав би на першому запиті:
+    URLconf (а з ним views, forms, bleach, ...), скомпільовані шаблони
+    проєкту і маніфест статики. Жодних запитів до БД — з'єднання, відкрите
+    до fork, воркери ділили б між собою.
+    """
+    from pathlib import Path
+
+    from django.conf import settings
+    from django.contrib.staticfiles.storage import staticfiles_storage
+    from django.db import connections
+    from django.template import engines
+    from django.urls import get_resolver
+
+    # reverse_dict будує всі шаблони URL (для {% url %}), імпортуючи views
+    get_resolver().reverse_dict
+    # маніфест читається при створенні сховища
+    staticfiles_storage.base_location
+
+    base_dir = Path(settings.BASE_DIR).resolve()
+    for engine in engines.all():
+        for directory in map(Path, engine.template_dirs):
+            # лише шаблони проєкту: адмінка й сторонні застосунки — рідкісні гості
+            if base_dir not in directory.resolve().parents:
+                continue
+            for path in directory.rglob("*.html"):
+                engine.get_template(path.relative_to(directory).as_posix())
+
+    # готові about/rules/faq для анонімів (forum/infopages.py). До collectstatic
+    # {% static %} з ManifestStaticFilesStorage кидає ValueError — тоді
+    # пропускаємо: імпорт застосунку не повинен залежати від збірки статики
+    from forum import infopages
+
+    try:
+        for name in infopages.PAGES:
+            infopages.get(name)
+    except ValueError as exc:
+        logger.warning("Warm-up skipped info pages: %s (run collectstatic)", exc)
+
+    connections.close_all()
+
+
+from django.conf import settings  # noqa: E402
+
+if settings.WSGI_WARMUP:
+    warm_up()
@@ -2,5 +2,19 @@
 
 python manage.py migrate --noinput
 python manage.py collectstatic --noinput
+# about/rules/faq для анонімів — готовий HTML (з уже хешованими іменами статики)
+python manage.py prerender_pages
 
-exec gunicorn myforum.wsgi:application --bind 0.0.0.0:$PORT
+# раніше це робилося прямо в settings.py — на кожному старті кожного воркера
+if [ "$CREATE_SUPERUSER" = "1" ]; then
+    python manage.py ensure_superuser
+fi
+
+# лічильники попереднього запуску (forum/metrics.py) — з нуля, як і процеси
+if [ -n "$METRICS_DIR" ]; then
+    rm -f "$METRICS_DIR"/*.json
+fi
+
+# --preload: застосунок (з прогрівом, див. WSGI_WARMUP) вантажиться один раз
+# у майстрі, воркери отримують його готовим після fork
+exec gunicorn myforum.wsgi:application --preload --bind 0.0.0.0:$PORT